@@ -0,0 +1,186 @@
+"""
+Concurrency benchmark: sync PredictView under WSGI vs AsyncPredictView under ASGI.
+
+Starts a fake FastAPI backend whose /predict answers after --backend-latency
+seconds, then serves the Django frontend twice against a throwaway SQLite
+database:
+
+- wsgi: gunicorn with --wsgi-workers sync workers, form at /
+- asgi: uvicorn with --asgi-workers workers, form at /async/
+
+and fires --requests form submits at each, --concurrency at a time.
+Each in-flight submit holds a whole sync worker while it waits on the
+backend, so WSGI throughput caps at workers / latency; the async view keeps
+accepting submits while earlier ones wait.
+
+    cd app_form
+    python -m benchmarks.frontend_concurrency --concurrency 50 --requests 500 --backend-latency 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+FORM = {
+    "name_surname": "Bench User",
+    "annual_income": "36000",
+    "debt_to_income_ratio": "0.15",
+    "credit_score": "736",
+    "loan_amount": "10000",
+    "interest_rate": "13.67",
+    "gender": "Male",
+    "marital_status": "Single",
+    "education_level": "PhD",
+    "employment_status": "Employed",
+    "loan_purpose": "Car",
+    "grade_subgrade": "C3",
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def start_fake_backend(port: int, latency: float) -> uvicorn.Server:
+    backend = FastAPI()
+
+    @backend.post("/predict")
+    async def predict(payload: dict):
+        await asyncio.sleep(latency)
+        return {"approved": True, "probability": 81.3}
+
+    server = uvicorn.Server(uvicorn.Config(backend, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def server_command(mode: str, port: int, workers: int) -> list[str]:
+    if mode == "wsgi":
+        return [sys.executable, "-m", "gunicorn", "loan_site.wsgi:application",
+                "--bind", f"127.0.0.1:{port}", "--workers", str(workers), "--log-level", "warning"]
+    return [sys.executable, "-m", "uvicorn", "loan_site.asgi:application",
+            "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"]
+
+
+def wait_until_up(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+async def load(url: str, n_requests: int, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as http:
+        # one GET for the CSRF cookie; the unmasked cookie value is a valid form token
+        await http.get(url)
+        form = {**FORM, "csrfmiddlewaretoken": http.cookies["csrftoken"]}
+        headers = {"Referer": url}
+
+        latencies: list[float] = []
+        statuses: dict[int, int] = {}
+        queue = asyncio.Queue()
+        for _ in range(n_requests):
+            queue.put_nowait(None)
+
+        async def user():
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                r = await http.post(url, data=form, headers=headers)
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[r.status_code] = statuses.get(r.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": n_requests,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(n_requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "status": statuses,
+    }
+
+
+def run_mode(mode: str, args, env: dict) -> dict:
+    port = args.port + (1 if mode == "asgi" else 0)
+    workers = args.asgi_workers if mode == "asgi" else args.wsgi_workers
+    path = "/async/" if mode == "asgi" else "/"
+    url = f"http://127.0.0.1:{port}{path}"
+    proc = subprocess.Popen(server_command(mode, port, workers), cwd=APP_DIR, env=env)
+    try:
+        wait_until_up(url)
+        result = asyncio.run(load(url, args.requests, args.concurrency))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return {"workers": workers, "path": path, **result}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=50, help="submits in flight")
+    parser.add_argument("--requests", type=int, default=500, help="submits per server")
+    parser.add_argument("--backend-latency", type=float, default=0.2, help="seconds the fake /predict takes")
+    parser.add_argument("--wsgi-workers", type=int, default=2, help="gunicorn sync workers")
+    parser.add_argument("--asgi-workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--modes", nargs="+", choices=["wsgi", "asgi"], default=["wsgi", "asgi"])
+    parser.add_argument("--port", type=int, default=8790, help="frontend port (asgi uses port + 1)")
+    parser.add_argument("--backend-port", type=int, default=8799)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    start_fake_backend(args.backend_port, args.backend_latency)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "SQLITE_PATH": str(Path(tmp) / "bench.sqlite3"),
+            "BACKEND_BASE_URL": f"http://127.0.0.1:{args.backend_port}",
+            "BACKEND_POOL_SIZE": str(max(args.concurrency, 20)),
+            "BACKEND_READ_TIMEOUT": str(args.backend_latency + 30),
+            "DJANGO_SETTINGS_MODULE": "loan_site.settings",
+        }
+        subprocess.run([sys.executable, "manage.py", "migrate", "-v", "0"], cwd=APP_DIR, env=env, check=True)
+        results = {mode: run_mode(mode, args, env) for mode in args.modes}
+
+    if args.json:
+        print(json.dumps({"settings": vars(args), "results": results}, indent=2))
+        return
+
+    print(f"\n{args.requests} submits, {args.concurrency} concurrent, backend latency {args.backend_latency * 1000:.0f} ms")
+    print(f"{'mode':<6} {'workers':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  status")
+    for mode, r in results.items():
+        print(f"{mode:<6} {r['workers']:>7} {r['requests_per_second']:>8.1f} {r['p50_ms']:>8.1f} "
+              f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}  {r['status']}")
+
+
+if __name__ == "__main__":
+    main()
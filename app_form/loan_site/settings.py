@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,6 +42,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # first, so its request ID and timing cover every other middleware
+    'predictions.tracing.RequestIDMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -76,7 +79,16 @@ WSGI_APPLICATION = 'loan_site.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+        'OPTIONS': {
+            # WAL lets readers run while the prediction writer commits; NORMAL
+            # sync is safe under WAL and avoids an fsync per transaction
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+            # wait for a busy writer instead of failing with "database is locked"
+            'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '20')),
+            # take the write lock up front, so concurrent writers queue on the busy timeout
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -122,6 +134,31 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# One JSON line per request (request ID, spans) from predictions.tracing
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {
+            '()': 'pythonjsonlogger.json.JsonFormatter',
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
+    'handlers': {
+        'trace': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json',
+        },
+    },
+    'loggers': {
+        'predictions.trace': {
+            'handlers': ['trace'],
+            'level': os.getenv('TRACE_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 # CSRF and CORS configuration for Google Cloud Run
 CSRF_TRUSTED_ORIGINS = [
     "https://front3-loan-predictor-service-94886516855.europe-west1.run.app",
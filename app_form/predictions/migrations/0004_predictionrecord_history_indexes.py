@@ -0,0 +1,25 @@
+# Generated by Django 5.2.9 on 2026-10-18 10:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0003_alter_predictionrecord_name_surname'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='predictionrecord',
+            index=models.Index(fields=['-created_at', '-id'], name='prediction_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='predictionrecord',
+            index=models.Index(fields=['approved', '-created_at', '-id'], name='prediction_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='predictionrecord',
+            index=models.Index(fields=['grade_subgrade', '-created_at', '-id'], name='prediction_grade_idx'),
+        ),
+    ]
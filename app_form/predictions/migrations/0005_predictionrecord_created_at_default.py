@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-18 10:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0004_predictionrecord_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='predictionrecord',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
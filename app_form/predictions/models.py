@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class PredictionRecord(models.Model):
@@ -16,7 +17,18 @@ class PredictionRecord(models.Model):
     grade_subgrade = models.CharField(max_length=10, null=True, blank=True)
     approved = models.BooleanField()
     probability = models.FloatField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # stamped when the record is built: auto_now_add would stamp it when the
+    # write-behind writer flushes, giving a whole batch the same time
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        # keyset pagination of the history walks (created_at, id) newest first,
+        # optionally within one approval state or grade
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="prediction_created_idx"),
+            models.Index(fields=["approved", "-created_at", "-id"], name="prediction_approved_idx"),
+            models.Index(fields=["grade_subgrade", "-created_at", "-id"], name="prediction_grade_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name_surname or 'Unknown'} - Prediction ({'Approved' if self.approved else 'Rejected'}) - {self.probability}%"
@@ -1,5 +1,16 @@
+import asyncio
+import contextlib
 import os
+import random
+import threading
+import time
+from collections import deque
+
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+
+from .. import tracing
 
 # Inside docker, Django can reach FastAPI using the docker-compose service name.
 BACKEND_BASE_URL = os.getenv(
@@ -7,15 +18,360 @@ BACKEND_BASE_URL = os.getenv(
     "http://fastapi-backend:8001"  # docker-to-docker
 )
 
+# Separate budgets: failing to connect should be noticed fast, scoring takes a few ms.
+BACKEND_CONNECT_TIMEOUT = float(os.getenv("BACKEND_CONNECT_TIMEOUT", "0.5"))
+BACKEND_READ_TIMEOUT = float(os.getenv("BACKEND_READ_TIMEOUT", "2.0"))
+BACKEND_POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", "20"))
+
+# At most one retry per call, and retries may add at most this fraction of calls.
+BACKEND_MAX_RETRIES = int(os.getenv("BACKEND_MAX_RETRIES", "1"))
+BACKEND_RETRY_RATIO = float(os.getenv("BACKEND_RETRY_RATIO", "0.1"))
+
+# Consecutive failures that open the breaker, and how long it stays open.
+BACKEND_BREAKER_FAILURES = int(os.getenv("BACKEND_BREAKER_FAILURES", "5"))
+BACKEND_BREAKER_RESET_SECONDS = float(os.getenv("BACKEND_BREAKER_RESET_SECONDS", "30"))
+
+# /predict only scores, so repeating it is safe; these statuses mean "try again".
+RETRYABLE_STATUS = {502, 503, 504}
+
+# Errors that say the backend is unhealthy (plus any 5xx). A 4xx is the request's
+# fault and an unreadable body says nothing either way: those leave the breaker as it is.
+TRANSPORT_ERRORS = {"connect_timeout", "read_timeout", "pool_timeout", "connection_error", "request_error"}
+
+
+class RetryBudget:
+    """
+    Token bucket for retries: every call deposits `ratio` tokens, every retry
+    spends one. Keeps retries from multiplying load on a struggling backend.
+    """
+
+    def __init__(self, ratio: float, min_tokens: float = 3.0, max_tokens: float = 20.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failures` consecutive failures; open -> half_open
+    after `reset_seconds`, when a single probe call is let through; its result
+    closes or re-opens the breaker.
+    """
+
+    def __init__(self, failures: int, reset_seconds: float):
+        self.failure_threshold = failures
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """The admitted call was abandoned (cancelled) without telling anything about the backend."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record(self, healthy: bool | None) -> None:
+        if healthy is None:
+            self.release()
+        elif healthy:
+            self.record_success()
+        else:
+            self.record_failure()
+
+
+class ClientMetrics:
+    def __init__(self, window: int = 1000):
+        self.calls = 0
+        self.successes = 0
+        self.retries = 0
+        self.retries_denied = 0
+        self.short_circuited = 0
+        self.errors: dict[str, int] = {}
+        # latency of the last `window` calls that reached the backend, in ms
+        self.latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def error(self, kind: str) -> None:
+        with self._lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def latency_percentiles(self) -> dict:
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return {}
+        pick = lambda q: round(samples[min(len(samples) - 1, int(q * len(samples)))], 2)
+        return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "samples": len(samples)}
+
+
+def _new_session() -> requests.Session:
+    # keep-alive connections to the backend, reused across form submits
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=BACKEND_POOL_SIZE, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+session = _new_session()
+retry_budget = RetryBudget(BACKEND_RETRY_RATIO)
+breaker = CircuitBreaker(BACKEND_BREAKER_FAILURES, BACKEND_BREAKER_RESET_SECONDS)
+metrics = ClientMetrics()
+
+
+def _trace_headers() -> dict:
+    request_id = tracing.current_request_id()
+    return {tracing.REQUEST_ID_HEADER: request_id} if request_id else {}
+
+
+def _record_attempt(start: float, attempt: int, status: int | None, server_timing: str | None) -> None:
+    """Latency metrics, plus a span splitting the call into backend time and network/queueing."""
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    metrics.latencies.append(elapsed_ms)
+    span = {"attempt": attempt, "status": status}
+    backend_ms = tracing.parse_server_timing(server_timing).get("total") if server_timing else None
+    if backend_ms is not None:
+        span["backend_ms"] = backend_ms
+        span["network_ms"] = round(elapsed_ms - backend_ms, 3)
+    tracing.add_span("backend_call", elapsed_ms / 1000, **span)
+
+
+def _attempt(url: str, payload: dict, attempt: int = 0) -> tuple[dict | None, str | None, bool]:
+    """One POST. Returns (result, error kind, retryable)."""
+    start = time.perf_counter()
+    resp = None
+    try:
+        resp = session.post(url, json=payload, headers=_trace_headers(),
+                            timeout=(BACKEND_CONNECT_TIMEOUT, BACKEND_READ_TIMEOUT))
+    except requests.ConnectTimeout:
+        return None, "connect_timeout", True
+    except requests.ReadTimeout:
+        # the backend may still be working on it; do not pile on
+        return None, "read_timeout", False
+    except requests.ConnectionError:
+        return None, "connection_error", True
+    except requests.RequestException:
+        # anything else requests can raise (chunked encoding, redirects, invalid URL, ...)
+        return None, "request_error", False
+    finally:
+        _record_attempt(start, attempt, resp.status_code if resp is not None else None,
+                        resp.headers.get("Server-Timing") if resp is not None else None)
+    return _classify(resp.status_code, resp.json)
+
+
+def _classify(status_code: int, body) -> tuple[dict | None, str | None, bool]:
+    if status_code in RETRYABLE_STATUS:
+        return None, f"http_{status_code}", True
+    if not 200 <= status_code < 300:
+        return None, f"http_{status_code}", False
+    try:
+        return body(), None, False
+    except ValueError:
+        return None, "invalid_json", False
+
+
+def _verdict(error: str) -> bool | None:
+    """What a failed call says about the backend: False if it failed, None if nothing."""
+    if error in TRANSPORT_ERRORS or error.startswith("http_5"):
+        return False
+    return None
+
+
+def _should_retry(error: str, retryable: bool, attempt: int) -> bool:
+    metrics.error(error)
+    if not retryable or attempt == BACKEND_MAX_RETRIES:
+        return False
+    if not retry_budget.withdraw():
+        metrics.retries_denied += 1
+        return False
+    metrics.retries += 1
+    return True
+
+
 def predict(payload: dict) -> dict:
+    """
+    Backend prediction, or {} when the backend is unavailable (the view then
+    applies its local fallback). While the circuit breaker is open, {} is
+    returned immediately without a network call.
+    """
     url = f"{BACKEND_BASE_URL}/predict"
+    metrics.calls += 1
+    if not breaker.allow():
+        metrics.short_circuited += 1
+        tracing.add_span("backend_call", 0.0, skipped="circuit_open")
+        return {}
+
+    retry_budget.deposit()
+    # every admitted call settles the breaker, also when something unexpected escapes
+    healthy = False
     try:
-        resp = requests.post(url, json=payload, timeout=10)
-        resp.raise_for_status()
-        return resp.json()
-    except Exception as e:
-        print("API error:", e)
+        for attempt in range(BACKEND_MAX_RETRIES + 1):
+            result, error, retryable = _attempt(url, payload, attempt)
+            if error is None:
+                healthy = True
+                metrics.successes += 1
+                return result
+            if not _should_retry(error, retryable, attempt):
+                break
+            time.sleep(random.uniform(0, 0.05))  # jitter so retries do not arrive in lockstep
+
+        print("API error:", error)
+        healthy = _verdict(error)
         return {}
+    finally:
+        breaker.record(healthy)
+
+
+# --- async client, for the ASGI predict view ---
+
+def _new_async_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(BACKEND_READ_TIMEOUT, connect=BACKEND_CONNECT_TIMEOUT),
+        limits=httpx.Limits(max_connections=BACKEND_POOL_SIZE, max_keepalive_connections=BACKEND_POOL_SIZE),
+    )
+
+
+# (loop, client) of the ASGI server's event loop, which lives as long as the process
+_shared_async_client: tuple[asyncio.AbstractEventLoop, httpx.AsyncClient] | None = None
+
+
+@contextlib.asynccontextmanager
+async def _async_client():
+    """
+    Under ASGI the server runs its event loop in the main thread: one pooled
+    client for the process. Under WSGI, async_to_sync runs each async view in
+    a fresh loop on a worker thread that is closed afterwards, so the client
+    is opened and closed within the call instead of leaking its connections.
+    """
+    global _shared_async_client
+    if threading.current_thread() is not threading.main_thread():
+        async with _new_async_client() as client:
+            yield client
+        return
+    loop = asyncio.get_running_loop()
+    if _shared_async_client is None or _shared_async_client[0] is not loop:
+        _shared_async_client = (loop, _new_async_client())
+    yield _shared_async_client[1]
+
+
+async def _aattempt(client: httpx.AsyncClient, url: str, payload: dict,
+                    attempt: int = 0) -> tuple[dict | None, str | None, bool]:
+    start = time.perf_counter()
+    resp = None
+    try:
+        resp = await client.post(url, json=payload, headers=_trace_headers())
+    except httpx.ConnectTimeout:
+        return None, "connect_timeout", True
+    except httpx.PoolTimeout:
+        # every pooled connection busy for the whole connect timeout
+        return None, "pool_timeout", False
+    except httpx.TimeoutException:
+        return None, "read_timeout", False
+    except httpx.TransportError:
+        return None, "connection_error", True
+    except httpx.HTTPError:
+        return None, "request_error", False
+    finally:
+        _record_attempt(start, attempt, resp.status_code if resp is not None else None,
+                        resp.headers.get("Server-Timing") if resp is not None else None)
+    return _classify(resp.status_code, resp.json)
+
+
+async def apredict(payload: dict) -> dict:
+    """predict() for async views: same retry budget, circuit breaker and metrics."""
+    url = f"{BACKEND_BASE_URL}/predict"
+    metrics.calls += 1
+    if not breaker.allow():
+        metrics.short_circuited += 1
+        tracing.add_span("backend_call", 0.0, skipped="circuit_open")
+        return {}
+
+    retry_budget.deposit()
+    healthy = False
+    try:
+        async with _async_client() as client:
+            for attempt in range(BACKEND_MAX_RETRIES + 1):
+                result, error, retryable = await _aattempt(client, url, payload, attempt)
+                if error is None:
+                    healthy = True
+                    metrics.successes += 1
+                    return result
+                if not _should_retry(error, retryable, attempt):
+                    break
+                await asyncio.sleep(random.uniform(0, 0.05))
+
+        print("API error:", error)
+        healthy = _verdict(error)
+        return {}
+    except asyncio.CancelledError:
+        # the client went away (Django cancels the view): no verdict on the backend,
+        # but a half-open probe must be given back
+        healthy = None
+        raise
+    finally:
+        breaker.record(healthy)
+
+
+def client_metrics() -> dict:
+    """Latency, error and circuit-breaker state of the backend client."""
+    return {
+        "backend": BACKEND_BASE_URL,
+        "calls": metrics.calls,
+        "successes": metrics.successes,
+        "errors": dict(metrics.errors),
+        "retries": metrics.retries,
+        "retries_denied": metrics.retries_denied,
+        "retry_budget_tokens": round(retry_budget.tokens, 2),
+        "short_circuited": metrics.short_circuited,
+        "breaker": {
+            "state": breaker.state,
+            "consecutive_failures": breaker.consecutive_failures,
+            "times_opened": breaker.times_opened,
+        },
+        "latency_ms": metrics.latency_percentiles(),
+    }
 
 
 
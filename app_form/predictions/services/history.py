@@ -0,0 +1,117 @@
+import base64
+import datetime
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from ..models import PredictionRecord
+
+# Columns the history table and API show; nothing else is read from the database.
+LIST_FIELDS = ("id", "name_surname", "loan_amount", "approved", "probability", "grade_subgrade", "created_at")
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidQuery(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime.datetime, pk: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{pk}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, int]:
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidQuery("invalid cursor")
+    if created_at is None:
+        raise InvalidQuery("invalid cursor")
+    return created_at, pk
+
+
+def _parse_bool(value: str) -> bool:
+    if value.lower() in ("true", "1", "yes"):
+        return True
+    if value.lower() in ("false", "0", "no"):
+        return False
+    raise InvalidQuery(f"approved must be true or false, got {value!r}")
+
+
+def _day_start(name: str, value: str) -> datetime.datetime:
+    """Midnight of a YYYY-MM-DD date in the current time zone."""
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise InvalidQuery(f"{name} must be a YYYY-MM-DD date, got {value!r}")
+    return timezone.make_aware(datetime.datetime.combine(parsed, datetime.time.min))
+
+
+def filtered_records(params):
+    """
+    Records matching the query parameters, newest first:
+    approved=true|false, grade=B2 (or a comma-separated list), created_from / created_to (YYYY-MM-DD, inclusive).
+    """
+    records = PredictionRecord.objects.only(*LIST_FIELDS)
+    if params.get("approved"):
+        records = records.filter(approved=_parse_bool(params["approved"]))
+    if params.get("grade"):
+        records = records.filter(grade_subgrade__in=params["grade"].split(","))
+    # plain range comparisons on created_at (not __date) so the indexes apply
+    if params.get("created_from"):
+        records = records.filter(created_at__gte=_day_start("created_from", params["created_from"]))
+    if params.get("created_to"):
+        next_day = _day_start("created_to", params["created_to"]) + datetime.timedelta(days=1)
+        records = records.filter(created_at__lt=next_day)
+    # (created_at, id) is unique and indexed, so it is a stable keyset order
+    return records.order_by("-created_at", "-id")
+
+
+def history_page(params) -> dict:
+    """
+    One page of prediction history with keyset pagination: the cursor is the
+    (created_at, id) of the last row returned, so later pages cost the same as
+    the first one, whatever the table size.
+    """
+    try:
+        limit = int(params.get("limit", DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise InvalidQuery("limit must be an integer")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    records = filtered_records(params)
+    if params.get("cursor"):
+        created_at, pk = decode_cursor(params["cursor"])
+        records = records.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    # one extra row tells whether there is a next page
+    rows = list(records.values(*LIST_FIELDS)[:limit + 1])
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "results": rows,
+        "next_cursor": encode_cursor(rows[-1]["created_at"], rows[-1]["id"]) if has_next else None,
+    }
+
+
+def recent_predictions(limit: int = 10):
+    """Newest records for the table under the form."""
+    return filtered_records({})[:limit]
+
+
+def with_submitted(record, recent, limit: int = 10) -> list:
+    """
+    `recent` with the record just submitted on top. The write-behind writer
+    may not have saved it yet; once it has, bulk_create has set its pk and it
+    is already among `recent`.
+    """
+    recent = list(recent)
+    if record is None or (record.pk is not None and any(r.pk == record.pk for r in recent)):
+        return recent[:limit]
+    return [record, *recent][:limit]
@@ -0,0 +1,167 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+from django.db import DatabaseError, close_old_connections, connection
+
+from ..models import PredictionRecord
+
+# Set to 0 to save every record synchronously on the request path, as before.
+WRITE_BEHIND = os.getenv("PREDICTION_WRITE_BEHIND", "1") != "0"
+FLUSH_SIZE = int(os.getenv("PREDICTION_FLUSH_SIZE", "50"))
+FLUSH_INTERVAL_SECONDS = float(os.getenv("PREDICTION_FLUSH_INTERVAL_SECONDS", "0.5"))
+QUEUE_SIZE = int(os.getenv("PREDICTION_QUEUE_SIZE", "5000"))
+FLUSH_ATTEMPTS = 3
+
+
+class RecordWriter:
+    """
+    Write-behind persistence of prediction records. Requests enqueue unsaved
+    model instances; one background thread saves them with bulk_create, as soon
+    as `flush_size` are waiting or `flush_interval` seconds after the first one
+    arrived. One writer thread means SQLite sees a single writer, and a batch
+    costs one transaction instead of one per request.
+    """
+
+    def __init__(self, flush_size: int, flush_interval: float, queue_size: int, window: int = 1000):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+        self.enqueued = 0
+        self.written = 0
+        self.written_inline = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.flush_errors = 0
+        self.last_batch_size = 0
+        # flush latency of the last `window` batches, in ms
+        self.flush_ms = deque(maxlen=window)
+
+    def _ensure_started(self) -> None:
+        # started lazily in the serving process (after a pre-fork, not in manage.py commands)
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="prediction-writer", daemon=True)
+                self._thread.start()
+
+    def enqueue(self, record: PredictionRecord) -> bool:
+        """Queues the record without blocking; False when the queue is full or shut down."""
+        if self._stopping.is_set():
+            return False
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            return False
+        self.enqueued += 1
+        return True
+
+    def save(self, record: PredictionRecord) -> None:
+        # back-pressure: when the record cannot be queued the request pays for its own write
+        if not self.enqueue(record):
+            record.save()
+            self.written_inline += 1
+
+    async def asave(self, record: PredictionRecord) -> None:
+        if not self.enqueue(record):
+            await record.asave()
+            self.written_inline += 1
+
+    def _next_batch(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.flush_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            stop = batch[-1] is None
+            batch = [record for record in batch if record is not None]
+            if batch:
+                self._flush(batch)
+            if stop:
+                break
+        connection.close()
+
+    def _flush(self, batch: list) -> None:
+        close_old_connections()
+        for attempt in range(FLUSH_ATTEMPTS):
+            start = time.perf_counter()
+            try:
+                PredictionRecord.objects.bulk_create(batch, batch_size=self.flush_size)
+            except DatabaseError as e:
+                self.flush_errors += 1
+                print("Prediction flush error:", e)
+                connection.close()
+                time.sleep(0.1 * 2 ** attempt)
+                continue
+            self.flush_ms.append((time.perf_counter() - start) * 1000)
+            self.flushes += 1
+            self.written += len(batch)
+            self.last_batch_size = len(batch)
+            return
+        self.dropped += len(batch)
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Flushes everything queued so far and stops the writer thread."""
+        self._stopping.set()
+        if self._thread is None or not self._thread.is_alive():
+            return
+        # the sentinel goes behind every queued record
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        samples = sorted(self.flush_ms)
+        pick = lambda q: round(samples[min(len(samples) - 1, int(q * len(samples)))], 2)
+        return {
+            "write_behind": WRITE_BEHIND,
+            "queue_depth": self._queue.qsize(),
+            "queue_capacity": self._queue.maxsize,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "written_inline": self.written_inline,
+            "dropped": self.dropped,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+            "last_batch_size": self.last_batch_size,
+            "flush_ms": {"p50": pick(0.50), "p95": pick(0.95), "max": round(samples[-1], 2)} if samples else {},
+        }
+
+
+writer = RecordWriter(FLUSH_SIZE, FLUSH_INTERVAL_SECONDS, QUEUE_SIZE)
+# gunicorn workers and runserver exit through sys.exit on SIGTERM / Ctrl-C, which runs atexit
+atexit.register(writer.shutdown)
+
+
+def save_prediction(record: PredictionRecord) -> None:
+    if WRITE_BEHIND:
+        writer.save(record)
+    else:
+        record.save()
+
+
+async def asave_prediction(record: PredictionRecord) -> None:
+    """save_prediction() for async views; a synchronous save goes through the async ORM."""
+    if WRITE_BEHIND:
+        await writer.asave(record)
+    else:
+        await record.asave()
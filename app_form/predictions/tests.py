@@ -1,3 +1,58 @@
-from django.test import TestCase
+import asyncio
+import json
+from unittest import mock
 
-# Create your tests here.
+import httpx
+import requests
+from django.test import SimpleTestCase
+
+from predictions.services import api_client
+
+
+def _response(status: int, body: dict | None = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response._content = json.dumps(body or {}).encode()
+    return response
+
+
+class CircuitBreakerVerdictTests(SimpleTestCase):
+    def setUp(self):
+        self.breaker = api_client.CircuitBreaker(failures=2, reset_seconds=0.0)
+        patcher = mock.patch.object(api_client, "breaker", self.breaker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _half_open(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, "open")
+
+    def _predict(self, status: int) -> dict:
+        with mock.patch.object(api_client.session, "post", return_value=_response(status, {"p": 1})):
+            return api_client.predict({})
+
+    def test_client_error_leaves_half_open_breaker_alone(self):
+        self._half_open()
+        self.assertEqual(self._predict(400), {})
+        self.assertEqual(self.breaker.state, "half_open")
+        self.assertEqual(self.breaker.consecutive_failures, 2)
+        # the probe was given back: the next call is let through and decides
+        self.assertEqual(self._predict(200), {"p": 1})
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_client_error_does_not_reset_failure_streak(self):
+        self._predict(500)
+        self._predict(422)
+        self.assertEqual(self.breaker.consecutive_failures, 1)
+        self._predict(500)
+        self.assertEqual(self.breaker.state, "open")
+
+    def test_async_client_error_leaves_half_open_breaker_alone(self):
+        self._half_open()
+        transport = httpx.MockTransport(lambda request: httpx.Response(400, json={"detail": "bad"}))
+        with mock.patch.object(api_client, "_new_async_client", lambda: httpx.AsyncClient(transport=transport)), \
+                mock.patch.object(api_client, "_shared_async_client", None):
+            self.assertEqual(asyncio.run(api_client.apredict({})), {})
+        self.assertEqual(self.breaker.state, "half_open")
+        self.assertTrue(self.breaker.allow())
@@ -0,0 +1,116 @@
+import contextvars
+import logging
+import re
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# IDs from callers are echoed into logs and headers: keep them short and plain
+_VALID_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+# formatted as JSON by the LOGGING setting
+logger = logging.getLogger("predictions.trace")
+
+
+class Trace:
+    __slots__ = ("request_id", "started", "spans")
+
+    def __init__(self, request_id):
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.spans = []
+
+
+_current = contextvars.ContextVar("trace", default=None)
+
+
+def current_request_id():
+    trace = _current.get()
+    return trace.request_id if trace is not None else None
+
+
+def add_span(name, seconds, **attributes):
+    trace = _current.get()
+    if trace is not None:
+        trace.spans.append({"name": name, "ms": round(seconds * 1000, 3), **attributes})
+
+
+class span:
+    """Times a block as a span of the current request: `with span("render"): ...`"""
+
+    def __init__(self, name, **attributes):
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        add_span(self.name, time.perf_counter() - self._start, **self.attributes)
+        return False
+
+
+def parse_server_timing(header):
+    """{"name": ms} from a Server-Timing header ("validation;dur=0.03, total;dur=1.9")."""
+    timings = {}
+    for entry in header.split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur":
+                try:
+                    timings[name] = float(value)
+                except ValueError:
+                    pass
+    return timings
+
+
+class RequestIDMiddleware:
+    """
+    Takes the X-Request-ID of the incoming request (or makes one), makes it
+    available to the backend client, returns it on the response and logs one
+    JSON line per request with its spans. Works under WSGI and ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _begin(self, request):
+        incoming = request.headers.get(REQUEST_ID_HEADER)
+        request_id = incoming if incoming and _VALID_ID.match(incoming) else uuid.uuid4().hex
+        request.request_id = request_id
+        trace = Trace(request_id)
+        return trace, _current.set(trace)
+
+    def _finish(self, request, response, trace, token):
+        _current.reset(token)
+        response[REQUEST_ID_HEADER] = trace.request_id
+        logger.info("request", extra={
+            "request_id": trace.request_id,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round((time.perf_counter() - trace.started) * 1000, 3),
+            "spans": trace.spans,
+        })
+        return response
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        trace, token = self._begin(request)
+        return self._finish(request, self.get_response(request), trace, token)
+
+    async def __acall__(self, request):
+        trace, token = self._begin(request)
+        return self._finish(request, await self.get_response(request), trace, token)
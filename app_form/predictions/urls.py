@@ -1,7 +1,12 @@
 from django.urls import path
-from .views import PredictView, PredictionRecordDetailView
+from .views import AsyncPredictView, BackendClientMetricsView, PersistenceStatsView, PredictionHistoryView, PredictView, PredictionRecordDetailView
 
 urlpatterns = [
     path("", PredictView.as_view(), name="predict_form"),
+    # same form served by the async view; run under ASGI (uvicorn loan_site.asgi:application)
+    path("async/", AsyncPredictView.as_view(), name="predict_form_async"),
     path("detail/<int:pk>/", PredictionRecordDetailView.as_view(), name="detail"),
+    path("api/predictions/", PredictionHistoryView.as_view(), name="prediction_history"),
+    path("stats/backend-client/", BackendClientMetricsView.as_view(), name="backend_client_stats"),
+    path("stats/persistence/", PersistenceStatsView.as_view(), name="persistence_stats"),
 ]
@@ -1,26 +1,82 @@
+from django.http import JsonResponse
 from django.shortcuts import render
 from django.views import View
-from .services.api_client import predict
+from .services.api_client import apredict, client_metrics, predict
+from .services.history import InvalidQuery, history_page, recent_predictions, with_submitted
+from .services.persistence import asave_prediction, save_prediction, writer
 from .predict_form import PredictForm
+from .tracing import span
 from .models import PredictionRecord
 from django.views.generic import ListView
 from django.views.generic import DetailView
 
 
+GRADES = [
+    "A1", "A2", "A3", "A4", "A5",
+    "B1", "B2", "B3", "B4", "B5",
+    "C1", "C2", "C3", "C4", "C5",
+    "D1", "D2", "D3", "D4", "D5",
+    "E1", "E2", "E3", "E4", "E5",
+    "F1", "F2", "F3", "F4", "F5",
+]
+
+
+def prediction_from_api(payload, api_result):
+    """(prediction_result, message, errors) from the backend answer, or the local fallback rule."""
+    if api_result and "approved" in api_result and "probability" in api_result:
+        prediction_result = {
+            "approved": api_result["approved"],
+            "probability": round(api_result["probability"], 1),
+        }
+        return prediction_result, "Prediction from API successful.", []
+
+    try:
+        income = float(payload.get("annual_income", 0))
+        loan = float(payload.get("loan_amount", 0))
+        if income > 0 and loan > 0 and income / loan > 2:
+            approved = True
+            probability = 0.85
+        else:
+            approved = False
+            probability = 0.35
+        prediction_result = {
+            "approved": approved,
+            "probability": round(probability, 1),
+        }
+        return prediction_result, "Fallback prediction logic applied.", []
+    except ValueError:
+        return None, None, ["Invalid numeric input. Please check your values."]
+
+
+def build_record(request, payload, prediction_result):
+    return PredictionRecord(
+        name_surname=request.POST.get("name_surname") or payload.get("name_surname"),
+        annual_income=payload.get("annual_income"),
+        debt_to_income_ratio=payload.get("debt_to_income_ratio"),
+        credit_score=payload.get("credit_score"),
+        loan_amount=payload.get("loan_amount"),
+        interest_rate=payload.get("interest_rate"),
+        gender=payload.get("gender"),
+        marital_status=payload.get("marital_status"),
+        education_level=payload.get("education_level"),
+        employment_status=payload.get("employment_status"),
+        loan_purpose=payload.get("loan_purpose"),
+        grade_subgrade=payload.get("grade_subgrade"),
+        approved=prediction_result["approved"],
+        probability=prediction_result["probability"],
+    )
+
+
+def form_errors(form):
+    return [f"{field}: {error}" for field, error_list in form.errors.items() for error in error_list]
+
+
 class PredictView(View):
     template_name = "predictions/predict.html"
 
     def get(self, request):
         form = PredictForm()
-        grades = [
-            "A1", "A2", "A3", "A4", "A5",
-            "B1", "B2", "B3", "B4", "B5",
-            "C1", "C2", "C3", "C4", "C5",
-            "D1", "D2", "D3", "D4", "D5",
-            "E1", "E2", "E3", "E4", "E5",
-            "F1", "F2", "F3", "F4", "F5",
-        ]
-        predictions = PredictionRecord.objects.all().order_by("-created_at")
+        predictions = recent_predictions()
         return render(
             request,
             self.template_name,
@@ -28,7 +84,7 @@ class PredictView(View):
                 "form": form,
                 "form_data": {},
                 "message": None,
-                "grades": grades,
+                "grades": GRADES,
                 "predictions": predictions,
             },
         )
@@ -37,57 +93,82 @@ class PredictView(View):
         form = PredictForm(request.POST)
         message = None
         prediction_result = None
+        record = None
         errors = []
 
-        if form.is_valid():
+        with span("form_validation"):
+            valid = form.is_valid()
+        if valid:
             payload = form.cleaned_data
-            api_result = predict(payload)
-
-            if api_result and "approved" in api_result and "probability" in api_result:
-                prediction_result = {
-                    "approved": api_result["approved"],
-                    "probability": round(api_result["probability"], 1),
-                }
-                message = "Prediction from API successful."
-            else:
-                try:
-                    income = float(payload.get("annual_income", 0))
-                    loan = float(payload.get("loan_amount", 0))
-                    if income > 0 and loan > 0 and income / loan > 2:
-                        approved = True
-                        probability = 0.85
-                    else:
-                        approved = False
-                        probability = 0.35
-                    prediction_result = {
-                        "approved": approved,
-                        "probability": round(probability, 1),
-                    }
-                    message = "Fallback prediction logic applied."
-                except ValueError:
-                    errors.append("Invalid numeric input. Please check your values.")
-
-            # Save to database
+            prediction_result, message, errors = prediction_from_api(payload, predict(payload))
+
+            # Queued for the background writer (see services/persistence.py)
             if prediction_result:
-                PredictionRecord.objects.create(
-                    name_surname=request.POST.get("name_surname") or payload.get("name_surname"),
-                    annual_income=payload.get("annual_income"),
-                    debt_to_income_ratio=payload.get("debt_to_income_ratio"),
-                    credit_score=payload.get("credit_score"),
-                    loan_amount=payload.get("loan_amount"),
-                    interest_rate=payload.get("interest_rate"),
-                    gender=payload.get("gender"),
-                    marital_status=payload.get("marital_status"),
-                    education_level=payload.get("education_level"),
-                    employment_status=payload.get("employment_status"),
-                    loan_purpose=payload.get("loan_purpose"),
-                    grade_subgrade=payload.get("grade_subgrade"),
-                    approved=prediction_result["approved"],
-                    probability=prediction_result["probability"],
-                )
+                record = build_record(request, payload, prediction_result)
+                with span("persist"):
+                    save_prediction(record)
+
+        else:
+            errors = form_errors(form)
+
+        context = {
+            "form": form,
+            "form_data": request.POST,
+            "message": message,
+            "prediction_result": prediction_result,
+            "errors": errors,
+            "grades": GRADES,
+            # Latest predictions for the table under the form; older ones via the history API
+            "predictions": with_submitted(record, recent_predictions()),
+        }
+        with span("render"):
+            return render(request, self.template_name, context)
+
+
+class AsyncPredictView(View):
+    """
+    PredictView for ASGI servers: the backend call goes through the async
+    pooled client and the database through the async ORM, so one process keeps
+    serving other requests while submits wait on the backend.
+    """
+
+    template_name = "predictions/predict.html"
+
+    async def get(self, request):
+        predictions = [record async for record in recent_predictions()]
+        return render(
+            request,
+            self.template_name,
+            {
+                "form": PredictForm(),
+                "form_data": {},
+                "message": None,
+                "grades": GRADES,
+                "predictions": predictions,
+            },
+        )
 
+    async def post(self, request):
+        form = PredictForm(request.POST)
+        message = None
+        prediction_result = None
+        record = None
+        errors = []
+
+        with span("form_validation"):
+            valid = form.is_valid()
+        if valid:
+            payload = form.cleaned_data
+            prediction_result, message, errors = prediction_from_api(payload, await apredict(payload))
+            if prediction_result:
+                record = build_record(request, payload, prediction_result)
+                with span("persist"):
+                    await asave_prediction(record)
         else:
-            errors = [f"{field}: {error}" for field, error_list in form.errors.items() for error in error_list]
+            errors = form_errors(form)
+
+        with span("history_query"):
+            predictions = with_submitted(record, [row async for row in recent_predictions()])
 
         context = {
             "form": form,
@@ -95,19 +176,12 @@ class PredictView(View):
             "message": message,
             "prediction_result": prediction_result,
             "errors": errors,
+            "grades": GRADES,
+            # evaluated above: templates cannot run queries from an async context
+            "predictions": predictions,
         }
-        grades = [
-            "A1", "A2", "A3", "A4", "A5",
-            "B1", "B2", "B3", "B4", "B5",
-            "C1", "C2", "C3", "C4", "C5",
-            "D1", "D2", "D3", "D4", "D5",
-            "E1", "E2", "E3", "E4", "E5",
-            "F1", "F2", "F3", "F4", "F5",
-        ]
-        context["grades"] = grades
-        # Include all predictions in context for display
-        context["predictions"] = PredictionRecord.objects.all().order_by("-created_at")
-        return render(request, "predictions/predict.html", context)
+        with span("render"):
+            return render(request, self.template_name, context)
 
 
 
@@ -122,3 +196,33 @@ class PredictionRecordDetailView(DetailView):
    model = PredictionRecord
    template_name = "predictions/prediction_detail.html"
    context_object_name = "record"
+
+
+
+class BackendClientMetricsView(View):
+    """Latency, errors and circuit-breaker state of the backend API client."""
+
+    def get(self, request):
+        return JsonResponse(client_metrics())
+
+
+
+class PredictionHistoryView(View):
+    """
+    Paginated prediction history as JSON: ?limit=&cursor= plus the filters
+    approved, grade, created_from and created_to.
+    """
+
+    def get(self, request):
+        try:
+            return JsonResponse(history_page(request.GET))
+        except InvalidQuery as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+
+
+class PersistenceStatsView(View):
+    """Queue depth and flush latency of the background prediction writer."""
+
+    def get(self, request):
+        return JsonResponse(writer.stats())
@@ -0,0 +1,4 @@
+import time
+
+# Reference point for the startup timings reported on /readyz.
+IMPORT_STARTED = time.perf_counter()
@@ -0,0 +1,273 @@
+"""
+NumPy-only scorer for pipelines exported by models/export_model.py.
+
+An export is a directory with a manifest.json (column layout, one-hot
+vocabularies, estimator kind and scalars) and one .npy file per array
+(scaler parameters, tree node arrays, support vectors or coefficients).
+Arrays are opened with np.load(mmap_mode="r"), so loading touches almost no
+memory and several workers share the same pages.
+
+ArrayModel exposes the FastPipeline engine interface (transform,
+encode_one, proba_encoded, predict_proba_one, predict_proba), and needs
+neither sklearn, pandas, scipy nor lightgbm at import or load time. The
+backend serves it with INFERENCE_ENGINE=arrays (see app/inference.py).
+"""
+
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+# LightGBM missing_type codes, as written by the exporter
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+# LightGBM's kZeroThreshold
+_ZERO_THRESHOLD = 1e-35
+# libsvm's min_prob
+_SVM_MIN_PROB = 1e-7
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-z))
+
+
+class _Trees:
+    """
+    Gradient-boosted trees, traversed for all rows and all trees at once.
+    Leaves are nodes whose children point back at themselves, so max_depth
+    steps land every row on its leaf without masking finished trees.
+    """
+
+    def __init__(self, manifest: dict, arrays: dict):
+        self.feature = arrays["tree_feature"]
+        self.threshold = arrays["tree_threshold"]
+        self.left = arrays["tree_left"]
+        self.right = arrays["tree_right"]
+        self.default_left = arrays["tree_default_left"]
+        self.missing_type = arrays["tree_missing_type"]
+        self.value = arrays["tree_value"]
+        self.roots = arrays["tree_roots"]
+        self.max_depth = manifest["max_depth"]
+        self.sigmoid = manifest["sigmoid"]
+        self.average_output = manifest["average_output"]
+        # most models never route on zero/NaN; skip that work when none does
+        self._default_splits = bool((np.asarray(self.missing_type) != MISSING_NONE).any())
+
+    def raw_score(self, X: np.ndarray) -> np.ndarray:
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.tile(self.roots, (X.shape[0], 1))
+        has_nan = bool(np.isnan(X).any())
+        for _ in range(self.max_depth):
+            fval = X[rows, self.feature[node]]
+            # same decision as LightGBM's NumericalDecision
+            if has_nan or self._default_splits:
+                missing_type = self.missing_type[node]
+                nan = np.isnan(fval)
+                fval = np.where(nan & (missing_type != MISSING_NAN), 0.0, fval)
+                use_default = (
+                    ((missing_type == MISSING_ZERO) & (np.abs(fval) <= _ZERO_THRESHOLD))
+                    | ((missing_type == MISSING_NAN) & nan)
+                )
+                go_left = np.where(use_default, self.default_left[node], fval <= self.threshold[node])
+            else:
+                go_left = fval <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+
+        raw = self.value[node].sum(axis=1)
+        if self.average_output:
+            raw /= len(self.roots)
+        return raw
+
+    def proba(self, X: np.ndarray) -> np.ndarray:
+        return _sigmoid(self.sigmoid * self.raw_score(X))
+
+
+class _SVC:
+    """Kernel SVC with Platt scaling (sklearn SVC(probability=True), binary)."""
+
+    def __init__(self, manifest: dict, arrays: dict):
+        self.support_vectors = arrays["svc_support_vectors"]
+        self.dual_coef = arrays["svc_dual_coef"]
+        self.kernel = manifest["kernel"]
+        self.gamma = manifest["gamma"]
+        self.coef0 = manifest["coef0"]
+        self.degree = manifest["degree"]
+        self.intercept = manifest["intercept"]
+        self.prob_a = manifest["prob_a"]
+        self.prob_b = manifest["prob_b"]
+        if self.kernel == "rbf":
+            self._sv_sq_norms = np.einsum("ij,ij->i", self.support_vectors, self.support_vectors)
+
+    def _kernel(self, X: np.ndarray) -> np.ndarray:
+        dot = X @ self.support_vectors.T
+        if self.kernel == "linear":
+            return dot
+        if self.kernel == "rbf":
+            sq = np.einsum("ij,ij->i", X, X)[:, None] - 2.0 * dot + self._sv_sq_norms[None, :]
+            return np.exp(-self.gamma * np.maximum(sq, 0.0))
+        if self.kernel == "poly":
+            return (self.gamma * dot + self.coef0) ** self.degree
+        return np.tanh(self.gamma * dot + self.coef0)
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        return self._kernel(X) @ self.dual_coef + self.intercept
+
+    def proba(self, X: np.ndarray) -> np.ndarray:
+        # libsvm's Platt sigmoid on its internal (sign-flipped) decision value
+        # is the pairwise P(classes_[0] | 0 or 1), clipped like libsvm does
+        f = -self.decision_function(X) * self.prob_a + self.prob_b
+        with np.errstate(over="ignore"):
+            r01 = np.where(f >= 0, np.exp(-f) / (1.0 + np.exp(-f)), 1.0 / (1.0 + np.exp(f)))
+        r01 = np.clip(r01, _SVM_MIN_PROB, 1 - _SVM_MIN_PROB)
+        if len(r01) == 1:
+            # the vectorized loop costs more than plain floats for one row
+            return np.array([_couple_one(float(r01[0]))])
+        return _couple_two_classes(r01)
+
+
+def _couple_two_classes(r01: np.ndarray) -> np.ndarray:
+    """
+    libsvm's multiclass_probability() for k=2, vectorized over rows: the
+    iterative pairwise coupling sklearn's SVC runs even for two classes. It
+    stops at a loose tolerance, so it is replicated step by step rather than
+    replaced by the closed form. Returns P(classes_[1]).
+    """
+    r10 = 1.0 - r01
+    q00, q11, q01 = r10 * r10, r01 * r01, -r10 * r01
+    p0 = np.full_like(r01, 0.5)
+    p1 = np.full_like(r01, 0.5)
+    active = np.ones(r01.shape, dtype=bool)
+    eps = 0.005 / 2
+    for _ in range(100):
+        qp0 = q00 * p0 + q01 * p1
+        qp1 = q01 * p0 + q11 * p1
+        pqp = p0 * qp0 + p1 * qp1
+        active &= np.maximum(np.abs(qp0 - pqp), np.abs(qp1 - pqp)) >= eps
+        if not active.any():
+            break
+
+        # t = 0
+        diff = (pqp - qp0) / q00
+        n0 = p0 + diff
+        pqp = (pqp + diff * (diff * q00 + 2 * qp0)) / (1 + diff) / (1 + diff)
+        qp1 = (qp1 + diff * q01) / (1 + diff)
+        n0 /= 1 + diff
+        n1 = p1 / (1 + diff)
+
+        # t = 1
+        diff = (pqp - qp1) / q11
+        n1 += diff
+        n0 /= 1 + diff
+        n1 /= 1 + diff
+
+        p0 = np.where(active, n0, p0)
+        p1 = np.where(active, n1, p1)
+    return p1
+
+
+def _couple_one(r01: float) -> float:
+    """_couple_two_classes for a single row, on Python floats."""
+    r10 = 1.0 - r01
+    q00, q11, q01 = r10 * r10, r01 * r01, -r10 * r01
+    p0 = p1 = 0.5
+    eps = 0.005 / 2
+    for _ in range(100):
+        qp0 = q00 * p0 + q01 * p1
+        qp1 = q01 * p0 + q11 * p1
+        pqp = p0 * qp0 + p1 * qp1
+        if max(abs(qp0 - pqp), abs(qp1 - pqp)) < eps:
+            break
+        diff = (pqp - qp0) / q00
+        p0 += diff
+        pqp = (pqp + diff * (diff * q00 + 2 * qp0)) / (1 + diff) / (1 + diff)
+        qp1 = (qp1 + diff * q01) / (1 + diff)
+        p0 /= 1 + diff
+        p1 /= 1 + diff
+        diff = (pqp - qp1) / q11
+        p1 += diff
+        p0 /= 1 + diff
+        p1 /= 1 + diff
+    return p1
+
+
+class _Linear:
+    """Logistic regression (binary)."""
+
+    def __init__(self, manifest: dict, arrays: dict):
+        self.coef = arrays["linear_coef"]
+        self.intercept = manifest["intercept"]
+
+    def proba(self, X: np.ndarray) -> np.ndarray:
+        return _sigmoid(X @ self.coef + self.intercept)
+
+
+_ESTIMATORS = {"lightgbm": _Trees, "svc": _SVC, "logistic": _Linear}
+
+
+class ArrayModel:
+    engine = "arrays"
+
+    def __init__(self, path: str | Path, mmap_mode: str | None = "r"):
+        path = Path(path)
+        manifest = json.loads((path / "manifest.json").read_text())
+        if manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported export format {manifest.get('format_version')!r}")
+
+        arrays = {
+            name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode, allow_pickle=False)
+            for name in manifest["arrays"]
+        }
+
+        self.path = path
+        self.manifest = manifest
+        self.feature_columns = manifest["feature_columns"]
+        self.n_features = manifest["n_features"]
+
+        # (column, {category: output index}) for every one-hot encoded column
+        self.categorical = [
+            (column, {value: position + i for i, value in enumerate(categories)})
+            for column, position, categories in manifest["categorical"]
+        ]
+        self.numeric_columns = manifest["numeric"]["columns"]
+        self.numeric_index = np.asarray(manifest["numeric"]["index"], dtype=np.intp)
+        # x' = (x - offset) / scale * mul + add (MinMaxScaler uses mul/add)
+        self.numeric_offset = arrays["numeric_offset"]
+        self.numeric_scale = arrays["numeric_scale"]
+        self.numeric_mul = arrays["numeric_mul"]
+        self.numeric_add = arrays["numeric_add"]
+
+        self.estimator = _ESTIMATORS[manifest["estimator"]](manifest, arrays)
+
+    def transform(self, payloads: list[dict]) -> np.ndarray:
+        X = np.zeros((len(payloads), self.n_features), dtype=np.float64)
+        for column, mapping in self.categorical:
+            for i, payload in enumerate(payloads):
+                idx = mapping.get(payload.get(column))
+                if idx is not None:
+                    X[i, idx] = 1.0
+        raw = np.array(
+            [[math.nan if p.get(c) is None else p.get(c) for c in self.numeric_columns] for p in payloads],
+            dtype=np.float64,
+        ).reshape(len(payloads), len(self.numeric_columns))
+        X[:, self.numeric_index] = (raw - self.numeric_offset) / self.numeric_scale * self.numeric_mul + self.numeric_add
+        return X
+
+    def encode_one(self, payload: dict) -> np.ndarray:
+        return self.transform([payload])
+
+    def proba_encoded(self, X: np.ndarray, num_threads: int = 0) -> np.ndarray:
+        """Probabilities of class 1 for rows encoded by transform (num_threads is ignored: NumPy only)."""
+        return self.estimator.proba(X)
+
+    def predict_proba(self, payloads: list[dict]) -> np.ndarray:
+        """Probabilities of class 1, in input order."""
+        return self.estimator.proba(self.transform(payloads))
+
+    def predict_proba_one(self, payload: dict) -> float:
+        return float(self.predict_proba([payload])[0])
+
+
+def load(path: str | Path, mmap_mode: str | None = "r") -> ArrayModel:
+    return ArrayModel(path, mmap_mode=mmap_mode)
@@ -0,0 +1,152 @@
+"""
+Audio ingestion for /voice-form.
+
+Starlette spools the whole multipart body (to memory, then to a temporary
+file) before the endpoint runs, so the byte cap is enforced twice:
+UploadLimitMiddleware rejects an oversized request before its body is read
+(Content-Length) or as soon as it grows past the limit (chunked uploads), and
+read_upload reads the spooled file in fixed-size chunks with the same cap
+(hashing as it goes, for the extraction cache). The module can also downsample the recording to compact mono Opus with ffmpeg before it
+is sent to Gemini. Transcoding is optional: without ffmpeg, or when it does
+not make the payload smaller, the original bytes are sent unchanged.
+"""
+
+import asyncio
+import hashlib
+import os
+import shutil
+from dataclasses import dataclass
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+AUDIO_MAX_BYTES = int(os.getenv("AUDIO_MAX_BYTES", str(10 * 1024 * 1024)))
+AUDIO_CHUNK_BYTES = 64 * 1024
+# whole request: the audio plus multipart boundaries and part headers
+AUDIO_MAX_REQUEST_BYTES = AUDIO_MAX_BYTES + 64 * 1024
+
+AUDIO_TRANSCODE = os.getenv("AUDIO_TRANSCODE", "0") == "1"
+AUDIO_SAMPLE_RATE = int(os.getenv("AUDIO_SAMPLE_RATE", "16000"))
+AUDIO_BITRATE = os.getenv("AUDIO_BITRATE", "24k")
+AUDIO_TRANSCODE_TIMEOUT_SECONDS = float(os.getenv("AUDIO_TRANSCODE_TIMEOUT_SECONDS", "20"))
+
+FFMPEG = shutil.which("ffmpeg")
+
+
+@dataclass
+class UploadedAudio:
+    data: bytes
+    mime_type: str
+    sha256: str
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI guard for upload routes: answers 413 without reading the body when
+    Content-Length is over max_bytes, and stops a request without one once the
+    bytes received pass it, before Starlette has spooled the rest.
+    """
+
+    def __init__(self, app, paths: tuple[str, ...], max_bytes: int):
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+        self.detail = f"Request body is larger than {max_bytes // 1024} KiB."
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        length = dict(scope["headers"]).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > self.max_bytes:
+            await JSONResponse({"detail": self.detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # raised inside form parsing; FastAPI passes HTTPException through
+                    raise HTTPException(status_code=413, detail=self.detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def read_upload(upload: UploadFile, max_bytes: int | None = None) -> UploadedAudio:
+    """
+    Reads the upload chunk by chunk and rejects it once it passes max_bytes.
+    This runs after Starlette has spooled the body; UploadLimitMiddleware is
+    what bounds the bytes received.
+    """
+    if max_bytes is None:
+        max_bytes = AUDIO_MAX_BYTES
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"Audio upload is larger than {max_bytes // 1024} KiB.",
+    )
+    # multipart parsing already knows the size; fail before reading anything
+    if upload.size is not None and upload.size > max_bytes:
+        raise too_large
+
+    digest = hashlib.sha256()
+    chunks = []
+    total = 0
+    while chunk := await upload.read(AUDIO_CHUNK_BYTES):
+        total += len(chunk)
+        if total > max_bytes:
+            raise too_large
+        digest.update(chunk)
+        chunks.append(chunk)
+
+    return UploadedAudio(
+        data=b"".join(chunks),
+        mime_type=upload.content_type or "audio/webm",
+        sha256=digest.hexdigest(),
+    )
+
+
+async def downsample(audio: UploadedAudio) -> tuple[bytes, str]:
+    """
+    Transcodes to mono Opus at AUDIO_SAMPLE_RATE / AUDIO_BITRATE when enabled.
+    Returns the bytes and MIME type to send to Gemini.
+    """
+    if not AUDIO_TRANSCODE or FFMPEG is None:
+        return audio.data, audio.mime_type
+
+    proc = await asyncio.create_subprocess_exec(
+        FFMPEG, "-hide_banner", "-loglevel", "error",
+        "-i", "pipe:0",
+        "-vn", "-ac", "1", "-ar", str(AUDIO_SAMPLE_RATE),
+        "-c:a", "libopus", "-b:a", AUDIO_BITRATE,
+        "-f", "ogg", "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        out, err = await asyncio.wait_for(
+            proc.communicate(audio.data), AUDIO_TRANSCODE_TIMEOUT_SECONDS
+        )
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        print("Audio transcode timed out, sending original audio")
+        return audio.data, audio.mime_type
+
+    if proc.returncode != 0 or not out:
+        print("Audio transcode failed, sending original audio:", err.decode(errors="replace")[:200])
+        return audio.data, audio.mime_type
+    if len(out) >= audio.size:
+        # already compact (e.g. short browser Opus recording)
+        return audio.data, audio.mime_type
+    return out, "audio/ogg"
@@ -0,0 +1,191 @@
+"""
+Dynamic micro-batching for /predict.
+
+Concurrent requests are queued and collected into one batch for up to
+max_wait_ms or max_batch_size items, then scored with a single vectorized
+call in a worker thread. Each caller awaits its own future and gets back only
+its own result.
+"""
+
+import asyncio
+import time
+from collections import Counter
+
+from app import tracing
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the batcher queue has reached max_queue_depth."""
+
+
+class BatcherStats:
+    def __init__(self):
+        self.submitted = 0
+        self.rejected = 0
+        self.batches = 0
+        self.items_scored = 0
+        self.errors = 0
+        self.max_batch_size_seen = 0
+        self.max_queue_depth_seen = 0
+        self.total_queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        # batch size histogram, bucketed by powers of two (1, 2, 4, 8, ...)
+        self.batch_size_buckets = Counter()
+
+    def record_batch(self, size: int, waits: list[float]) -> None:
+        self.batches += 1
+        self.items_scored += size
+        self.max_batch_size_seen = max(self.max_batch_size_seen, size)
+        self.batch_size_buckets[1 << (size - 1).bit_length()] += 1
+        self.total_queue_wait += sum(waits)
+        self.max_queue_wait = max(self.max_queue_wait, max(waits))
+
+    def as_dict(self) -> dict:
+        return {
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "items_scored": self.items_scored,
+            "errors": self.errors,
+            "mean_batch_size": round(self.items_scored / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size_seen": self.max_batch_size_seen,
+            "max_queue_depth_seen": self.max_queue_depth_seen,
+            "mean_queue_wait_ms": round(self.total_queue_wait / self.items_scored * 1000, 3)
+            if self.items_scored else 0.0,
+            "max_queue_wait_ms": round(self.max_queue_wait * 1000, 3),
+            "batch_size_histogram": {
+                f"<={size}": count for size, count in sorted(self.batch_size_buckets.items())
+            },
+        }
+
+
+class _Pending:
+    __slots__ = ("payload", "future", "queued_at", "dispatched_at", "scored_at", "batch_size")
+
+    def __init__(self, payload: dict, future: asyncio.Future):
+        self.payload = payload
+        self.future = future
+        self.queued_at = time.perf_counter()
+        self.dispatched_at = None
+        self.scored_at = None
+        self.batch_size = 0
+
+
+class MicroBatcher:
+    def __init__(self, score_batch, max_batch_size: int = 64, max_wait_ms: float = 2.0,
+                 max_queue_depth: int = 1024):
+        """
+        score_batch: sync callable taking a list of payloads and returning a
+        list of results in the same order. It runs in a worker thread.
+        """
+        self.score_batch = score_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_queue_depth = max_queue_depth
+        self.stats = BatcherStats()
+
+        self._queue: asyncio.Queue | None = None
+        self._batch_ready: asyncio.Event | None = None
+        self._worker: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_depth)
+        self._batch_ready = asyncio.Event()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        # fail whatever is still waiting so no caller hangs
+        while self._queue is not None and not self._queue.empty():
+            pending = self._queue.get_nowait()
+            if not pending.future.done():
+                pending.future.set_exception(RuntimeError("Prediction batcher stopped"))
+
+    async def submit(self, payload: dict):
+        """Queues one payload and waits for its result."""
+        pending = _Pending(payload, asyncio.get_running_loop().create_future())
+        try:
+            self._queue.put_nowait(pending)
+        except asyncio.QueueFull:
+            self.stats.rejected += 1
+            raise QueueFullError(f"Prediction queue is full ({self.max_queue_depth} pending)")
+
+        self.stats.submitted += 1
+        depth = self._queue.qsize()
+        self.stats.max_queue_depth_seen = max(self.stats.max_queue_depth_seen, depth)
+        # the collector already holds the head of the batch outside the queue
+        if depth + 1 >= self.max_batch_size:
+            self._batch_ready.set()
+        result = await pending.future
+        # scoring ran in the batcher's thread; attribute its timing to this request
+        tracing.add_span("batch_queue_wait", pending.dispatched_at - pending.queued_at)
+        tracing.add_span("batch_score", pending.scored_at - pending.dispatched_at, batch_size=pending.batch_size)
+        return result
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+
+        if self._queue.qsize() + 1 < self.max_batch_size and self.max_wait > 0:
+            # wait for more requests until the batch fills up or max_wait passes
+            self._batch_ready.clear()
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.max_wait)
+            except asyncio.TimeoutError:
+                pass
+
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            # callers that went away (client disconnect) are skipped
+            batch = [pending for pending in batch if not pending.future.done()]
+            if not batch:
+                continue
+
+            now = time.perf_counter()
+            payloads = [pending.payload for pending in batch]
+            try:
+                results = await asyncio.to_thread(self.score_batch, payloads)
+            except Exception as e:
+                self.stats.errors += 1
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(e)
+                continue
+
+            scored_at = time.perf_counter()
+            self.stats.record_batch(len(batch), [now - pending.queued_at for pending in batch])
+            for pending, result in zip(batch, results):
+                pending.dispatched_at = now
+                pending.scored_at = scored_at
+                pending.batch_size = len(batch)
+                if not pending.future.done():
+                    pending.future.set_result(result)
+
+    def snapshot(self) -> dict:
+        return {
+            "running": self.running,
+            "queue_depth": self.queue_depth(),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_queue_depth": self.max_queue_depth,
+            **self.stats.as_dict(),
+        }
@@ -0,0 +1,176 @@
+"""
+Offline bulk scoring of CSV / JSONL files with the /predict model.
+
+The input is streamed in fixed-size chunks (pandas chunked readers), each
+chunk is scored in one vectorized call by a pool of worker processes that
+load the model once, and results are appended to the output (CSV, or
+Parquet if pyarrow is installed) in input order as soon as they are ready.
+At most --in-flight chunks exist at any time, so memory stays bounded by
+the chunk size, not the file size.
+
+    cd backend
+    python -m app.bulk_score ../raw_data/test.csv --out scores.csv
+    python -m app.bulk_score applicants.jsonl --out scores.parquet --workers 4 --chunk-size 50000
+
+Output columns: the --id-column (or the row number), `approved` and
+`probability` (percent, as returned by /predict).
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app import inference
+
+# set in each worker by _init_worker
+_version: str | None = None
+
+
+def _init_worker(model_file: str | None, threads: int) -> None:
+    """Loads the model once per process and caps its native thread pools."""
+    global _version
+    from threadpoolctl import threadpool_limits
+
+    # one process per core: LightGBM/OpenMP and BLAS must not fan out again
+    threadpool_limits(limits=threads)
+    inference.load_model()
+    if model_file:
+        _version = "bulk"
+        inference.registry.load(
+            inference.DEFAULT_MODEL_NAME, _version, inference.resolve_model_file(model_file), activate=False
+        )
+
+
+def score_chunk(frame: pd.DataFrame, id_column: str, first_row: int) -> pd.DataFrame:
+    payloads = frame.reindex(columns=inference.FEATURE_COLUMNS).to_dict("records")
+    probas = inference.predict_probabilities(payloads, _version)
+    ids = frame[id_column].to_numpy() if id_column in frame else np.arange(first_row, first_row + len(frame))
+    return pd.DataFrame({
+        id_column: ids,
+        "approved": probas > 0.5,
+        "probability": np.round(probas * 100, 2),
+    })
+
+
+def read_chunks(path: Path, chunk_size: int):
+    if path.suffix in (".jsonl", ".ndjson"):
+        return pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False)
+    return pd.read_csv(path, chunksize=chunk_size)
+
+
+class CSVWriter:
+    def __init__(self, path: Path):
+        self._file = open(path, "w", newline="")
+        self._header = True
+
+    def write(self, frame: pd.DataFrame) -> None:
+        frame.to_csv(self._file, header=self._header, index=False)
+        self._header = False
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetWriter:
+    def __init__(self, path: Path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow), or use a .csv output")
+        self._pa = pa
+        self._pq = pq
+        self._path = path
+        self._writer = None
+
+    def write(self, frame: pd.DataFrame) -> None:
+        table = self._pa.Table.from_pandas(frame, preserve_index=False)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self._path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def open_writer(path: Path):
+    return ParquetWriter(path) if path.suffix == ".parquet" else CSVWriter(path)
+
+
+def run(input_path: Path, output_path: Path, chunk_size: int, workers: int, in_flight: int,
+        id_column: str, model_file: str | None, threads: int) -> dict:
+    writer = open_writer(output_path)
+    rows = 0
+    start = last_report = time.perf_counter()
+
+    def emit(result: pd.DataFrame) -> None:
+        nonlocal rows, last_report
+        writer.write(result)
+        rows += len(result)
+        now = time.perf_counter()
+        if now - last_report >= 5:
+            print(f"  {rows:>12,} rows  {rows / (now - start):>10,.0f} rows/s", file=sys.stderr)
+            last_report = now
+
+    try:
+        if workers <= 1:
+            _init_worker(model_file, threads)
+            first_row = 0
+            for chunk in read_chunks(input_path, chunk_size):
+                emit(score_chunk(chunk, id_column, first_row))
+                first_row += len(chunk)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(model_file, threads)) as pool:
+                # FIFO of futures: output keeps input order, memory holds <= in_flight chunks
+                pending = deque()
+                first_row = 0
+                for chunk in read_chunks(input_path, chunk_size):
+                    pending.append(pool.submit(score_chunk, chunk, id_column, first_row))
+                    first_row += len(chunk)
+                    while len(pending) >= in_flight:
+                        emit(pending.popleft().result())
+                while pending:
+                    emit(pending.popleft().result())
+    finally:
+        writer.close()
+
+    seconds = time.perf_counter() - start
+    return {"rows": rows, "seconds": round(seconds, 3), "rows_per_second": round(rows / seconds) if seconds else None}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("input", type=Path, help=".csv or .jsonl file of applicants")
+    parser.add_argument("--out", type=Path, required=True, help="output .csv or .parquet")
+    parser.add_argument("--chunk-size", type=int, default=20000, help="rows per chunk")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="scoring processes (1: in-process)")
+    parser.add_argument("--in-flight", type=int, help="chunks queued or being scored (default: 2 x workers)")
+    parser.add_argument("--threads", type=int, default=1, help="native threads per worker")
+    parser.add_argument("--id-column", default="id")
+    parser.add_argument("--model-file", help="model file in app/models/ to use instead of the default model")
+    args = parser.parse_args(argv)
+
+    summary = run(
+        args.input, args.out,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        in_flight=args.in_flight or 2 * max(1, args.workers),
+        id_column=args.id_column,
+        model_file=args.model_file,
+        threads=args.threads,
+    )
+    print(f"Scored {summary['rows']:,} rows in {summary['seconds']:.1f}s "
+          f"({summary['rows_per_second']:,} rows/s) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
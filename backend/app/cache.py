@@ -0,0 +1,110 @@
+"""
+Bounded LRU/TTL cache for prediction results.
+
+Keys are a canonical hash of the model inputs plus the hash of the model file,
+so equal payloads share an entry however their numbers were typed (736 vs
+736.0) and a model swap invalidates every entry automatically.
+"""
+
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _canonical_value(value):
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        # bools are ints in Python; keep them distinct from 0/1
+        return value
+    if isinstance(value, (int, float)):
+        number = float(value)
+        if math.isnan(number):
+            # NaN and None both mean "missing" to the model
+            return None
+        if number == 0.0:
+            number = 0.0  # fold -0.0 into 0.0
+        return repr(number)
+    return str(value)
+
+
+def canonical_key(payload: dict, fields: list[str], model_hash: str) -> str:
+    """Stable hash of the model inputs in `fields` for the given model."""
+    canonical = [[field, _canonical_value(payload.get(field))] for field in fields]
+    blob = json.dumps([model_hash, canonical], separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    def __init__(self, maxsize: int = 4096, ttl_seconds: float = 3600.0):
+        self.maxsize = maxsize
+        self.ttl = ttl_seconds
+        self._data: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def get(self, key: str) -> dict | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if self.ttl > 0 and expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return dict(value)
+
+    def put(self, key: str, value: dict) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, dict(value))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,167 @@
+"""
+Versioned extraction specs for /voice-form.
+
+A spec bundles everything the handler used to rebuild on every request: the
+prompt, the response schema, the GenerateContentConfig and the prompt Part.
+Specs are built once at import and shared read-only across requests; they are
+keyed by version so other languages or field sets can be served side by side.
+"""
+
+import os
+from dataclasses import dataclass
+
+from google.genai import types
+
+
+@dataclass(frozen=True)
+class ExtractionSpec:
+    version: str
+    language: str
+    fields: tuple[str, ...]
+    prompt: str
+    schema: types.Schema
+    config: types.GenerateContentConfig
+    prompt_part: types.Part
+
+
+def build_spec(version: str, language: str, prompt: str, schema: types.Schema) -> ExtractionSpec:
+    return ExtractionSpec(
+        version=version,
+        language=language,
+        fields=tuple(schema.properties),
+        prompt=prompt,
+        schema=schema,
+        config=types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_schema=schema,
+        ),
+        prompt_part=types.Part(text=prompt),
+    )
+
+
+# === loan application, English (the original /voice-form contract) ===
+def loan_schema_v1() -> types.Schema:
+    """JSON schema expected from Gemini."""
+    return types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "annual_income": types.Schema(
+                type=types.Type.NUMBER,
+                description="Yearly gross income in euros.",
+                nullable=True,
+            ),
+            "debt_to_income_ratio": types.Schema(
+                type=types.Type.NUMBER,
+                description="Debt-to-income ratio as a number (e.g. 0.15 for 15%).",
+                nullable=True,
+            ),
+            "credit_score": types.Schema(
+                type=types.Type.NUMBER,
+                description="Credit score as a number (e.g. 736).",
+                nullable=True,
+            ),
+            "loan_amount": types.Schema(
+                type=types.Type.NUMBER,
+                description="Loan amount in euros.",
+                nullable=True,
+            ),
+            "interest_rate": types.Schema(
+                type=types.Type.NUMBER,
+                description="Interest rate in percent (e.g. 13.67).",
+                nullable=True,
+            ),
+            "name_surname": types.Schema(
+                type=types.Type.STRING,
+                description="Full name of the applicant, e.g. 'John Doe'.",
+                nullable=True,
+            ),
+            "gender": types.Schema(
+                type=types.Type.STRING,
+                description='One of "Male", "Female", "Other", or null.',
+                nullable=True,
+            ),
+            "marital_status": types.Schema(
+                type=types.Type.STRING,
+                description='One of "Single", "Married", "Divorced", "Separated", "Widowed", or null.',
+                nullable=True,
+            ),
+            "education_level": types.Schema(
+                type=types.Type.STRING,
+                description='One of "High School", "Bachelor\'s", "Master\'s", "PhD", "Other", or null.',
+                nullable=True,
+            ),
+            "employment_status": types.Schema(
+                type=types.Type.STRING,
+                description='One of "Employed", "Unemployed", "Self-employed", "Retired", "Student", "Other", or null.',
+                nullable=True,
+            ),
+            "loan_purpose": types.Schema(
+                type=types.Type.STRING,
+                description='One of "Debt consolidation", "Car", "Home improvement", "Education", "Medical", "Vacation", "Other", or null.',
+                nullable=True,
+            ),
+            "grade_subgrade": types.Schema(
+                type=types.Type.STRING,
+                description='Grade/subgrade label like "C3", "D3", "F1", etc.',
+                nullable=True,
+            ),
+        },
+    )
+
+
+LOAN_PROMPT_EN = """
+You are an assistant that processes a short voice note about a credit application.
+
+The user describes themselves and their loan request in English, saying things like:
+- their income (per month or per year),
+- their debt-to-income ratio (if any),
+- their credit score,
+- the loan amount,
+- the interest rate,
+- their name,
+- gender,
+- marital status,
+- education level,
+- employment status,
+- the purpose of the loan,
+- and possibly a grade/subgrade like C3, D3, F1, etc.
+
+Your job:
+
+1. Understand the audio.
+2. Extract the information into this JSON structure:
+   - annual_income: yearly gross income in euros (if the user gives monthly income, multiply by 12).
+   - debt_to_income_ratio: as a number (e.g. 0.15 for 15%).
+   - credit_score: numeric credit score (e.g. 736).
+   - loan_amount: loan amount in euros.
+   - interest_rate: interest rate in percent (e.g. 13.67).
+   - name_surname: full name of the applicant if explicitly mentioned (e.g. "John Doe").
+   - gender: "Male", "Female", "Other", or null.
+   - marital_status: "Single", "Married", "Divorced", "Separated", "Widowed", or null.
+   - education_level: "High School", "Bachelor's", "Master's", "PhD", "Other", or null.
+   - employment_status: "Employed", "Unemployed", "Self-employed", "Retired", "Student", "Other", or null.
+   - loan_purpose: "Debt consolidation", "Car", "Home improvement", "Education", "Medical", "Vacation", "Other", or null.
+   - grade_subgrade: grade/subgrade string like "C3", "D3", "F1", etc.
+
+If a field is not mentioned, set it to null.
+If the user gives a percentage like "16.1%", set interest_rate = 16.1.
+If they say "I make 3,000 per month", set annual_income = 3000 * 12.
+
+Return ONLY valid JSON matching the schema.
+"""
+
+
+# --- registry: built once at import, keyed by spec version ---
+EXTRACTION_SPECS: dict[str, ExtractionSpec] = {
+    spec.version: spec
+    for spec in (
+        build_spec("loan-v1-en", "en", LOAN_PROMPT_EN, loan_schema_v1()),
+    )
+}
+
+DEFAULT_SPEC_VERSION = os.getenv("VOICE_SPEC_VERSION", "loan-v1-en")
+
+
+def get_spec(version: str | None = None) -> ExtractionSpec:
+    """Spec for `version` (default spec when None). Raises KeyError if unknown."""
+    return EXTRACTION_SPECS[version or DEFAULT_SPEC_VERSION]
@@ -0,0 +1,207 @@
+"""
+Pandas-free scoring path for the fitted loan pipeline.
+
+The sklearn pipeline spends most of a single-row prediction building a
+DataFrame and dispatching through the ColumnTransformer. FastPipeline reads
+the fitted parameters out of the pipeline once (one-hot vocabularies, scaler
+centers/scales, the final estimator) and encodes a payload dict straight into
+a preallocated NumPy feature vector.
+"""
+
+import math
+import threading
+import warnings
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, RobustScaler, StandardScaler
+
+
+class UnsupportedPipeline(ValueError):
+    """Raised when a pipeline uses a step the fast path does not replicate."""
+
+
+class FastPipeline:
+    engine = "fast"
+
+    def __init__(self, pipeline):
+        preprocessor = pipeline.steps[0][1]
+        estimator = pipeline.steps[-1][1]
+
+        if len(pipeline.steps) != 2 or not isinstance(preprocessor, ColumnTransformer):
+            raise UnsupportedPipeline("expected Pipeline([ColumnTransformer, estimator])")
+        if preprocessor.remainder != "drop":
+            raise UnsupportedPipeline("ColumnTransformer remainder must be 'drop'")
+
+        # (column, {category: output index}) for every one-hot encoded column
+        self.categorical = []
+        # column names, output indices, offsets and scales for numeric columns
+        numeric_columns, numeric_index, offsets, scales = [], [], [], []
+
+        position = 0
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop":
+                continue
+            columns = list(columns)
+
+            if isinstance(transformer, OneHotEncoder):
+                if transformer.drop_idx_ is not None or transformer._infrequent_enabled:
+                    raise UnsupportedPipeline(f"{name}: drop/infrequent categories not supported")
+                if transformer.handle_unknown != "ignore":
+                    raise UnsupportedPipeline(f"{name}: handle_unknown must be 'ignore'")
+                for column, categories in zip(columns, transformer.categories_):
+                    mapping = {value: position + i for i, value in enumerate(categories)}
+                    self.categorical.append((column, mapping))
+                    position += len(categories)
+
+            elif isinstance(transformer, (RobustScaler, StandardScaler)):
+                if isinstance(transformer, RobustScaler):
+                    offset = transformer.center_
+                else:
+                    offset = transformer.mean_
+                n = len(columns)
+                offsets.extend(offset if offset is not None else np.zeros(n))
+                scales.extend(transformer.scale_ if transformer.scale_ is not None else np.ones(n))
+                numeric_columns.extend(columns)
+                numeric_index.extend(range(position, position + n))
+                position += n
+
+            else:
+                raise UnsupportedPipeline(f"{name}: unsupported transformer {type(transformer).__name__}")
+
+        self.n_features = position
+        self.numeric_columns = numeric_columns
+        self.numeric_index = np.asarray(numeric_index, dtype=np.intp)
+        self.numeric_offset = np.asarray(offsets, dtype=np.float64)
+        self.numeric_scale = np.asarray(scales, dtype=np.float64)
+
+        self.estimator = estimator
+        self._booster = getattr(estimator, "booster_", None)
+        if self._booster is not None:
+            # same iteration LGBMClassifier.predict_proba would use
+            self._num_iteration = getattr(estimator, "best_iteration_", None) or None
+
+        # one preallocated row per worker thread (FastAPI runs sync endpoints in a threadpool)
+        self._local = threading.local()
+
+    def _row_buffer(self) -> np.ndarray:
+        row = getattr(self._local, "row", None)
+        if row is None:
+            row = np.zeros((1, self.n_features), dtype=np.float64)
+            self._local.row = row
+        return row
+
+    def _encode_into(self, out: np.ndarray, payload: dict) -> None:
+        out.fill(0.0)
+        for column, mapping in self.categorical:
+            idx = mapping.get(payload.get(column))
+            if idx is not None:
+                out[idx] = 1.0
+        raw = [payload.get(column) for column in self.numeric_columns]
+        values = np.array([math.nan if v is None else v for v in raw], dtype=np.float64)
+        values -= self.numeric_offset
+        values /= self.numeric_scale
+        out[self.numeric_index] = values
+
+    def transform(self, payloads: list[dict]) -> np.ndarray:
+        X = np.empty((len(payloads), self.n_features), dtype=np.float64)
+        for i, payload in enumerate(payloads):
+            self._encode_into(X[i], payload)
+        return X
+
+    def encode_one(self, payload: dict) -> np.ndarray:
+        """One payload as a (1, n_features) row, in this thread's reusable buffer."""
+        row = self._row_buffer()
+        self._encode_into(row[0], payload)
+        return row
+
+    def proba_encoded(self, X: np.ndarray, num_threads: int = 0) -> np.ndarray:
+        """Probabilities of class 1 for rows already encoded by transform/encode_one."""
+        if self._booster is not None:
+            return self._booster.predict(
+                X, num_iteration=self._num_iteration, num_threads=num_threads
+            )
+        return self.estimator.predict_proba(X)[:, 1]
+
+    def predict_proba_one(self, payload: dict) -> float:
+        """Probability of class 1 for a single payload."""
+        # one row: threading overhead outweighs any speed-up
+        return float(self.proba_encoded(self.encode_one(payload), num_threads=1)[0])
+
+    def predict_proba(self, payloads: list[dict]) -> np.ndarray:
+        """Probabilities of class 1 for many payloads, in input order."""
+        return self.proba_encoded(self.transform(payloads))
+
+
+def accepts_missing_numbers(pipeline) -> bool:
+    """False for final estimators that reject NaN features (SVC, LogisticRegression)."""
+    return pipeline.steps[-1][1].__sklearn_tags__().input_tags.allow_nan
+
+
+def fill_missing_numbers(fast: FastPipeline, payload: dict) -> dict:
+    """Copy of payload with missing numeric values set to their scaler's center."""
+    filled = dict(payload)
+    for j, column in enumerate(fast.numeric_columns):
+        if filled.get(column) is None:
+            filled[column] = float(fast.numeric_offset[j])
+    return filled
+
+
+def parity_payloads(fast: FastPipeline, missing_numbers: bool = True) -> list[dict]:
+    """
+    Probe payloads covering every known category, unknown/missing values and
+    numeric values around each scaler's center. missing_numbers=False leaves
+    the numeric values set, for estimators that reject NaN.
+    """
+    longest = max(len(mapping) for _, mapping in fast.categorical)
+    probes = []
+    for i in range(longest + 2):
+        payload = {}
+        for column, mapping in fast.categorical:
+            categories = list(mapping)
+            if i < len(categories):
+                payload[column] = categories[i]
+            elif i == longest:
+                payload[column] = None
+            else:
+                payload[column] = "__unknown__"
+        for j, column in enumerate(fast.numeric_columns):
+            offset, scale = fast.numeric_offset[j], fast.numeric_scale[j]
+            step = (i % 5) - 2  # -2 .. 2 scales around the center
+            missing = missing_numbers and (i + j) % 7 == 0
+            payload[column] = None if missing else float(offset + step * scale)
+        probes.append(payload)
+    return probes
+
+
+def check_parity(pipeline, fast: FastPipeline, payloads: list[dict] | None = None,
+                 atol: float = 1e-9) -> float:
+    """
+    Scores payloads through both the sklearn pipeline and the fast path and
+    returns the largest absolute probability difference. Raises AssertionError
+    if it exceeds atol. Missing numeric values are only probed when the
+    pipeline's estimator accepts NaN; otherwise they are filled in first.
+    """
+    import pandas as pd
+
+    missing_numbers = accepts_missing_numbers(pipeline)
+    if payloads is None:
+        payloads = parity_payloads(fast, missing_numbers)
+    elif not missing_numbers:
+        payloads = [fill_missing_numbers(fast, p) for p in payloads]
+
+    columns = list(pipeline.feature_names_in_)
+    with warnings.catch_warnings():
+        # LightGBM warns about missing feature names on every probe
+        warnings.simplefilter("ignore", UserWarning)
+        expected = np.array([
+            pipeline.predict_proba(pd.DataFrame([{c: p.get(c) for c in columns}]))[0, 1]
+            for p in payloads
+        ])
+    batch = fast.predict_proba(payloads)
+    single = np.array([fast.predict_proba_one(p) for p in payloads])
+
+    max_diff = float(max(np.max(np.abs(batch - expected)), np.max(np.abs(single - expected))))
+    if max_diff > atol:
+        raise AssertionError(f"fast path differs from pipeline by {max_diff:.3g} (atol {atol})")
+    return max_diff
@@ -1,18 +1,398 @@
+import os
+import random
+import threading
+import time
+
 import joblib
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
-MODEL_PATH = Path(__file__).resolve().parent / "models" / "loan_pipeline_model.pkl"
+from app import IMPORT_STARTED, metrics
+from app.array_model import ArrayModel
+from app.cache import PredictionCache, canonical_key, file_sha256
+from app.fast_inference import FastPipeline, check_parity
+from app.model_registry import ModelRegistry, ModelVersion
+from app.shadow import ShadowScorer
+
+MODEL_DIR = Path(__file__).resolve().parent / "models"
+MODEL_PATH = MODEL_DIR / "loan_pipeline_model.pkl"
+
+# Name and version the pipeline at MODEL_PATH is registered under.
+DEFAULT_MODEL_NAME = os.getenv("MODEL_NAME", "loan")
+DEFAULT_MODEL_VERSION = os.getenv("MODEL_VERSION", "v1")
+
+# Columns the pipeline was fitted on, in training order.
+FEATURE_COLUMNS = [
+    "annual_income",
+    "debt_to_income_ratio",
+    "credit_score",
+    "loan_amount",
+    "interest_rate",
+    "gender",
+    "marital_status",
+    "education_level",
+    "employment_status",
+    "loan_purpose",
+    "grade_subgrade",
+]
+
+# "fast" scores through FastPipeline (no pandas, no ColumnTransformer dispatch);
+# "arrays" through the NumPy-only export of models/export_model.py (app/array_model.py);
+# "approx" (opt-in) through an approximate export of models/svc_approx.py, which
+# trades exactness for speed; "pipeline" always goes through the original sklearn pipeline.
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "fast").lower()
+
+# export read by the "arrays" engine; default: <model file>.arrays next to the model
+MODEL_ARRAYS_DIR = os.getenv("MODEL_ARRAYS_DIR") or None
+
+# export read by the "approx" engine; default: <model file>.approx.arrays next to the model
+MODEL_APPROX_DIR = os.getenv("MODEL_APPROX_DIR") or None
+# largest probability difference from the pipeline the "approx" engine accepts on the parity probes
+APPROX_MAX_PROBA_ERROR = float(os.getenv("APPROX_MAX_PROBA_ERROR", "0.05"))
+
+# joblib mmap_mode for the numpy arrays inside the pickle ("r", "c" or unset)
+MODEL_MMAP_MODE = os.getenv("MODEL_MMAP_MODE") or None
+
+# Representative applicant scored once after loading to warm every code path.
+WARMUP_PAYLOAD = {
+    "annual_income": 36000.0,
+    "debt_to_income_ratio": 0.15,
+    "credit_score": 736.0,
+    "loan_amount": 10000.0,
+    "interest_rate": 13.67,
+    "gender": "Male",
+    "marital_status": "Single",
+    "education_level": "Bachelor's",
+    "employment_status": "Employed",
+    "loan_purpose": "Car",
+    "grade_subgrade": "C3",
+}
+
+# Startup timings of the default model, reported on /readyz.
+timings = {
+    "model_load_seconds": None,
+    "fast_engine_build_seconds": None,
+    "warmup_seconds": None,
+    "time_to_first_prediction_seconds": None,
+}
+
+
+def _build_fast_engine(pipeline):
+    # The fast path is only used if it reproduces the pipeline's probabilities.
+    try:
+        fast = FastPipeline(pipeline)
+        check_parity(pipeline, fast)
+    except (ValueError, AssertionError) as e:
+        # ValueError also covers UnsupportedPipeline and pipelines that cannot score the probes
+        print("Fast inference disabled, using sklearn pipeline:", e)
+        return None
+    return fast
+
+
+def _build_array_engine(pipeline, path: Path):
+    # The export is only used if it was made from this pipeline and scores the same.
+    arrays_dir = Path(MODEL_ARRAYS_DIR) if MODEL_ARRAYS_DIR and path == MODEL_PATH else path.with_suffix(".arrays")
+    try:
+        model = ArrayModel(arrays_dir)
+        check_parity(pipeline, model)
+    except (OSError, ValueError, KeyError, AssertionError) as e:
+        print(f"Array model {arrays_dir} not usable, falling back to the fast engine:", e)
+        return _build_fast_engine(pipeline)
+    return model
+
+
+def _build_approx_engine(pipeline, path: Path):
+    # An approximate export is used if it was made from this pipeline and stays
+    # within APPROX_MAX_PROBA_ERROR of it; otherwise the exact fast engine serves.
+    approx_dir = (Path(MODEL_APPROX_DIR) if MODEL_APPROX_DIR and path == MODEL_PATH
+                  else path.with_suffix(".approx.arrays"))
+    try:
+        model = ArrayModel(approx_dir)
+        if "approximation" not in model.manifest:
+            raise ValueError(f"{approx_dir} is not an approximate export")
+        max_diff = check_parity(pipeline, model, atol=APPROX_MAX_PROBA_ERROR)
+    except (OSError, ValueError, KeyError, AssertionError) as e:
+        print(f"Approximate model {approx_dir} not usable, falling back to the fast engine:", e)
+        return _build_fast_engine(pipeline)
+    model.engine = "approx"
+    print(f"Serving approximate model {approx_dir}: max probability difference {max_diff:.4f} on the probes")
+    return model
+
+
+def load_model_version(name: str, version: str, path: Path) -> ModelVersion:
+    """
+    Loads one pipeline, builds its fast engine and runs a smoke prediction
+    through both paths. Raises if the model cannot serve.
+    """
+    version_timings = {}
+
+    start = time.perf_counter()
+    pipeline = joblib.load(path, mmap_mode=MODEL_MMAP_MODE)
+    sha256 = file_sha256(path)
+    version_timings["model_load_seconds"] = round(time.perf_counter() - start, 4)
+
+    start = time.perf_counter()
+    if INFERENCE_ENGINE == "arrays":
+        fast = _build_array_engine(pipeline, path)
+    elif INFERENCE_ENGINE == "approx":
+        fast = _build_approx_engine(pipeline, path)
+    else:
+        fast = _build_fast_engine(pipeline) if INFERENCE_ENGINE == "fast" else None
+    version_timings["fast_engine_build_seconds"] = round(time.perf_counter() - start, 4)
 
-model = joblib.load(MODEL_PATH)
+    # smoke prediction: also warms both scoring paths before the version is published
+    start = time.perf_counter()
+    if fast is not None:
+        fast.predict_proba_one(WARMUP_PAYLOAD)
+        fast.predict_proba([WARMUP_PAYLOAD, WARMUP_PAYLOAD])
+    proba = pipeline.predict_proba(pd.DataFrame([WARMUP_PAYLOAD], columns=FEATURE_COLUMNS))
+    if proba.shape != (1, 2) or not 0.0 <= float(proba[0, 1]) <= 1.0:
+        raise ValueError(f"smoke prediction returned {proba!r}")
+    version_timings["warmup_seconds"] = round(time.perf_counter() - start, 4)
 
-def predict_from_payload(payload: dict):
-    df = pd.DataFrame([payload])
+    return ModelVersion(
+        name=name,
+        version=version,
+        path=path,
+        pipeline=pipeline,
+        fast_engine=fast,
+        sha256=sha256,
+        timings=version_timings,
+    )
 
-    pred_proba = model.predict_proba(df)[0, 1]   # probability loan IS paid back (1)
-    pred_class = model.predict(df)[0]            # 0 or 1
 
+registry = ModelRegistry(load_model_version)
+_load_lock = threading.Lock()
+
+
+def load_model() -> None:
+    """
+    Loads the default pipeline once per worker. Safe to call repeatedly and
+    from several threads.
+    """
+    with _load_lock:
+        if registry.has(DEFAULT_MODEL_NAME):
+            return
+        loaded = registry.load(DEFAULT_MODEL_NAME, DEFAULT_MODEL_VERSION, MODEL_PATH)
+        timings.update(loaded.timings)
+
+
+def resolve_model_file(filename: str) -> Path:
+    """Model files may only be loaded from MODEL_DIR (pickles execute code)."""
+    path = (MODEL_DIR / filename).resolve()
+    if path.parent != MODEL_DIR or path.suffix not in (".pkl", ".joblib") or not path.is_file():
+        raise ValueError(f"{filename!r} is not a model file in {MODEL_DIR.name}/")
+    return path
+
+
+def is_ready() -> bool:
+    return registry.has(DEFAULT_MODEL_NAME)
+
+
+def get_model(version: str | None = None, name: str | None = None) -> ModelVersion:
+    """Active (or pinned) version of a model. KeyError if it is not loaded."""
+    name = name or DEFAULT_MODEL_NAME
+    if name == DEFAULT_MODEL_NAME and not registry.has(name):
+        load_model()
+    return registry.get(name, version)
+
+
+def _record_first_prediction() -> None:
+    if timings["time_to_first_prediction_seconds"] is None:
+        timings["time_to_first_prediction_seconds"] = round(
+            time.perf_counter() - IMPORT_STARTED, 4
+        )
+
+
+# --- result cache, keyed on the canonical payload and the model file hash ---
+prediction_cache = PredictionCache(
+    maxsize=int(os.getenv("PREDICTION_CACHE_SIZE", "4096")),
+    ttl_seconds=float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "3600")),
+)
+
+
+def cache_key(payload: dict, model: ModelVersion | None = None) -> str:
+    model = model or get_model()
+    return canonical_key(payload, FEATURE_COLUMNS, model.sha256)
+
+
+def cached_prediction(payload: dict) -> dict | None:
+    """Cached result of the active model for this payload, or None on a miss."""
+    return prediction_cache.get(cache_key(payload))
+
+
+def _format_result(proba: float) -> dict:
+    # The classifier predicts class 1 exactly when P(paid back) > 0.5, so the
+    # class is derived from the probability instead of a second pipeline pass.
     return {
-        "approved": bool(pred_class),
-        "probability": round(float(pred_proba) * 100, 2)
+        "approved": bool(proba > 0.5),
+        "probability": round(float(proba) * 100, 2)
     }
+
+
+def _pipeline_proba(pipeline, df: pd.DataFrame) -> np.ndarray:
+    """pipeline.predict_proba(df)[:, 1], with preprocessing and estimator timed apart."""
+    if len(getattr(pipeline, "steps", ())) < 2:
+        with metrics.stage("estimator"):
+            return pipeline.predict_proba(df)[:, 1]
+    # slicing skips nothing predict_proba would run (imblearn samplers are inactive at predict time)
+    with metrics.stage("preprocess"):
+        X = pipeline[:-1].transform(df)
+    with metrics.stage("estimator"):
+        return pipeline[-1].predict_proba(X)[:, 1]
+
+
+def _proba_one(model: ModelVersion, payload: dict) -> float:
+    fast = model.fast_engine
+    if fast is not None:
+        with metrics.stage("preprocess"):
+            row = fast.encode_one(payload)
+        with metrics.stage("estimator"):
+            # one row: threading overhead outweighs any speed-up
+            return float(fast.proba_encoded(row, num_threads=1)[0])
+
+    with metrics.stage("dataframe"):
+        df = pd.DataFrame([payload])
+
+    return _pipeline_proba(model.pipeline, df)[0]   # probability loan IS paid back (1)
+
+
+def _score_one(model: ModelVersion, payload: dict) -> dict:
+    return _format_result(_proba_one(model, payload))
+
+
+def predict_from_payload(payload: dict, version: str | None = None):
+    model = get_model(version)
+    key = cache_key(payload, model)
+    result = prediction_cache.get(key)
+    if result is None:
+        start = time.perf_counter()
+        proba = _proba_one(model, payload)
+        elapsed = time.perf_counter() - start
+        result = _format_result(proba)
+        prediction_cache.put(key, result)
+        if version is None:
+            _shadow([payload], [proba], elapsed)
+    _record_first_prediction()
+    return result
+
+
+def predict_batch(payloads: list[dict], version: str | None = None) -> list[dict]:
+    """
+    Scores many payloads with one columnar frame and a single
+    predict_proba pass. Results are returned in input order.
+    """
+    if not payloads:
+        return []
+
+    model = get_model(version)
+    return _score_batch(model, payloads)
+
+
+def predict_probabilities(payloads: list[dict], version: str | None = None) -> np.ndarray:
+    """Raw class-1 probabilities for many payloads, in input order (no cache)."""
+    if not payloads:
+        return np.empty(0)
+    return _probas(get_model(version), payloads)
+
+
+def _probas(model: ModelVersion, payloads: list[dict]) -> np.ndarray:
+    fast = model.fast_engine
+    if fast is not None:
+        with metrics.stage("preprocess"):
+            X = fast.transform(payloads)
+        with metrics.stage("estimator"):
+            return fast.proba_encoded(X)
+
+    with metrics.stage("dataframe"):
+        df = _frame(payloads)
+
+    return _pipeline_proba(model.pipeline, df)
+
+
+def _frame(payloads: list[dict]) -> pd.DataFrame:
+    columns = {col: [p.get(col) for p in payloads] for col in FEATURE_COLUMNS}
+    return pd.DataFrame(columns, columns=FEATURE_COLUMNS)
+
+
+def _shadow_probas(model: ModelVersion, payloads: list[dict]) -> np.ndarray:
+    """_probas without stage metrics: background candidate scoring is not part of any request."""
+    if model.fast_engine is not None:
+        return model.fast_engine.predict_proba(payloads)
+    return model.pipeline.predict_proba(_frame(payloads))[:, 1]
+
+
+def _score_batch(model: ModelVersion, payloads: list[dict]) -> list[dict]:
+    return [_format_result(p) for p in _probas(model, payloads)]
+
+
+def predict_and_cache(payloads: list[dict]) -> list[dict]:
+    """
+    predict_batch with the active model that also stores each result in the
+    prediction cache. The model is resolved once, so a swap mid-batch cannot
+    mix versions.
+    """
+    if not payloads:
+        return []
+
+    model = get_model()
+    start = time.perf_counter()
+    probas = _probas(model, payloads)
+    elapsed = time.perf_counter() - start
+    results = [_format_result(p) for p in probas]
+    for payload, result in zip(payloads, results):
+        prediction_cache.put(cache_key(payload, model), result)
+    _shadow(payloads, probas, elapsed)
+    _record_first_prediction()
+    return results
+
+
+# --- shadow scoring: a candidate model sees the same traffic, off the request path ---
+# "name" (its active version) or "name:version", e.g. "loan:v2" or "catboost"
+SHADOW_MODEL = os.getenv("SHADOW_MODEL", "")
+# optional file in MODEL_DIR loaded as the candidate at startup
+SHADOW_MODEL_FILE = os.getenv("SHADOW_MODEL_FILE", "")
+SHADOW_SAMPLE_RATE = float(os.getenv("SHADOW_SAMPLE_RATE", "1.0"))
+
+
+def _shadow_target() -> tuple[str, str | None]:
+    name, _, version = SHADOW_MODEL.partition(":")
+    return name, version or None
+
+
+def _resolve_shadow_model() -> ModelVersion | None:
+    try:
+        return registry.get(*_shadow_target())
+    except KeyError:
+        return None
+
+
+shadow = ShadowScorer(
+    _resolve_shadow_model,
+    _shadow_probas,
+    buffer_size=int(os.getenv("SHADOW_BUFFER_SIZE", "10000")),
+    max_workers=int(os.getenv("SHADOW_WORKERS", "1")),
+    max_pending=int(os.getenv("SHADOW_MAX_PENDING", "64")),
+)
+
+
+def load_shadow_model() -> None:
+    """Registers SHADOW_MODEL_FILE under SHADOW_MODEL without activating it."""
+    if not (SHADOW_MODEL and SHADOW_MODEL_FILE):
+        return
+    name, version = _shadow_target()
+    try:
+        registry.load(name, version or "candidate", resolve_model_file(SHADOW_MODEL_FILE),
+                      activate=False)
+    except Exception as e:
+        # the candidate must never keep the primary model from serving
+        print("Shadow model not loaded:", e)
+
+
+def _shadow(payloads: list[dict], probas, elapsed: float) -> None:
+    if not SHADOW_MODEL:
+        return
+    if SHADOW_SAMPLE_RATE < 1.0 and random.random() >= SHADOW_SAMPLE_RATE:
+        return
+    shadow.submit(payloads, probas, elapsed)
@@ -1,13 +1,29 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from app.inference import predict_from_payload
+from pydantic import BaseModel, ValidationError, model_validator
+from app import IMPORT_STARTED
+from app import audio as audio_ingest
+from app import inference, metrics, tracing, voice, voice_pipeline
+from app.batching import MicroBatcher, QueueFullError
+from app.model_admin import MODEL_REGISTRY_POLL_SECONDS, registry_sync
+from app.model_admin import router as model_admin_router
+from app.extraction_specs import EXTRACTION_SPECS, get_spec
+from app.voice_cache import extraction_key
+from app.inference import (
+    cached_prediction,
+    predict_and_cache,
+    predict_batch,
+    predict_from_payload,
+    prediction_cache,
+)
 
-import json
+import asyncio
+import os
 import time
+from contextlib import asynccontextmanager
+from typing import Any
 
-from google.api_core.exceptions import ServiceUnavailable
-from google import genai
 from google.genai import types
 
 
@@ -25,8 +41,54 @@ class PredictionRequest(BaseModel):
     loan_purpose: str | None = None
     grade_subgrade: str | None = None
 
+    @model_validator(mode="wrap")
+    @classmethod
+    def _timed(cls, data, handler):
+        # times pydantic validation wherever it runs (request body or /predict/batch rows)
+        start = time.perf_counter()
+        try:
+            return handler(data)
+        finally:
+            metrics.observe_stage("validation", time.perf_counter() - start)
+
+
+# --- micro-batching in front of the model for /predict ---
+MICROBATCH_ENABLED = os.getenv("PREDICT_MICROBATCH", "1") == "1"
+batcher = MicroBatcher(
+    predict_and_cache,
+    max_batch_size=int(os.getenv("PREDICT_MICROBATCH_MAX_SIZE", "64")),
+    max_wait_ms=float(os.getenv("PREDICT_MICROBATCH_MAX_WAIT_MS", "2")),
+    max_queue_depth=int(os.getenv("PREDICT_MICROBATCH_QUEUE_DEPTH", "1024")),
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # load + warm the model once per worker before /readyz reports ready
+    await run_in_threadpool(inference.load_model)
+    if MICROBATCH_ENABLED:
+        await batcher.start()
+    # the shadow candidate loads in the background; /predict does not wait for it
+    shadow_load = asyncio.create_task(asyncio.to_thread(inference.load_shadow_model))
+    # versions loaded or activated through /models in any worker
+    registry_poll = (asyncio.create_task(registry_sync.poll(MODEL_REGISTRY_POLL_SECONDS))
+                     if registry_sync is not None else None)
+    yield
+    if registry_poll is not None:
+        registry_poll.cancel()
+    await batcher.stop()
+    await shadow_load
+    inference.shadow.shutdown()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+# innermost: its 413s still get CORS headers, metrics and a trace
+app.add_middleware(
+    audio_ingest.UploadLimitMiddleware,
+    paths=("/voice-form",),
+    max_bytes=audio_ingest.AUDIO_MAX_REQUEST_BYTES,
+)
 
 # --- CORS so Django frontend can call this API ---
 app.add_middleware(
@@ -37,208 +99,255 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# --- Gemini client (uses GEMINI_API_KEY env var) ---
-client = genai.Client()
+app.include_router(model_admin_router)
+
+# added after CORS, so it also times CORS handling and error responses
+app.add_middleware(metrics.PrometheusMiddleware)
+# request IDs and JSON span logs; wraps the metrics middleware
+app.add_middleware(tracing.TracingMiddleware)
+
+
+# ========= HEALTH =========
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving HTTP."""
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz(response: Response):
+    """Readiness: the model is loaded and warmed up. Includes startup timings."""
+    ready = inference.is_ready()
+    if not ready:
+        response.status_code = 503
+    model = inference.get_model() if ready else None
+    return {
+        "ready": ready,
+        "model_version": model.version if model else None,
+        "inference_engine": model.describe()["engine"] if model else None,
+        "import_seconds": IMPORT_SECONDS,
+        **inference.timings,
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus exposition of request latency, stage timings, in-flight requests and errors."""
+    body, content_type = metrics.render()
+    return Response(content=body, media_type=content_type)
 
 
 # ========= EXISTING PREDICT ENDPOINT =========
 @app.post("/predict")
-def predict(request: PredictionRequest):
+async def predict(request: PredictionRequest, model_version: str | None = None):
     payload = request.dict()
-    result = predict_from_payload(payload)
+    if model_version is not None or not batcher.running:
+        # pinned versions are scored directly; the batcher serves the active one
+        try:
+            return await run_in_threadpool(predict_from_payload, payload, model_version)
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=e.args[0])
+
+    # repeated submits of the same applicant skip the queue entirely
+    cached = cached_prediction(payload)
+    tracing.annotate(cache="hit" if cached is not None else "miss")
+    if cached is not None:
+        return cached
+
+    try:
+        result = await batcher.submit(payload)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     return result
 
 
+@app.get("/stats/batcher")
+def batcher_stats():
+    """Queue depth and batch-size metrics of the /predict micro-batcher."""
+    return {"enabled": MICROBATCH_ENABLED, **batcher.snapshot()}
+
+
+@app.get("/stats/cache")
+def cache_stats():
+    """Hit, miss and eviction counters of the prediction result cache."""
+    return prediction_cache.stats()
+
+
+@app.get("/stats/shadow")
+def shadow_stats():
+    """
+    Agreement and latency of the shadow candidate (SHADOW_MODEL) against the
+    served model over the last SHADOW_BUFFER_SIZE scored rows.
+    """
+    return {
+        "enabled": bool(inference.SHADOW_MODEL),
+        "target": inference.SHADOW_MODEL or None,
+        **inference.shadow.summary(),
+    }
+
+
+# Upper bound on rows per /predict/batch call (keeps one request's memory bounded).
+MAX_BATCH_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "1000"))
+
+
+# ========= BATCH PREDICT ENDPOINT =========
+@app.post("/predict/batch")
+def predict_batch_endpoint(rows: list[Any], model_version: str | None = None):
+    """
+    Scores a list of prediction payloads in one vectorized pass, with the
+    active model or the pinned `model_version`.
+
+    Rows are validated one by one, so an invalid row only produces an
+    error entry at its index instead of rejecting the whole batch.
+    Results are returned in input order.
+    """
+    if len(rows) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(rows)} rows (max {MAX_BATCH_SIZE}).",
+        )
+
+    results: list[dict] = [None] * len(rows)
+    valid_indices = []
+    valid_payloads = []
+
+    for i, row in enumerate(rows):
+        try:
+            payload = PredictionRequest.model_validate(row).model_dump()
+        except ValidationError as e:
+            results[i] = {
+                "index": i,
+                "error": e.errors(include_url=False, include_context=False),
+            }
+            continue
+        valid_indices.append(i)
+        valid_payloads.append(payload)
+
+    try:
+        scored = predict_batch(valid_payloads, model_version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+
+    for i, result in zip(valid_indices, scored):
+        results[i] = {"index": i, **result}
+
+    return {"results": results}
+
+
 # ========= NEW VOICE ENDPOINT =========
 @app.post("/voice-form")
-async def voice_form(audio: UploadFile = File(...)):
+async def voice_form(response: Response, audio: UploadFile = File(...), spec: str | None = None):
     """
     Receives an audio file, sends it to Gemini, gets structured JSON with:
     annual_income, debt_to_income_ratio, credit_score, loan_amount,
     interest_rate, gender, marital_status, education_level,
     employment_status, loan_purpose, grade_subgrade.
+
+    `spec` selects an extraction spec version (see app/extraction_specs.py).
     """
+    try:
+        extraction_spec = get_spec(spec)
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown extraction spec: {spec}")
 
-    # --- read audio from upload ---
+    # --- read audio from upload (chunked, size-capped) ---
     try:
-        audio_bytes = await audio.read()
-        if not audio_bytes:
-            raise HTTPException(status_code=400, detail="No audio data received")
+        with metrics.stage("audio_read"):
+            upload = await audio_ingest.read_upload(audio)
+    except HTTPException:
+        raise
     except Exception as e:
         print("Error reading audio:", e)
         raise HTTPException(status_code=400, detail="Error reading uploaded audio")
+    if not upload.size:
+        raise HTTPException(status_code=400, detail="No audio data received")
+
+    response.headers["X-Audio-Bytes-In"] = str(upload.size)
 
-    mime_type = audio.content_type or "audio/webm"
-
-    # --- define JSON schema expected from Gemini ---
-    schema = types.Schema(
-        type=types.Type.OBJECT,
-        properties={
-            "annual_income": types.Schema(
-                type=types.Type.NUMBER,
-                description="Yearly gross income in euros.",
-                nullable=True,
-            ),
-            "debt_to_income_ratio": types.Schema(
-                type=types.Type.NUMBER,
-                description="Debt-to-income ratio as a number (e.g. 0.15 for 15%).",
-                nullable=True,
-            ),
-            "credit_score": types.Schema(
-                type=types.Type.NUMBER,
-                description="Credit score as a number (e.g. 736).",
-                nullable=True,
-            ),
-            "loan_amount": types.Schema(
-                type=types.Type.NUMBER,
-                description="Loan amount in euros.",
-                nullable=True,
-            ),
-            "interest_rate": types.Schema(
-                type=types.Type.NUMBER,
-                description="Interest rate in percent (e.g. 13.67).",
-                nullable=True,
-            ),
-            "name_surname": types.Schema(
-                type=types.Type.STRING,
-                description="Full name of the applicant, e.g. 'John Doe'.",
-                nullable=True,
-            ),
-            "gender": types.Schema(
-                type=types.Type.STRING,
-                description='One of "Male", "Female", "Other", or null.',
-                nullable=True,
-            ),
-            "marital_status": types.Schema(
-                type=types.Type.STRING,
-                description='One of "Single", "Married", "Divorced", "Separated", "Widowed", or null.',
-                nullable=True,
-            ),
-            "education_level": types.Schema(
-                type=types.Type.STRING,
-                description='One of "High School", "Bachelor\'s", "Master\'s", "PhD", "Other", or null.',
-                nullable=True,
-            ),
-            "employment_status": types.Schema(
-                type=types.Type.STRING,
-                description='One of "Employed", "Unemployed", "Self-employed", "Retired", "Student", "Other", or null.',
-                nullable=True,
-            ),
-            "loan_purpose": types.Schema(
-                type=types.Type.STRING,
-                description='One of "Debt consolidation", "Car", "Home improvement", "Education", "Medical", "Vacation", "Other", or null.',
-                nullable=True,
-            ),
-            "grade_subgrade": types.Schema(
-                type=types.Type.STRING,
-                description='Grade/subgrade label like "C3", "D3", "F1", etc.',
-                nullable=True,
-            ),
-        },
+    # --- identical audio + prompt + model: answer from the cache ---
+    cache_key = extraction_key(
+        upload.sha256, upload.mime_type, extraction_spec.prompt, voice.GEMINI_MODEL
     )
+    cached = await voice.voice_cache.aget(cache_key)
+    if cached is not None:
+        response.headers["X-Audio-Bytes-Out"] = "0"
+        response.headers["X-Extraction-Tier"] = "cache"
+        tracing.annotate(extraction_tier="cache")
+        return cached
 
-    prompt = """
-You are an assistant that processes a short voice note about a credit application.
-
-The user describes themselves and their loan request in English, saying things like:
-- their income (per month or per year),
-- their debt-to-income ratio (if any),
-- their credit score,
-- the loan amount,
-- the interest rate,
-- their name,
-- gender,
-- marital status,
-- education level,
-- employment status,
-- the purpose of the loan,
-- and possibly a grade/subgrade like C3, D3, F1, etc.
-
-Your job:
-
-1. Understand the audio.
-2. Extract the information into this JSON structure:
-   - annual_income: yearly gross income in euros (if the user gives monthly income, multiply by 12).
-   - debt_to_income_ratio: as a number (e.g. 0.15 for 15%).
-   - credit_score: numeric credit score (e.g. 736).
-   - loan_amount: loan amount in euros.
-   - interest_rate: interest rate in percent (e.g. 13.67).
-   - name_surname: full name of the applicant if explicitly mentioned (e.g. "John Doe").
-   - gender: "Male", "Female", "Other", or null.
-   - marital_status: "Single", "Married", "Divorced", "Separated", "Widowed", or null.
-   - education_level: "High School", "Bachelor's", "Master's", "PhD", "Other", or null.
-   - employment_status: "Employed", "Unemployed", "Self-employed", "Retired", "Student", "Other", or null.
-   - loan_purpose: "Debt consolidation", "Car", "Home improvement", "Education", "Medical", "Vacation", "Other", or null.
-   - grade_subgrade: grade/subgrade string like "C3", "D3", "F1", etc.
-
-If a field is not mentioned, set it to null.
-If the user gives a percentage like "16.1%", set interest_rate = 16.1.
-If they say "I make 3,000 per month", set annual_income = 3000 * 12.
-
-Return ONLY valid JSON matching the schema.
-"""
-
-    # --- retry logic around Gemini call (handles 503 / overload) ---
-    max_retries = 3
-    backoff_seconds = 2
-    response = None
-
-    for attempt in range(1, max_retries + 1):
-        try:
-            response = client.models.generate_content(
-                model="gemini-2.5-flash",  # lighter / more stable
-                contents=[
-                    types.Content(
-                        parts=[
-                            types.Part(text=prompt),
-                            types.Part.from_bytes(
-                                data=audio_bytes,
-                                mime_type=mime_type,
-                            ),
-                        ]
-                    )
-                ],
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    response_schema=schema,
-                ),
-            )
-            # success → break out of loop
-            break
-        except ServiceUnavailable as e:
-            # 503 UNAVAILABLE: model overloaded
-            print(f"Gemini ServiceUnavailable on attempt {attempt}: {e}")
-            if attempt == max_retries:
-                raise HTTPException(
-                    status_code=503,
-                    detail="Voice model is temporarily overloaded. Please try again in a moment.",
-                )
-            # simple backoff: 2s, 4s, 6s
-            time.sleep(backoff_seconds * attempt)
-        except Exception as e:
-            # other error: no retry
-            print("Error calling Gemini:", e)
-            raise HTTPException(
-                status_code=500,
-                detail=f"Error calling Gemini API: {e}",
+    # --- tier 1: local speech-to-text + rule-based parser, if configured ---
+    transcript = await voice_pipeline.transcribe_locally(upload.data, upload.mime_type)
+    if transcript:
+        extraction = await voice_pipeline.extract_from_text(transcript, extraction_spec)
+        response.headers["X-Audio-Bytes-Out"] = "0"
+        response.headers["X-Extraction-Tier"] = extraction.tier
+        await voice.voice_cache.aset(cache_key, extraction.data)
+        return extraction.data
+
+    # --- optional downsampling to compact mono before upload to Gemini ---
+    with metrics.stage("audio_downsample"):
+        audio_bytes, mime_type = await audio_ingest.downsample(upload)
+    response.headers["X-Audio-Bytes-Out"] = str(len(audio_bytes))
+
+    # --- Gemini call (async, retried with jittered backoff, time-bounded) ---
+    gemini_response = await voice.generate_content(
+        contents=[
+            types.Content(
+                parts=[
+                    extraction_spec.prompt_part,
+                    types.Part.from_bytes(
+                        data=audio_bytes,
+                        mime_type=mime_type,
+                    ),
+                ]
             )
+        ],
+        config=extraction_spec.config,
+    )
 
-    if response is None:
-        # should not happen, but just in case
-        raise HTTPException(
-            status_code=500,
-            detail="No response from Gemini after retries.",
-        )
+    data = voice.parse_response_json(gemini_response)
+
+    response.headers["X-Extraction-Tier"] = "llm"
+    tracing.annotate(extraction_tier="llm")
+    await voice.voice_cache.aset(cache_key, data)
+    return data
+
+
+class VoiceTextRequest(BaseModel):
+    text: str
+    spec: str | None = None
 
-    # --- parse JSON returned by Gemini ---
+
+@app.post("/voice-form/text")
+async def voice_form_text(request: VoiceTextRequest, response: Response):
+    """
+    Same fields as /voice-form, from a transcript. A local rule-based parser
+    answers when it finds every required field; Gemini is only called to fill
+    the gaps. X-Extraction-Tier tells which tier answered.
+    """
     try:
-        json_str: str = response.text
-        data = json.loads(json_str)
-    except Exception as e:
-        print("Error parsing Gemini response:", e)
-        raise HTTPException(
-            status_code=500,
-            detail=f"Invalid JSON from Gemini: {e}",
-        )
+        extraction_spec = get_spec(request.spec)
+    except KeyError:
+        raise HTTPException(status_code=400, detail=f"Unknown extraction spec: {request.spec}")
 
-    return data
+    extraction = await voice_pipeline.extract_from_text(request.text, extraction_spec)
+    response.headers["X-Extraction-Tier"] = extraction.tier
+    return extraction.data
+
+
+@app.get("/voice-form/specs")
+def voice_form_specs():
+    """Extraction spec versions /voice-form can serve."""
+    return {
+        version: {"language": s.language, "fields": list(s.fields)}
+        for version, s in EXTRACTION_SPECS.items()
+    }
+
+
+@app.get("/stats/voice-cache")
+def voice_cache_stats():
+    """Size and hit rate of the /voice-form extraction cache."""
+    return voice.voice_cache.stats()
+
+
+IMPORT_SECONDS = round(time.perf_counter() - IMPORT_STARTED, 4)
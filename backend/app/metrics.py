@@ -0,0 +1,155 @@
+"""
+Prometheus metrics for the backend, served on /metrics.
+
+- http_request_duration_seconds{method, endpoint, status}: latency per route
+  (the route template, so path parameters do not explode the label set)
+- http_requests_in_flight
+- http_request_errors_total{endpoint, type}: 4xx/5xx responses as http_<code>,
+  unhandled exceptions by class name
+- stage_duration_seconds{stage}: time spent in each step of a request
+  (validation, dataframe, preprocess, estimator, audio_read,
+  audio_downsample, gemini_call, gemini_backoff, json_parse)
+- gemini_retries_total: Gemini attempts retried after an overload error
+
+Label children for the stages are created once at import, so timing a stage
+is two perf_counter calls, one histogram observe and one span append. With several worker
+processes, set PROMETHEUS_MULTIPROC_DIR to an empty directory shared by the
+workers and /metrics aggregates all of them.
+"""
+
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+from app import tracing
+
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+STAGES = (
+    "validation", "dataframe", "preprocess", "estimator",
+    "audio_read", "audio_downsample", "gemini_call", "gemini_backoff", "json_parse",
+)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "endpoint", "status"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests being served",
+    multiprocess_mode="livesum",
+)
+ERRORS = Counter(
+    "http_request_errors_total",
+    "HTTP requests that failed, by error type",
+    ["endpoint", "type"],
+)
+STAGE_LATENCY = Histogram(
+    "stage_duration_seconds",
+    "Time spent in one stage of a request",
+    ["stage"],
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+             0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+GEMINI_RETRIES = Counter("gemini_retries_total", "Gemini calls retried after an overload error")
+
+_stage_children = {name: STAGE_LATENCY.labels(name) for name in STAGES}
+
+
+class stage:
+    """
+    Context manager timing one stage: `with metrics.stage("estimator"): ...`
+    The time also becomes a span of the current request (app.tracing).
+    """
+
+    __slots__ = ("_name", "_start")
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe_stage(self._name, time.perf_counter() - self._start)
+        return False
+
+
+def observe_stage(name: str, seconds: float) -> None:
+    _stage_children[name].observe(seconds)
+    tracing.add_span(name, seconds)
+
+
+class PrometheusMiddleware:
+    """
+    Plain ASGI middleware (no BaseHTTPMiddleware task/stream overhead) that
+    records latency, in-flight count and errors of every HTTP request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._templates = None
+
+    def _endpoint(self, scope) -> str:
+        # the router stores the matched endpoint function in the scope
+        if self._templates is None:
+            self._templates = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self._templates.get(scope.get("endpoint"), "unmatched")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        error_type = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            error_type = type(e).__name__
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_FLIGHT.dec()
+            endpoint = self._endpoint(scope)
+            if error_type is None and status >= 400:
+                error_type = f"http_{status}"
+            if error_type is not None:
+                ERRORS.labels(endpoint, error_type).inc()
+            REQUEST_LATENCY.labels(scope["method"], endpoint, str(status)).observe(elapsed)
+
+
+def render() -> tuple[bytes, str]:
+    """The /metrics body and its content type."""
+    if MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,122 @@
+"""
+/models endpoints: inspect the model registry, load a new version in the
+background, switch the active version and unload old ones.
+
+Loading a pickle executes code, so these endpoints only accept files that
+already sit in app/models/ and require the X-Admin-Token header to match
+MODEL_ADMIN_TOKEN. Without that env var the write endpoints are disabled.
+
+Every worker process has its own registry. When MODEL_REGISTRY_STATE names
+a file all workers share (gunicorn.conf.py sets one up with more than one
+worker), the write endpoints record the change there and every worker applies
+it within MODEL_REGISTRY_POLL_SECONDS (app.registry_sync). GET /models
+describes the answering worker, with the state revision it has applied.
+Several workers without a shared state file would diverge, so the write
+endpoints answer 409 then.
+"""
+
+import os
+import secrets
+from pathlib import Path
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Header, HTTPException
+from pydantic import BaseModel
+
+from app import inference
+from app.registry_sync import RegistrySync
+
+MODEL_ADMIN_TOKEN = os.getenv("MODEL_ADMIN_TOKEN")
+SERVER_WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# registry state shared by the workers; unset: each worker's registry is on its own
+MODEL_REGISTRY_STATE = os.getenv("MODEL_REGISTRY_STATE") or None
+MODEL_REGISTRY_POLL_SECONDS = float(os.getenv("MODEL_REGISTRY_POLL_SECONDS", "1.0"))
+
+registry_sync = (
+    RegistrySync(Path(MODEL_REGISTRY_STATE), inference.registry, inference.resolve_model_file)
+    if MODEL_REGISTRY_STATE else None
+)
+
+router = APIRouter(prefix="/models")
+
+
+def require_admin(x_admin_token: str | None = Header(default=None)):
+    if not MODEL_ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Model administration is disabled.")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, MODEL_ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token.")
+    if SERVER_WORKERS > 1 and registry_sync is None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"{SERVER_WORKERS} workers are running, each with its own registry; set "
+                   "MODEL_REGISTRY_STATE to a file they share to change models.",
+        )
+
+
+class LoadVersionRequest(BaseModel):
+    version: str
+    filename: str
+    activate: bool = True
+
+
+class ActivateRequest(BaseModel):
+    version: str
+
+
+def _load_in_background(name: str, version: str, path, activate: bool) -> None:
+    try:
+        inference.registry.load(name, version, path, activate=activate)
+        print(f"Model {name}:{version} loaded from {path.name} (active={activate})")
+    except Exception as e:
+        # the failure is kept in the registry's pending status for GET /models
+        print(f"Loading model {name}:{version} failed:", e)
+
+
+@router.get("")
+def list_models():
+    """Loaded versions, the active one per model, and loads in progress (of this worker)."""
+    revision = registry_sync.applied_revision if registry_sync is not None else None
+    return {"worker_pid": os.getpid(), "registry_revision": revision, **inference.registry.snapshot()}
+
+
+@router.post("/{name}/versions", status_code=202, dependencies=[Depends(require_admin)])
+def load_version(name: str, request: LoadVersionRequest, background_tasks: BackgroundTasks):
+    """
+    Loads, smoke-tests and (by default) activates a new version off the
+    request path. Poll GET /models for the outcome.
+    """
+    try:
+        path = inference.resolve_model_file(request.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if registry_sync is not None:
+        # every worker loads it, this one right after the response
+        registry_sync.record_load(name, request.version, request.filename, request.activate)
+        background_tasks.add_task(registry_sync.apply)
+    else:
+        background_tasks.add_task(_load_in_background, name, request.version, path, request.activate)
+    return {"status": "loading", "name": name, "version": request.version}
+
+
+@router.post("/{name}/activate", dependencies=[Depends(require_admin)])
+def activate_version(name: str, request: ActivateRequest):
+    """Atomically points `name` at an already loaded version (e.g. a rollback)."""
+    try:
+        inference.registry.activate(name, request.version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=e.args[0])
+    if registry_sync is not None:
+        registry_sync.record_activate(name, request.version)
+    return {"name": name, "active": request.version}
+
+
+@router.delete("/{name}/versions/{version}", dependencies=[Depends(require_admin)])
+def unload_version(name: str, version: str):
+    try:
+        inference.registry.unload(name, version)
+        if registry_sync is not None:
+            registry_sync.record_unload(name, version)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"name": name, "unloaded": version}
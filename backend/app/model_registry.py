@@ -0,0 +1,115 @@
+"""
+Registry of named, versioned model pipelines.
+
+Several versions of a model can be loaded side by side. A new version is
+loaded and smoke-tested off the request path, then published by swapping the
+"active" pointer under a lock; requests already scoring keep the ModelVersion
+object they started with, so nothing is dropped during a swap. Callers may
+also pin a specific version.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+
+@dataclass
+class ModelVersion:
+    name: str
+    version: str
+    path: Path
+    pipeline: Any
+    fast_engine: Any
+    sha256: str
+    loaded_at: float = field(default_factory=time.time)
+    timings: dict = field(default_factory=dict)
+
+    def describe(self) -> dict:
+        return {
+            "version": self.version,
+            "path": self.path.name,
+            "sha256": self.sha256,
+            "engine": self.fast_engine.engine if self.fast_engine is not None else "pipeline",
+            "loaded_at": self.loaded_at,
+            **self.timings,
+        }
+
+
+class ModelRegistry:
+    def __init__(self, loader: Callable[[str, str, Path], ModelVersion]):
+        """
+        loader(name, version, path) loads, verifies and warms one version; it
+        raises if the version must not be served.
+        """
+        self._loader = loader
+        self._versions: dict[str, dict[str, ModelVersion]] = {}
+        self._active: dict[str, str] = {}
+        # (name, version) -> "loading" or "failed: <reason>"
+        self._pending: dict[tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def load(self, name: str, version: str, path: Path, activate: bool = True) -> ModelVersion:
+        """Loads a version (blocking) and, if asked, makes it the active one."""
+        with self._lock:
+            if self._pending.get((name, version)) == "loading":
+                raise RuntimeError(f"{name}:{version} is already loading")
+            self._pending[(name, version)] = "loading"
+
+        try:
+            loaded = self._loader(name, version, path)
+        except Exception as e:
+            with self._lock:
+                self._pending[(name, version)] = f"failed: {e}"
+            raise
+
+        with self._lock:
+            self._versions.setdefault(name, {})[version] = loaded
+            if activate or name not in self._active:
+                self._active[name] = version
+            del self._pending[(name, version)]
+        return loaded
+
+    def activate(self, name: str, version: str) -> None:
+        with self._lock:
+            if version not in self._versions.get(name, {}):
+                raise KeyError(f"{name}:{version} is not loaded")
+            self._active[name] = version
+
+    def unload(self, name: str, version: str) -> None:
+        with self._lock:
+            if self._active.get(name) == version:
+                raise ValueError(f"{name}:{version} is active; activate another version first")
+            self._versions.get(name, {}).pop(version, None)
+
+    def get(self, name: str, version: str | None = None) -> ModelVersion:
+        """Active version of `name`, or the pinned `version`. KeyError if unknown."""
+        versions = self._versions.get(name)
+        if not versions:
+            raise KeyError(f"model {name!r} is not loaded")
+        if version is None:
+            version = self._active[name]
+        try:
+            return versions[version]
+        except KeyError:
+            raise KeyError(f"{name}:{version} is not loaded") from None
+
+    def has(self, name: str) -> bool:
+        return bool(self._versions.get(name))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            names = set(self._versions) | {name for name, _ in self._pending}
+            return {
+                name: {
+                    "active": self._active.get(name),
+                    "versions": {
+                        v: mv.describe() for v, mv in self._versions.get(name, {}).items()
+                    },
+                    "pending": {
+                        v: status for (n, v), status in self._pending.items() if n == name
+                    },
+                }
+                for name in sorted(names)
+            }
@@ -0,0 +1,136 @@
+"""
+Keeps the model registries of several worker processes in step.
+
+Each worker has its own ModelRegistry, so with more than one worker a
+/models call cannot just change the registry of the worker that answered
+it. Instead it records the change in a shared JSON file (the desired state:
+which versions are loaded, from which file, and which one is active per
+model), and every worker polls that file and applies it to its own registry.
+The answering worker applies it right away.
+
+The file holds the desired state, not a log of calls, so a worker that is
+forked later (after a crash) catches up on its first poll. Writers hold an
+exclusive flock on a sidecar lock file and replace the state atomically, so
+readers never see a half-written file. Versions that are not in the file
+(the default model loaded at startup) are left alone.
+"""
+
+import asyncio
+import contextlib
+import fcntl
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable
+
+from app.model_registry import ModelRegistry
+
+# the unload of a version is recorded as this file name
+UNLOADED = None
+
+
+class RegistrySync:
+    def __init__(self, path: Path, registry: ModelRegistry, resolve_file: Callable[[str], Path]):
+        """
+        path is the shared state file, registry this worker's registry and
+        resolve_file(filename) the model file path (raises ValueError).
+        """
+        self.path = Path(path)
+        self.registry = registry
+        self.resolve_file = resolve_file
+        self.applied_revision = None
+        self._apply_lock = threading.Lock()
+
+    def read(self) -> dict:
+        try:
+            return json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return {"revision": 0, "models": {}}
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with open(self.path.with_name(self.path.name + ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _update(self, change: Callable[[dict], None]) -> int:
+        """Read-modify-write of the state under the lock; returns the new revision."""
+        with self._locked():
+            state = self.read()
+            change(state)
+            state["revision"] += 1
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(state, indent=1))
+            os.replace(tmp, self.path)
+            return state["revision"]
+
+    def record_load(self, name: str, version: str, filename: str, activate: bool) -> int:
+        def change(state):
+            model = state["models"].setdefault(name, {"active": None, "versions": {}})
+            model["versions"][version] = filename
+            if activate:
+                model["active"] = version
+
+        return self._update(change)
+
+    def record_activate(self, name: str, version: str) -> int:
+        def change(state):
+            state["models"].setdefault(name, {"active": None, "versions": {}})["active"] = version
+
+        return self._update(change)
+
+    def record_unload(self, name: str, version: str) -> int:
+        def change(state):
+            model = state["models"].setdefault(name, {"active": None, "versions": {}})
+            if model["active"] == version:
+                raise ValueError(f"{name}:{version} is active; activate another version first")
+            model["versions"][version] = UNLOADED
+
+        return self._update(change)
+
+    def apply(self) -> bool:
+        """
+        Brings this worker's registry to the shared state (blocking: loads
+        run here). Returns False when the state was already applied.
+        """
+        with self._apply_lock:
+            state = self.read()
+            if state["revision"] == self.applied_revision:
+                return False
+            loaded = self.registry.snapshot()
+            for name, model in state["models"].items():
+                have = loaded.get(name, {}).get("versions", {})
+                for version, filename in model["versions"].items():
+                    if filename is UNLOADED:
+                        if version in have:
+                            self._try(self.registry.unload, name, version)
+                    elif version not in have:
+                        self._try(self._load, name, version, filename)
+                active = model["active"]
+                if active is not None:
+                    # stays on the current version if this worker could not load it
+                    self._try(self.registry.activate, name, active)
+            self.applied_revision = state["revision"]
+            return True
+
+    async def poll(self, interval: float) -> None:
+        """Applies the shared state every `interval` seconds, until cancelled."""
+        while True:
+            try:
+                await asyncio.to_thread(self.apply)
+            except (OSError, ValueError) as e:
+                print("Registry sync: reading the shared state failed:", e)
+            await asyncio.sleep(interval)
+
+    def _load(self, name: str, version: str, filename: str) -> None:
+        self.registry.load(name, version, self.resolve_file(filename), activate=False)
+        print(f"Model {name}:{version} loaded from {filename} (pid {os.getpid()})")
+
+    @staticmethod
+    def _try(operation, *args) -> None:
+        try:
+            operation(*args)
+        except Exception as e:
+            # load failures are also kept in the registry's pending status for GET /models
+            print(f"Registry sync: {operation.__name__}{args} failed in pid {os.getpid()}:", e)
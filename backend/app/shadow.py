@@ -0,0 +1,145 @@
+"""
+Shadow scoring of a candidate model on live /predict traffic.
+
+After the primary model has answered, the same payloads are handed to a
+small background executor that scores them with the candidate. Only the
+hand-off (a bounded executor submit) happens on the request path; when the
+executor is saturated the sample is dropped rather than queued.
+
+Each scored row is stored in a fixed-size ring buffer of float32 columns
+(primary / candidate probability, primary / candidate latency), from which
+summary() derives probability deltas, decision flips and timing percentiles.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+import numpy as np
+
+
+class ShadowScorer:
+    def __init__(self, resolve_candidate: Callable[[], Any], score: Callable[[Any, list[dict]], np.ndarray],
+                 buffer_size: int = 10000, max_workers: int = 1, max_pending: int = 64,
+                 threshold: float = 0.5):
+        """
+        resolve_candidate() returns the candidate model or None (not loaded);
+        score(model, payloads) returns its class-1 probabilities.
+        """
+        self.resolve_candidate = resolve_candidate
+        self.score = score
+        self.threshold = threshold
+        self.max_pending = max_pending
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shadow")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self._size = buffer_size
+        self._primary = np.zeros(buffer_size, dtype=np.float32)
+        self._candidate = np.zeros(buffer_size, dtype=np.float32)
+        self._primary_ms = np.zeros(buffer_size, dtype=np.float32)
+        self._candidate_ms = np.zeros(buffer_size, dtype=np.float32)
+        self._next = 0
+        self._filled = 0
+
+        self.submitted = 0
+        self.dropped = 0
+        self.unavailable = 0
+        self.errors = 0
+        self.candidate_label = None
+
+    def submit(self, payloads: list[dict], primary_probas, primary_seconds: float) -> None:
+        """
+        Queues a shadow comparison. Never blocks and never raises: the caller
+        is on the request path.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending += 1
+            self.submitted += 1
+        per_row_ms = primary_seconds * 1000 / max(1, len(payloads))
+        try:
+            self._executor.submit(self._run, list(payloads), np.asarray(primary_probas), per_row_ms)
+        except RuntimeError:
+            # executor shut down
+            with self._lock:
+                self._pending -= 1
+
+    def _run(self, payloads, primary_probas, primary_ms: float) -> None:
+        try:
+            candidate = self.resolve_candidate()
+            if candidate is None:
+                with self._lock:
+                    self.unavailable += 1
+                return
+            start = time.perf_counter()
+            candidate_probas = np.asarray(self.score(candidate, payloads))
+            candidate_ms = (time.perf_counter() - start) * 1000 / len(payloads)
+            self._record(primary_probas, candidate_probas, primary_ms, candidate_ms)
+            self.candidate_label = f"{candidate.name}:{candidate.version}"
+        except Exception as e:
+            print("Shadow scoring failed:", e)
+            with self._lock:
+                self.errors += 1
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _record(self, primary, candidate, primary_ms: float, candidate_ms: float) -> None:
+        with self._lock:
+            for p, c in zip(primary, candidate):
+                i = self._next
+                self._primary[i] = p
+                self._candidate[i] = c
+                self._primary_ms[i] = primary_ms
+                self._candidate_ms[i] = candidate_ms
+                self._next = (i + 1) % self._size
+                self._filled = min(self._filled + 1, self._size)
+
+    def summary(self) -> dict:
+        with self._lock:
+            n = self._filled
+            primary = self._primary[:n].astype(np.float64)
+            candidate = self._candidate[:n].astype(np.float64)
+            primary_ms = self._primary_ms[:n].astype(np.float64)
+            candidate_ms = self._candidate_ms[:n].astype(np.float64)
+            counters = {
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "candidate_unavailable": self.unavailable,
+                "errors": self.errors,
+                "pending": self._pending,
+            }
+
+        result = {"candidate": self.candidate_label, "samples": n, **counters}
+        if n == 0:
+            return result
+
+        delta = candidate - primary
+        flips = (primary > self.threshold) != (candidate > self.threshold)
+        result.update({
+            "mean_delta": round(float(delta.mean()), 6),
+            "mean_abs_delta": round(float(np.abs(delta).mean()), 6),
+            "p95_abs_delta": round(float(np.percentile(np.abs(delta), 95)), 6),
+            "max_abs_delta": round(float(np.abs(delta).max()), 6),
+            "decision_flips": int(flips.sum()),
+            "flip_rate": round(float(flips.mean()), 6),
+            "approved_primary": int((primary > self.threshold).sum()),
+            "approved_candidate": int((candidate > self.threshold).sum()),
+            "primary_ms_per_row": {
+                "mean": round(float(primary_ms.mean()), 4),
+                "p95": round(float(np.percentile(primary_ms, 95)), 4),
+            },
+            "candidate_ms_per_row": {
+                "mean": round(float(candidate_ms.mean()), 4),
+                "p95": round(float(np.percentile(candidate_ms, 95)), 4),
+            },
+        })
+        return result
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
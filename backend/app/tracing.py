@@ -0,0 +1,241 @@
+"""
+Request IDs, span timing and structured logs for the backend.
+
+Every HTTP request gets an ID: the caller's X-Request-ID header (the Django
+frontend sends one) or a new one. Stages timed with app.metrics.stage() are
+also recorded as spans of the current request, and when the request finishes
+one JSON line is logged with the ID, route, status, total time, the spans
+and any annotations (cache hit, batch size, ...). The response carries the
+ID back plus a Server-Timing header with the same spans, so the caller can
+tell its network hop apart from time spent here.
+
+    {"message": "request", "request_id": "3f2a...", "path": "/predict", "status": 200,
+     "duration_ms": 41.7, "spans": [{"name": "validation", "ms": 0.03},
+     {"name": "batch_queue_wait", "ms": 38.9}, {"name": "batch_score", "ms": 2.4, "batch_size": 12}]}
+
+Optional slow-request profiler: with TRACE_PROFILE_SLOW_MS set, a sampler
+thread takes a stack sample of the app's threads every
+TRACE_PROFILE_INTERVAL_MS while any request is past that threshold, and the
+request's log line gets the most frequent stacks (folded format, as used by
+flame graph tools).
+"""
+
+import contextvars
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from pythonjsonlogger.json import JsonFormatter
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# fraction of ordinary requests logged; slow and failed ones are always logged
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "500"))
+TRACE_PROFILE_SLOW_MS = float(os.getenv("TRACE_PROFILE_SLOW_MS", "0"))  # 0: profiler off
+TRACE_PROFILE_INTERVAL_MS = float(os.getenv("TRACE_PROFILE_INTERVAL_MS", "10"))
+TRACE_PROFILE_TOP = 10
+
+# IDs from callers are echoed into logs and headers: keep them short and plain
+_VALID_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
+
+logger = logging.getLogger("app.trace")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(JsonFormatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(os.getenv("TRACE_LOG_LEVEL", "INFO"))
+    logger.propagate = False
+
+
+class Trace:
+    __slots__ = ("request_id", "started", "spans", "attributes", "samples")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.spans: list[dict] = []
+        self.attributes: dict = {}
+        self.samples: Counter | None = None
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+
+_current: contextvars.ContextVar[Trace | None] = contextvars.ContextVar("trace", default=None)
+
+
+def current_request_id() -> str | None:
+    trace = _current.get()
+    return trace.request_id if trace is not None else None
+
+
+def add_span(name: str, seconds: float, **attributes) -> None:
+    """Records a span on the current request, if any (no-op outside a request)."""
+    trace = _current.get()
+    if trace is not None:
+        trace.spans.append({"name": name, "ms": round(seconds * 1000, 3), **attributes})
+
+
+def annotate(**attributes) -> None:
+    trace = _current.get()
+    if trace is not None:
+        trace.attributes.update(attributes)
+
+
+def server_timing(trace: Trace, total_ms: float) -> str:
+    parts = [f"{span['name']};dur={span['ms']}" for span in trace.spans]
+    parts.append(f"total;dur={round(total_ms, 3)}")
+    return ", ".join(parts)
+
+
+# --- slow-request sampling profiler ---
+
+_APP_DIR = str(Path(__file__).resolve().parent)
+
+
+class SlowRequestProfiler:
+    """
+    Samples thread stacks only while some request has been running longer
+    than `threshold_ms`; idle ticks cost one dict scan.
+    """
+
+    def __init__(self, threshold_ms: float, interval_ms: float):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self._active: dict[int, Trace] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="trace-profiler", daemon=True)
+            self._thread.start()
+
+    def begin(self, trace: Trace) -> None:
+        with self._lock:
+            self._active[id(trace)] = trace
+
+    def end(self, trace: Trace) -> None:
+        with self._lock:
+            self._active.pop(id(trace), None)
+
+    @staticmethod
+    def _folded_stacks() -> list[str]:
+        stacks = []
+        me = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == me:
+                continue
+            names = []
+            in_app = False
+            while frame is not None:
+                code = frame.f_code
+                in_app = in_app or code.co_filename.startswith(_APP_DIR)
+                names.append(f"{Path(code.co_filename).stem}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            # idle event-loop and pool threads never pass through app code
+            if in_app:
+                stacks.append(";".join(reversed(names)))
+        return stacks
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            with self._lock:
+                overdue = [t for t in self._active.values() if now - t.started >= self.threshold]
+            if not overdue:
+                continue
+            # requests share the process, so one snapshot serves every overdue request
+            stacks = self._folded_stacks()
+            for trace in overdue:
+                if trace.samples is None:
+                    trace.samples = Counter()
+                trace.samples.update(stacks)
+
+
+profiler = SlowRequestProfiler(TRACE_PROFILE_SLOW_MS, TRACE_PROFILE_INTERVAL_MS) if TRACE_PROFILE_SLOW_MS else None
+
+
+# --- middleware ---
+
+class TracingMiddleware:
+    """Assigns the request ID, collects spans and logs one JSON line per request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                incoming = value.decode("latin-1")
+                break
+        request_id = incoming if incoming and _VALID_ID.match(incoming) else uuid.uuid4().hex
+        trace = Trace(request_id)
+        token = _current.set(trace)
+        if profiler is not None:
+            profiler.start()
+            profiler.begin(trace)
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode()))
+                headers.append((b"server-timing", server_timing(trace, trace.elapsed_ms()).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        error = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            if profiler is not None:
+                profiler.end(trace)
+            _current.reset(token)
+            self._log(scope, trace, status, error)
+
+    @staticmethod
+    def _log(scope, trace: Trace, status: int, error: str | None) -> None:
+        duration_ms = trace.elapsed_ms()
+        slow = duration_ms >= TRACE_SLOW_MS
+        if not (slow or error or status >= 500 or random.random() < TRACE_SAMPLE_RATE):
+            return
+        record = {
+            "request_id": trace.request_id,
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status,
+            "duration_ms": round(duration_ms, 3),
+            "slow": slow,
+            "spans": trace.spans,
+            **trace.attributes,
+        }
+        if error:
+            record["error"] = error
+        if trace.samples:
+            record["profile"] = {
+                "samples": sum(trace.samples.values()),
+                "interval_ms": TRACE_PROFILE_INTERVAL_MS,
+                "stacks": dict(trace.samples.most_common(TRACE_PROFILE_TOP)),
+            }
+        logger.log(logging.WARNING if slow or error else logging.INFO, "request", extra=record)
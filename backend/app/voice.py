@@ -0,0 +1,131 @@
+"""
+Non-blocking Gemini calls for /voice-form.
+
+Uses the async Gemini client (one shared client, so its HTTP connections are
+reused), caps the number of concurrent Gemini calls per worker, retries
+overload errors with jittered backoff on asyncio.sleep and bounds the whole
+call with a per-request timeout. Nothing here blocks the event loop, so a slow
+voice note does not stall /predict on the same worker.
+"""
+
+import asyncio
+import json
+import os
+import random
+
+from fastapi import HTTPException
+from google import genai
+from google.api_core.exceptions import ServiceUnavailable
+from google.genai import errors, types
+
+from app import metrics
+from app.voice_cache import build_voice_cache
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")  # lighter / more stable
+GEMINI_MAX_RETRIES = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+GEMINI_BACKOFF_SECONDS = float(os.getenv("GEMINI_BACKOFF_SECONDS", "2"))
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "60"))
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+# e.g. http://127.0.0.1:8900 for benchmarks.fake_gemini_server
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+
+# --- Gemini client (uses GEMINI_API_KEY env var), created on first voice request ---
+client = None
+
+
+def get_client():
+    global client
+    if client is None:
+        if GEMINI_BASE_URL:
+            client = genai.Client(http_options=types.HttpOptions(base_url=GEMINI_BASE_URL))
+        else:
+            client = genai.Client()
+    return client
+
+# parsed extraction results keyed on (audio, MIME type, prompt, model)
+voice_cache = build_voice_cache(
+    os.getenv("VOICE_CACHE_BACKEND", "memory"),
+    size=int(os.getenv("VOICE_CACHE_SIZE", "256")),
+    path=os.getenv("VOICE_CACHE_PATH", "/tmp/voice_cache.sqlite3"),
+)
+
+# limits in-flight Gemini calls per worker; extra requests wait here
+gemini_limiter = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
+
+def _is_overloaded(error: Exception) -> bool:
+    # 503 UNAVAILABLE: model overloaded (api_core or google-genai flavour)
+    if isinstance(error, ServiceUnavailable):
+        return True
+    return isinstance(error, errors.ServerError) and error.code == 503
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform(0, base * 2^(attempt-1))."""
+    return random.uniform(0, GEMINI_BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+
+async def _generate_with_retries(contents, config):
+    for attempt in range(1, GEMINI_MAX_RETRIES + 1):
+        try:
+            async with gemini_limiter:
+                with metrics.stage("gemini_call"):
+                    return await get_client().aio.models.generate_content(
+                        model=GEMINI_MODEL,
+                        contents=contents,
+                        config=config,
+                    )
+        except Exception as e:
+            if not _is_overloaded(e):
+                # other error: no retry
+                print("Error calling Gemini:", e)
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Error calling Gemini API: {e}",
+                )
+            print(f"Gemini ServiceUnavailable on attempt {attempt}: {e}")
+            if attempt == GEMINI_MAX_RETRIES:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Voice model is temporarily overloaded. Please try again in a moment.",
+                )
+            # the limiter slot is released while we back off
+            metrics.GEMINI_RETRIES.inc()
+            with metrics.stage("gemini_backoff"):
+                await asyncio.sleep(backoff_delay(attempt))
+
+
+async def generate_content(contents, config: types.GenerateContentConfig):
+    """
+    Calls Gemini with retries, the concurrency limiter and an overall timeout
+    covering queueing, every attempt and the backoff between them.
+    """
+    try:
+        async with asyncio.timeout(GEMINI_TIMEOUT_SECONDS):
+            return await _generate_with_retries(contents, config)
+    except TimeoutError:
+        print(f"Gemini call exceeded {GEMINI_TIMEOUT_SECONDS}s")
+        raise HTTPException(
+            status_code=504,
+            detail="Voice model took too long to respond. Please try again.",
+        )
+
+
+def parse_response_json(response) -> dict:
+    """Parses the JSON Gemini returned; 500 if it is not valid JSON."""
+    if response is None:
+        # should not happen, but just in case
+        raise HTTPException(
+            status_code=500,
+            detail="No response from Gemini after retries.",
+        )
+    try:
+        with metrics.stage("json_parse"):
+            json_str: str = response.text
+            return json.loads(json_str)
+    except Exception as e:
+        print("Error parsing Gemini response:", e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Invalid JSON from Gemini: {e}",
+        )
@@ -0,0 +1,202 @@
+"""
+Content-addressed cache for /voice-form extraction results.
+
+The key is a SHA-256 over the audio content hash, the MIME type, the prompt
+text and the Gemini model name, so retrying the same recording returns the
+stored JSON without another Gemini call, while a prompt or model change misses
+naturally.
+
+Backends are pluggable: an in-process LRU (default) or a SQLite file that
+several workers can share.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def extraction_key(audio_sha256: str, mime_type: str, prompt: str, model: str) -> str:
+    """audio_sha256 is the hex SHA-256 of the uploaded audio bytes."""
+    digest = hashlib.sha256()
+    for part in (model.encode(), mime_type.encode(), prompt.encode(), audio_sha256.encode()):
+        # length-prefix each part so field boundaries cannot collide
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class MemoryBackend:
+    name = "memory"
+    blocking = False
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteBackend:
+    name = "sqlite"
+    # disk I/O and up to 5 s of lock wait: async callers run it in a thread
+    blocking = True
+
+    def __init__(self, path: str, maxsize: int = 10000):
+        self.path = path
+        self.maxsize = maxsize
+        self._local = threading.local()
+        # short-lived: the cache is built at import, which may be in a pre-fork
+        # master (gunicorn.conf.py), and a SQLite connection must not cross fork
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS voice_extractions ("
+                    " key TEXT PRIMARY KEY,"
+                    " value TEXT NOT NULL,"
+                    " accessed_at REAL NOT NULL)"
+                )
+                conn.execute(
+                    "CREATE INDEX IF NOT EXISTS voice_extractions_accessed"
+                    " ON voice_extractions (accessed_at)"
+                )
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        # one connection per thread and process, opened on first use; WAL lets
+        # several workers read while one writes. A connection inherited through
+        # fork is left alone (not even closed) and replaced.
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            self._local.conn = self._connect()
+            self._local.pid = pid
+        return self._local.conn
+
+    def get(self, key: str) -> str | None:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value FROM voice_extractions WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute(
+                "UPDATE voice_extractions SET accessed_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+        return row[0]
+
+    def set(self, key: str, value: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO voice_extractions (key, value, accessed_at)"
+                " VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            # keep the newest maxsize entries (least recently used go first)
+            conn.execute(
+                "DELETE FROM voice_extractions WHERE key IN ("
+                " SELECT key FROM voice_extractions ORDER BY accessed_at DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.maxsize,),
+            )
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM voice_extractions").fetchone()[0]
+
+
+class VoiceExtractionCache:
+    def __init__(self, backend=None):
+        # backend None disables caching
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key: str) -> dict | None:
+        if self.backend is None:
+            return None
+        try:
+            value = self.backend.get(key)
+        except sqlite3.Error as e:
+            # a broken cache must never fail the request
+            print("Voice cache read failed:", e)
+            self.errors += 1
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, data: dict) -> None:
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(key, json.dumps(data))
+        except sqlite3.Error as e:
+            print("Voice cache write failed:", e)
+            self.errors += 1
+
+    async def aget(self, key: str) -> dict | None:
+        """get() for async handlers, off the event loop when the backend blocks."""
+        if self.backend is not None and self.backend.blocking:
+            return await asyncio.to_thread(self.get, key)
+        return self.get(key)
+
+    async def aset(self, key: str, data: dict) -> None:
+        if self.backend is not None and self.backend.blocking:
+            await asyncio.to_thread(self.set, key, data)
+        else:
+            self.set(key, data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.backend is not None else None,
+            "size": len(self.backend) if self.backend is not None else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def build_voice_cache(kind: str, size: int, path: str) -> VoiceExtractionCache:
+    kind = kind.lower()
+    if kind == "memory":
+        return VoiceExtractionCache(MemoryBackend(maxsize=size))
+    if kind == "sqlite":
+        return VoiceExtractionCache(SQLiteBackend(path, maxsize=size))
+    if kind in ("off", "none", ""):
+        return VoiceExtractionCache(None)
+    raise ValueError(f"Unknown VOICE_CACHE_BACKEND: {kind!r}")
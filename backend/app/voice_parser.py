@@ -0,0 +1,164 @@
+"""
+Deterministic parser for short dictated loan descriptions.
+
+Handles the phrasing the /voice-form prompt describes ("income 3000 per
+month, credit score 736, loan 10000, grade C3") with regular expressions and
+keyword tables, and maps categorical answers onto the values the extraction
+spec documents. Anything it cannot read is left as None so the caller can
+decide whether the LLM is needed.
+"""
+
+import re
+
+EXTRACTION_FIELDS = (
+    "annual_income",
+    "debt_to_income_ratio",
+    "credit_score",
+    "loan_amount",
+    "interest_rate",
+    "name_surname",
+    "gender",
+    "marital_status",
+    "education_level",
+    "employment_status",
+    "loan_purpose",
+    "grade_subgrade",
+)
+
+# a number like 3000, 3,000, 3.5, 45k, "10 thousand" or "1.5 million"
+_NUMBER = r"(\d[\d,]*(?:\.\d+)?)\s*(k|thousand|grand|million)?\b"
+_MULTIPLIERS = {"k": 1e3, "thousand": 1e3, "grand": 1e3, "million": 1e6}
+_FILLER = r"(?:\s+(?:is|of|about|around|roughly|=|:))*\s*(?:€|eur|euros?|\$)?\s*"
+
+# "income" right after "debt to" is the ratio, not the income
+_DEBT_TO = re.compile(r"\bdebt[\s-]*to[\s-]*$")
+
+_MONTHLY = re.compile(r"\b(?:per|a|each|every|/)\s*month|\bmonthly\b")
+
+_INCOME = re.compile(
+    r"\b(?:(?:annual|yearly|monthly)\s+)?(?:income|salary|earnings?|make|earn)" + _FILLER + _NUMBER
+    + r"[^,.;]{0,20}"  # trailing "per month" / "a year"
+)
+_CREDIT_SCORE = re.compile(r"\bcredit\s*score" + _FILLER + _NUMBER)
+_LOAN_AMOUNT = re.compile(
+    r"\b(?:loan(?:\s+amount)?|borrow(?:ing)?|need)" + _FILLER + _NUMBER
+)
+_INTEREST_RATE = re.compile(
+    r"\binterest(?:\s+rate)?" + _FILLER + r"(\d+(?:\.\d+)?)\s*(?:%|percent)?"
+    r"|(\d+(?:\.\d+)?)\s*(?:%|percent)\s+interest"
+)
+_DTI = re.compile(
+    r"\bdebt[\s-]*to[\s-]*income(?:\s+ratio)?" + _FILLER + r"(\d+(?:\.\d+)?)\s*(%|percent)?"
+)
+_GRADE = re.compile(r"\b(?:sub)?grade" + _FILLER + r"([a-f])\s*-?\s*([1-5])\b")
+# only the prefix ignores case: the name itself must be capitalised
+_NAME = re.compile(r"\b(?i:my name is)\s+([A-Z][\w'-]+(?:\s+[A-Z][\w'-]+)*)")
+
+# keyword -> documented value, longest phrases first so "self-employed" wins over "employed"
+_CATEGORIES = {
+    "gender": [
+        (r"\b(?:female|woman)\b", "Female"),
+        (r"\b(?:male|man)\b", "Male"),
+    ],
+    "marital_status": [
+        (r"\bsingle\b", "Single"),
+        (r"\bmarried\b", "Married"),
+        (r"\bdivorced\b", "Divorced"),
+        (r"\bseparated\b", "Separated"),
+        (r"\bwidow(?:ed|er)?\b", "Widowed"),
+    ],
+    "education_level": [
+        (r"\bhigh\s*school\b", "High School"),
+        (r"\bbachelor'?s?\b", "Bachelor's"),
+        (r"\bmaster'?s?\b", "Master's"),
+        (r"\b(?:phd|ph\.d\.?|doctorate)\b", "PhD"),
+    ],
+    "employment_status": [
+        (r"\bself[\s-]*employed\b", "Self-employed"),
+        (r"\bunemployed\b", "Unemployed"),
+        (r"\bemployed\b", "Employed"),
+        (r"\bretired\b", "Retired"),
+        (r"\bstudent\b", "Student"),
+    ],
+    "loan_purpose": [
+        (r"\bdebt\s*consolidation\b", "Debt consolidation"),
+        (r"\b(?:home\s*improvement|renovat\w*)", "Home improvement"),
+        (r"\b(?:for|buy|new)\s+(?:a\s+)?car\b|\bcar\s+loan\b", "Car"),
+        (r"\b(?:for|pay for)\s+(?:my\s+)?(?:education|studies|tuition)\b", "Education"),
+        (r"\bmedical\b", "Medical"),
+        (r"\b(?:vacation|holiday)\b", "Vacation"),
+    ],
+}
+_CATEGORY_PATTERNS = {
+    field: [(re.compile(pattern), value) for pattern, value in rules]
+    for field, rules in _CATEGORIES.items()
+}
+
+
+def _to_number(digits: str, suffix: str | None) -> float:
+    value = float(digits.replace(",", ""))
+    if suffix:
+        value *= _MULTIPLIERS[suffix]
+    return value
+
+
+def _search_income(lowered: str) -> re.Match | None:
+    for match in _INCOME.finditer(lowered):
+        if not _DEBT_TO.search(lowered, 0, match.start()):
+            return match
+    return None
+
+
+def parse_voice_text(text: str) -> dict:
+    """Extracts the /voice-form fields from a transcript. Missing fields are None."""
+    result = dict.fromkeys(EXTRACTION_FIELDS)
+    if not text:
+        return result
+
+    name = _NAME.search(text)
+    if name:
+        result["name_surname"] = name.group(1)
+
+    lowered = text.lower()
+
+    income = _search_income(lowered)
+    if income:
+        value = _to_number(income.group(1), income.group(2))
+        if _MONTHLY.search(income.group(0)):
+            value *= 12
+        result["annual_income"] = value
+
+    score = _CREDIT_SCORE.search(lowered)
+    if score:
+        result["credit_score"] = _to_number(score.group(1), score.group(2))
+
+    loan = _LOAN_AMOUNT.search(lowered)
+    if loan:
+        result["loan_amount"] = _to_number(loan.group(1), loan.group(2))
+
+    rate = _INTEREST_RATE.search(lowered)
+    if rate:
+        result["interest_rate"] = float(rate.group(1) or rate.group(2))
+
+    dti = _DTI.search(lowered)
+    if dti:
+        value = float(dti.group(1))
+        # "15%" / "15 percent" / "15" all mean 0.15; "0.15" is already a ratio
+        result["debt_to_income_ratio"] = value / 100 if dti.group(2) or value > 1 else value
+
+    grade = _GRADE.search(lowered)
+    if grade:
+        result["grade_subgrade"] = f"{grade.group(1).upper()}{grade.group(2)}"
+
+    for field, patterns in _CATEGORY_PATTERNS.items():
+        for pattern, value in patterns:
+            if pattern.search(lowered):
+                result[field] = value
+                break
+
+    return result
+
+
+def missing_fields(data: dict, required: tuple[str, ...]) -> list[str]:
+    """Required fields the parser could not fill."""
+    return [field for field in required if data.get(field) is None]
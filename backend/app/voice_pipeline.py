@@ -0,0 +1,86 @@
+"""
+Tiered extraction for voice notes.
+
+Tier 1 parses a transcript locally with app.voice_parser. Only when a field in
+VOICE_REQUIRED_FIELDS is still missing is the LLM asked (tier 2), and the
+locally parsed values are kept on top of its answer. Transcripts come from the
+client (/voice-form/text) or from an optional local speech-to-text callable
+configured with VOICE_LOCAL_STT="package.module:function"; that callable takes
+(audio_bytes, mime_type) and returns the transcript or None.
+"""
+
+import asyncio
+import importlib
+import os
+from dataclasses import dataclass
+
+from google.genai import types
+
+from app import voice
+from app.extraction_specs import ExtractionSpec
+from app.voice_parser import missing_fields, parse_voice_text
+
+VOICE_REQUIRED_FIELDS = tuple(
+    field.strip()
+    for field in os.getenv(
+        "VOICE_REQUIRED_FIELDS", "annual_income,credit_score,loan_amount,grade_subgrade"
+    ).split(",")
+    if field.strip()
+)
+
+TRANSCRIPT_PREFIX = "The voice note has already been transcribed. Transcript:\n"
+
+
+@dataclass
+class Extraction:
+    data: dict
+    tier: str  # "local", "local+llm" or "llm"
+
+
+def load_local_stt(spec: str | None):
+    """Resolves "package.module:function" to the speech-to-text callable."""
+    if not spec:
+        return None
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr or "transcribe")
+
+
+local_stt = load_local_stt(os.getenv("VOICE_LOCAL_STT"))
+
+
+async def transcribe_locally(audio_bytes: bytes, mime_type: str) -> str | None:
+    if local_stt is None:
+        return None
+    try:
+        return await asyncio.to_thread(local_stt, audio_bytes, mime_type)
+    except Exception as e:
+        # local STT is best effort; the audio still goes to Gemini
+        print("Local speech-to-text failed:", e)
+        return None
+
+
+async def llm_extract_text(text: str, spec: ExtractionSpec) -> dict:
+    response = await voice.generate_content(
+        contents=[
+            types.Content(
+                parts=[spec.prompt_part, types.Part(text=TRANSCRIPT_PREFIX + text)]
+            )
+        ],
+        config=spec.config,
+    )
+    return voice.parse_response_json(response)
+
+
+async def extract_from_text(text: str, spec: ExtractionSpec, llm=llm_extract_text) -> Extraction:
+    """
+    Local parse first; the LLM (an async callable (text, spec) -> dict) only
+    runs when required fields are missing.
+    """
+    local = parse_voice_text(text)
+    if not missing_fields(local, VOICE_REQUIRED_FIELDS):
+        return Extraction(local, "local")
+
+    remote = await llm(text, spec)
+    merged = {field: remote.get(field) for field in spec.fields}
+    merged.update({field: value for field, value in local.items() if value is not None})
+    return Extraction(merged, "local+llm")
@@ -0,0 +1,111 @@
+"""
+Benchmark: startup and scoring latency of the exported array model
+(app/array_model.py) against the pickled sklearn pipeline.
+
+Startup is measured in fresh interpreters (imports + load); latency in this
+process for one payload and for a batch, through the sklearn pipeline, the
+FastPipeline engine and the NumPy-only array model.
+
+    cd backend
+    python ../models/export_model.py app/models/loan_pipeline_model.pkl
+    python -m benchmarks.array_model
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import timeit
+import warnings
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+from app.array_model import ArrayModel
+from app.fast_inference import FastPipeline
+from app.inference import FEATURE_COLUMNS, MODEL_PATH, WARMUP_PAYLOAD
+
+DEFAULT_ARRAYS = MODEL_PATH.with_suffix(".arrays")
+
+_STARTUP_PICKLE = """
+import time; start = time.perf_counter()
+import joblib, pandas
+model = joblib.load({path!r})
+print(time.perf_counter() - start)
+"""
+
+_STARTUP_ARRAYS = """
+import time; start = time.perf_counter()
+from app.array_model import ArrayModel
+model = ArrayModel({path!r})
+print(time.perf_counter() - start)
+"""
+
+
+def startup_seconds(code: str, repeat: int) -> float:
+    backend_dir = Path(__file__).resolve().parent.parent
+    runs = [
+        float(subprocess.run(
+            [sys.executable, "-c", code], cwd=backend_dir,
+            capture_output=True, text=True, check=True,
+        ).stdout.split()[-1])
+        for _ in range(repeat)
+    ]
+    return min(runs)
+
+
+def best_of(fn, number: int, repeat: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--arrays", type=Path, default=DEFAULT_ARRAYS, help="exported model directory")
+    parser.add_argument("--batch", type=int, default=64)
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    if not (args.arrays / "manifest.json").is_file():
+        parser.error(f"{args.arrays} not found; run models/export_model.py first")
+
+    results = {
+        "startup_seconds": {
+            "pickle (sklearn + pandas)": startup_seconds(_STARTUP_PICKLE.format(path=str(MODEL_PATH)), args.repeat),
+            "arrays (numpy only)": startup_seconds(_STARTUP_ARRAYS.format(path=str(args.arrays)), args.repeat),
+        },
+    }
+
+    pipeline = joblib.load(MODEL_PATH)
+    fast = FastPipeline(pipeline)
+    arrays = ArrayModel(args.arrays)
+    one = pd.DataFrame([WARMUP_PAYLOAD], columns=FEATURE_COLUMNS)
+    payloads = [dict(WARMUP_PAYLOAD, credit_score=600.0 + i) for i in range(args.batch)]
+    batch = pd.DataFrame(payloads, columns=FEATURE_COLUMNS)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        results["single_ms"] = {
+            "pipeline": best_of(lambda: pipeline.predict_proba(one), args.number, args.repeat) * 1000,
+            "fast engine": best_of(lambda: fast.predict_proba_one(WARMUP_PAYLOAD), args.number, args.repeat) * 1000,
+            "arrays": best_of(lambda: arrays.predict_proba_one(WARMUP_PAYLOAD), args.number, args.repeat) * 1000,
+        }
+        results[f"batch_{args.batch}_ms_per_row"] = {
+            "pipeline": best_of(lambda: pipeline.predict_proba(batch), args.number // 10 or 1, args.repeat) * 1000 / args.batch,
+            "fast engine": best_of(lambda: fast.predict_proba(payloads), args.number // 10 or 1, args.repeat) * 1000 / args.batch,
+            "arrays": best_of(lambda: arrays.predict_proba(payloads), args.number // 10 or 1, args.repeat) * 1000 / args.batch,
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for section, rows in results.items():
+        print(section)
+        for name, value in rows.items():
+            print(f"  {name:>26}: {value:10.4f}")
+
+
+if __name__ == "__main__":
+    main()
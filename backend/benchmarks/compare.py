@@ -0,0 +1,92 @@
+"""
+Compares two benchmark result files and flags regressions.
+
+Walks both "results" trees and compares every numeric leaf whose key says
+which direction is better: latencies and durations (*_ms, *_us, *_s,
+us_per_row) should not grow, throughputs (*_rps, *_per_second) should not
+shrink. Exits 1 when any metric got worse by more than --threshold.
+
+    cd backend
+    python -m benchmarks.compare benchmarks/results/predict_micro-<old>.json benchmarks/results/predict_micro-<new>.json
+    python -m benchmarks.compare old.json new.json --threshold 0.05 --only p99
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+LOWER_IS_BETTER = ("_ms", "_us", "_s", "us_per_row")
+HIGHER_IS_BETTER = ("_rps", "_per_second")
+
+
+def _direction(key: str) -> int:
+    """+1 when bigger is better, -1 when smaller is better, 0 when not compared."""
+    if key.endswith(HIGHER_IS_BETTER):
+        return 1
+    if key.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def _leaves(tree: dict, prefix: str = ""):
+    for key, value in tree.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from _leaves(value, path)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, key, value
+
+
+def compare(old: dict, new: dict, threshold: float, only: str | None = None) -> list[dict]:
+    """One row per comparable metric present in both results, with its relative change."""
+    new_values = {path: value for path, _, value in _leaves(new["results"])}
+    rows = []
+    for path, key, before in _leaves(old["results"]):
+        direction = _direction(key)
+        if not direction or path not in new_values or (only and only not in path):
+            continue
+        after = new_values[path]
+        change = (after - before) / before if before else 0.0
+        rows.append({
+            "metric": path,
+            "old": before,
+            "new": after,
+            "change": change,
+            "regression": change * direction < -threshold,
+        })
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("old", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.10, help="tolerated relative slowdown")
+    parser.add_argument("--only", help="compare only metrics whose path contains this")
+    args = parser.parse_args(argv)
+
+    old, new = json.loads(args.old.read_text()), json.loads(args.new.read_text())
+    if old["benchmark"] != new["benchmark"]:
+        print(f"different benchmarks: {old['benchmark']} vs {new['benchmark']}", file=sys.stderr)
+        return 2
+    for label, doc in (("old", old), ("new", new)):
+        env = doc["environment"]
+        print(f"{label}: {(env['commit'] or 'nogit')[:10]}{' (dirty)' if env['dirty'] else ''} "
+              f"{env['timestamp']} {env['platform']} cpus={env['cpu_count']} {env['env']}")
+    if old["settings"] != new["settings"]:
+        print("warning: runs used different settings", file=sys.stderr)
+
+    rows = compare(old, new, args.threshold, args.only)
+    width = max((len(r["metric"]) for r in rows), default=10)
+    for r in rows:
+        flag = "  REGRESSION" if r["regression"] else ""
+        print(f"{r['metric']:<{width}}  {r['old']:>12g}  {r['new']:>12g}  {r['change']:+8.1%}{flag}")
+
+    regressions = [r for r in rows if r["regression"]]
+    print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%} in {len(rows)} metrics")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Local stand-in for the Gemini client used by app.voice.
+
+Mimics the bits of google-genai the backend touches
+(`client.aio.models.generate_content(...)` returning an object with `.text`)
+with a configurable latency and 503 rate, so /voice-form can be load tested
+offline.
+"""
+
+import asyncio
+import json
+import random
+import time
+
+from google.genai import errors
+
+FAKE_EXTRACTION = {
+    "annual_income": 36000,
+    "debt_to_income_ratio": 0.15,
+    "credit_score": 736,
+    "loan_amount": 10000,
+    "interest_rate": 13.67,
+    "name_surname": "John Doe",
+    "gender": "Male",
+    "marital_status": "Single",
+    "education_level": "Bachelor's",
+    "employment_status": "Employed",
+    "loan_purpose": "Car",
+    "grade_subgrade": "C3",
+}
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _FakeModels:
+    def __init__(self, owner):
+        self._owner = owner
+
+    async def generate_content(self, model, contents, config=None):
+        owner = self._owner
+        owner.calls += 1
+        owner.in_flight += 1
+        owner.max_in_flight = max(owner.max_in_flight, owner.in_flight)
+        try:
+            if owner.blocking:
+                # what a synchronous client call does to the event loop
+                time.sleep(owner.latency)
+            else:
+                await asyncio.sleep(owner.latency)
+            if random.random() < owner.error_rate:
+                raise errors.ServerError(503, {"error": {"code": 503, "status": "UNAVAILABLE",
+                                                         "message": "fake overload"}})
+            return FakeResponse(json.dumps(owner.payload))
+        finally:
+            owner.in_flight -= 1
+
+
+class _FakeAio:
+    def __init__(self, owner):
+        self.models = _FakeModels(owner)
+
+
+class FakeGeminiClient:
+    def __init__(self, latency: float = 1.0, error_rate: float = 0.0,
+                 blocking: bool = False, payload: dict | None = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.blocking = blocking
+        self.payload = payload or FAKE_EXTRACTION
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.aio = _FakeAio(self)
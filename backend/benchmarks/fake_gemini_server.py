@@ -0,0 +1,97 @@
+"""
+Fake Gemini HTTP server for load testing /voice-form end to end.
+
+Answers the REST call the google-genai client makes
+(POST /{api_version}/models/{model}:generateContent) after a configurable
+latency, with a configurable share of 503 UNAVAILABLE errors, so the real
+client, its HTTP connection pool and the backend's retry/limiter code are
+all exercised. Point the backend at it with GEMINI_BASE_URL (and any
+GEMINI_API_KEY):
+
+    cd backend
+    python -m benchmarks.fake_gemini_server --port 8900 --latency 0.8 --error-rate 0.05
+    GEMINI_BASE_URL=http://127.0.0.1:8900 GEMINI_API_KEY=fake uvicorn app.main:app --port 8001
+
+Unlike benchmarks.fake_gemini (an in-process stand-in for the client object),
+this one sits behind real sockets.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.fake_gemini import FAKE_EXTRACTION
+
+
+def build_app(latency: float = 1.0, error_rate: float = 0.0, payload: dict | None = None) -> FastAPI:
+    app = FastAPI()
+    app.state.stats = {"calls": 0, "errors": 0, "in_flight": 0, "max_in_flight": 0}
+    text = json.dumps(payload or FAKE_EXTRACTION)
+
+    @app.post("/{api_version}/models/{model_action}")
+    async def generate_content(api_version: str, model_action: str, request: Request):
+        model, _, action = model_action.partition(":")
+        if action != "generateContent":
+            return JSONResponse({"error": {"code": 404, "message": f"unsupported: {action}", "status": "NOT_FOUND"}},
+                                status_code=404)
+        await request.body()
+        stats = app.state.stats
+        stats["calls"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            stats["in_flight"] -= 1
+        if random.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse(
+                {"error": {"code": 503, "message": "The model is overloaded (fake).", "status": "UNAVAILABLE"}},
+                status_code=503,
+            )
+        return {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": text}]},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {"promptTokenCount": 800, "candidatesTokenCount": 60, "totalTokenCount": 860},
+            "modelVersion": model,
+        }
+
+    @app.get("/stats")
+    def stats():
+        return app.state.stats
+
+    return app
+
+
+def serve_in_thread(port: int, latency: float, error_rate: float) -> uvicorn.Server:
+    """Starts the fake on 127.0.0.1:port in a daemon thread and returns once it listens."""
+    server = uvicorn.Server(uvicorn.Config(build_app(latency, error_rate), host="127.0.0.1", port=port,
+                                           log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds per call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 answers")
+    args = parser.parse_args(argv)
+    uvicorn.run(build_app(args.latency, args.error_rate), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
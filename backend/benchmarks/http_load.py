@@ -0,0 +1,190 @@
+"""
+HTTP load generator: throughput and p50/p95/p99 per concurrency level.
+
+Starts the backend with uvicorn in a subprocess (or targets --url) and runs
+a closed loop of N concurrent clients per --concurrency level against one
+endpoint, for --duration seconds after a --warmup. /predict traffic comes
+from benchmarks.payloads (fixed seed, distinct payloads so the result cache
+only answers what real traffic would repeat); /voice-form goes through the
+real google-genai client to benchmarks.fake_gemini_server, with distinct
+audio bytes so the voice cache misses.
+
+    cd backend
+    python -m benchmarks.http_load --endpoint predict --concurrency 1 8 32 64
+    python -m benchmarks.http_load --endpoint voice-form --gemini-latency 0.8 --concurrency 8 32
+    python -m benchmarks.http_load --url http://127.0.0.1:8001 --endpoint predict-batch --batch-size 64
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.payloads import PayloadGenerator
+from benchmarks.results import latency_summary, write_results
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+ENDPOINTS = ("predict", "predict-batch", "voice-form", "voice-form-text")
+# the rule-based parser cannot place every field, so Gemini fills the rest
+VOICE_TEXT = "I earn about {income} dollars a year and I would like to borrow money for my car."
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_backend(port: int, workers: int, env: dict) -> subprocess.Popen:
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+           "--workers", str(workers), "--log-level", "warning", "--no-access-log"]
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env={**os.environ, **env})
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"backend exited with {proc.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/readyz", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("backend did not become ready")
+
+
+class Requests:
+    """Endless, deterministic stream of (path, httpx request kwargs) for one endpoint."""
+
+    def __init__(self, endpoint: str, batch_size: int, seed: int, pool: int = 20000):
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.payloads = PayloadGenerator(seed=seed).payloads(pool)
+        self.counter = itertools.count()
+
+    def next(self) -> tuple[str, dict]:
+        i = next(self.counter)
+        if self.endpoint == "predict":
+            return "/predict", {"json": self.payloads[i % len(self.payloads)]}
+        if self.endpoint == "predict-batch":
+            start = i * self.batch_size
+            rows = [self.payloads[(start + k) % len(self.payloads)] for k in range(self.batch_size)]
+            return "/predict/batch", {"json": rows}
+        if self.endpoint == "voice-form":
+            audio = b"\x1a\x45\xdf\xa3" + i.to_bytes(8, "big") * 256
+            return "/voice-form", {"files": {"audio": (f"note{i}.webm", audio, "audio/webm")}}
+        return "/voice-form/text", {"json": {"text": VOICE_TEXT.format(income=30000 + i)}}
+
+
+async def run_level(http: httpx.AsyncClient, requests: Requests, concurrency: int,
+                    duration: float, warmup: float) -> dict:
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + warmup
+    stop_at = measure_from + duration
+
+    async def client():
+        while (now := loop.time()) < stop_at:
+            path, kwargs = requests.next()
+            start = time.perf_counter()
+            try:
+                r = await http.post(path, **kwargs)
+                status = str(r.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - start
+            if now >= measure_from:
+                latencies.append(elapsed)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    completed = len(latencies)
+    summary = latency_summary(latencies)
+    summary.update({
+        "concurrency": concurrency,
+        "throughput_rps": round(completed / duration, 2),
+        "status": statuses,
+        "error_rate": round(1 - statuses.get("200", 0) / completed, 4) if completed else 0.0,
+    })
+    if requests.endpoint == "predict-batch":
+        summary["rows_per_second"] = round(summary["throughput_rps"] * requests.batch_size)
+    return summary
+
+
+async def run(args, base_url: str) -> dict:
+    requests = Requests(args.endpoint, args.batch_size, args.seed)
+    limits = httpx.Limits(max_connections=max(args.concurrency), max_keepalive_connections=max(args.concurrency))
+    levels = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as http:
+        for concurrency in args.concurrency:
+            level = await run_level(http, requests, concurrency, args.duration, args.warmup)
+            levels[str(concurrency)] = level
+            print(f"  c={concurrency:<4} {level['throughput_rps']:>9.1f} req/s  p50 {level['p50_ms']:8.2f} ms  "
+                  f"p95 {level['p95_ms']:8.2f} ms  p99 {level['p99_ms']:8.2f} ms  status {level['status']}",
+                  file=sys.stderr)
+    return levels
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--endpoint", choices=ENDPOINTS, default="predict")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per level")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds before each level")
+    parser.add_argument("--batch-size", type=int, default=64, help="rows per /predict/batch call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--url", help="existing backend to target instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers of the started backend")
+    parser.add_argument("--gemini-latency", type=float, default=1.0, help="fake Gemini seconds per call")
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--out", type=Path, help="result file (default: benchmarks/results/...)")
+    args = parser.parse_args(argv)
+
+    settings = vars(args) | {"out": str(args.out)}
+    fake_gemini = None
+    backend = None
+    if args.endpoint.startswith("voice-form"):
+        if args.url:
+            print("note: --url given, the target must already point GEMINI_BASE_URL at a fake", file=sys.stderr)
+        else:
+            from benchmarks.fake_gemini_server import serve_in_thread
+            fake_gemini = serve_in_thread(free_port(), args.gemini_latency, args.gemini_error_rate)
+
+    base_url = args.url
+    if base_url is None:
+        port = free_port()
+        # per-request log lines would cost the backend CPU and flood the terminal
+        env = {"TRACE_LOG_LEVEL": os.getenv("TRACE_LOG_LEVEL", "ERROR")}
+        if fake_gemini is not None:
+            env |= {"GEMINI_BASE_URL": f"http://127.0.0.1:{fake_gemini.config.port}", "GEMINI_API_KEY": "fake"}
+        backend = start_backend(port, args.workers, env)
+        base_url = f"http://127.0.0.1:{port}"
+
+    print(f"{args.endpoint} on {base_url}", file=sys.stderr)
+    try:
+        results = {"endpoint": args.endpoint, "levels": asyncio.run(run(args, base_url))}
+    finally:
+        if backend is not None:
+            backend.terminate()
+            backend.wait(timeout=30)
+        if fake_gemini is not None:
+            fake_gemini.should_exit = True
+    if fake_gemini is not None:
+        results["fake_gemini"] = dict(fake_gemini.config.app.state.stats)
+
+    path = write_results(f"http_{args.endpoint}", results, settings, args.out)
+    print(f"Results: {path}")
+
+
+if __name__ == "__main__":
+    main()
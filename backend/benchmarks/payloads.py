@@ -0,0 +1,109 @@
+"""
+Synthetic /predict payloads that follow the training data's distributions.
+
+Numeric features are sampled through a piecewise-linear inverse CDF over the
+quantile knots of benchmarks/payload_profile.json, categorical features with
+the training frequencies. The committed profile comes from the training
+data summary; with the CSV at hand it can be rebuilt from 101 exact
+quantiles. Same seed, same payloads, so runs on different commits score
+identical traffic.
+
+    cd backend
+    python -m benchmarks.payloads --n 3                              # JSON lines on stdout
+    python -m benchmarks.payloads --profile-from ../raw_data/train.csv  # rewrite the profile
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+from app.inference import FEATURE_COLUMNS
+
+PROFILE_PATH = Path(__file__).resolve().parent / "payload_profile.json"
+
+
+def load_profile(path: Path = PROFILE_PATH) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def build_profile(csv_path: Path) -> dict:
+    """Profile with 101 quantile knots per numeric column and exact category frequencies."""
+    import pandas as pd
+
+    data = pd.read_csv(csv_path, usecols=FEATURE_COLUMNS)
+    grid = np.linspace(0, 1, 101)
+    numeric, categorical = {}, {}
+    for name in FEATURE_COLUMNS:
+        values = data[name]
+        missing_rate = round(float(values.isna().mean()), 6)
+        if pd.api.types.is_numeric_dtype(values):
+            present = values.dropna().to_numpy()
+            is_int = bool(np.all(present == np.round(present)))
+            numeric[name] = {
+                "quantiles": [[round(float(q), 2), float(v)] for q, v in zip(grid, np.quantile(present, grid))],
+                "decimals": 0 if is_int else 3 if present.max() < 1 else 2,
+                "missing_rate": missing_rate,
+            }
+        else:
+            frequencies = values.value_counts(normalize=True)
+            categorical[name] = {
+                "values": frequencies.index.tolist(),
+                "weights": [round(float(w), 6) for w in frequencies],
+                "missing_rate": missing_rate,
+            }
+    return {"source": f"{Path(csv_path).name}: exact quantiles and frequencies", "rows": len(data),
+            "numeric": numeric, "categorical": categorical}
+
+
+class PayloadGenerator:
+    def __init__(self, profile: dict | None = None, seed: int = 0):
+        self.profile = profile or load_profile()
+        self.rng = np.random.default_rng(seed)
+
+    def _numeric(self, spec: dict, n: int) -> list:
+        knots = np.asarray(spec["quantiles"], dtype=float)
+        values = np.interp(self.rng.random(n), knots[:, 0], knots[:, 1])
+        values = np.round(values, spec["decimals"])
+        missing = self.rng.random(n) < spec["missing_rate"]
+        cast = int if spec["decimals"] == 0 else float
+        return [None if m else cast(v) for v, m in zip(values, missing)]
+
+    def _categorical(self, spec: dict, n: int) -> list:
+        weights = np.asarray(spec["weights"], dtype=float)
+        picks = self.rng.choice(len(spec["values"]), size=n, p=weights / weights.sum())
+        missing = self.rng.random(n) < spec["missing_rate"]
+        return [None if m else spec["values"][i] for i, m in zip(picks, missing)]
+
+    def payloads(self, n: int) -> list[dict]:
+        columns = {}
+        for name in FEATURE_COLUMNS:
+            if name in self.profile["numeric"]:
+                columns[name] = self._numeric(self.profile["numeric"][name], n)
+            else:
+                columns[name] = self._categorical(self.profile["categorical"][name], n)
+        return [{name: columns[name][i] for name in FEATURE_COLUMNS} for i in range(n)]
+
+    def payload(self) -> dict:
+        return self.payloads(1)[0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=5, help="payloads to print")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile-from", type=Path, help="training CSV to rebuild the profile from")
+    parser.add_argument("--out", type=Path, default=PROFILE_PATH, help="where --profile-from writes")
+    args = parser.parse_args(argv)
+
+    if args.profile_from:
+        args.out.write_text(json.dumps(build_profile(args.profile_from), indent=1))
+        print(f"Wrote {args.out}")
+        return
+    for payload in PayloadGenerator(seed=args.seed).payloads(args.n):
+        print(json.dumps(payload))
+
+
+if __name__ == "__main__":
+    main()
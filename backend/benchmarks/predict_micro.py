@@ -0,0 +1,164 @@
+"""
+Micro-benchmarks of the scoring functions, without HTTP.
+
+Per inference engine (each in its own process, INFERENCE_ENGINE=fast|arrays|pipeline):
+
+- cold: import of app.inference, model load + warm-up, first and second
+  predict_from_payload call, measured in --cold-runs fresh processes;
+- single: predict_from_payload on distinct synthetic payloads (cache misses)
+  and on one repeated payload (cache hits);
+- batch: predict_batch at each --batch-sizes, per call and per row.
+
+Payloads come from benchmarks.payloads with a fixed seed, so two commits
+score identical inputs. Results go to a JSON file (benchmarks.results).
+
+    cd backend
+    python -m benchmarks.predict_micro
+    python -m benchmarks.predict_micro --engines fast --single 5000 --batch-sizes 1 64 1024
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _cold() -> dict:
+    start = time.perf_counter()
+    from app import inference
+    imported = time.perf_counter()
+    inference.load_model()
+    loaded = time.perf_counter()
+
+    from benchmarks.payloads import PayloadGenerator
+    first, second = PayloadGenerator(seed=1).payloads(2)
+    t0 = time.perf_counter()
+    inference.predict_from_payload(first)
+    t1 = time.perf_counter()
+    inference.predict_from_payload(second)
+    t2 = time.perf_counter()
+    return {
+        "import_s": round(imported - start, 4),
+        "load_and_warmup_s": round(loaded - imported, 4),
+        "first_predict_ms": round((t1 - t0) * 1000, 4),
+        "second_predict_ms": round((t2 - t1) * 1000, 4),
+        "engine": inference.get_model().describe()["engine"],
+    }
+
+
+def _warm(n_single: int, batch_sizes: list[int], batch_rows: int) -> dict:
+    from app import inference
+    from benchmarks.payloads import PayloadGenerator
+    from benchmarks.results import latency_summary
+
+    payloads = PayloadGenerator(seed=2).payloads(max(n_single, batch_rows))
+
+    inference.prediction_cache.clear()
+    misses = []
+    for payload in payloads[:n_single]:
+        start = time.perf_counter()
+        inference.predict_from_payload(payload)
+        misses.append(time.perf_counter() - start)
+
+    hits = []
+    for _ in range(n_single):
+        start = time.perf_counter()
+        inference.predict_from_payload(payloads[0])
+        hits.append(time.perf_counter() - start)
+
+    batches = {}
+    for size in batch_sizes:
+        calls = []
+        for offset in range(0, max(size, batch_rows) - size + 1, size):
+            chunk = payloads[offset:offset + size] if offset + size <= len(payloads) else payloads[:size]
+            start = time.perf_counter()
+            inference.predict_batch(chunk)
+            calls.append(time.perf_counter() - start)
+        summary = latency_summary(calls)
+        summary["us_per_row"] = round(summary["mean_ms"] * 1000 / size, 3)
+        summary["rows_per_second"] = round(size / (summary["mean_ms"] / 1000))
+        batches[str(size)] = summary
+
+    return {
+        "single_cache_miss": latency_summary(misses),
+        "single_cache_hit": latency_summary(hits),
+        "batch": batches,
+    }
+
+
+def worker(args) -> None:
+    """Runs inside the per-engine process and prints its results as JSON."""
+    result = {"cold": _cold()}
+    if not args.cold_only:
+        result.update(_warm(args.single, args.batch_sizes, args.batch_rows))
+    print(json.dumps(result))
+
+
+def _spawn(engine: str, args, cold_only: bool) -> dict:
+    cmd = [sys.executable, "-m", "benchmarks.predict_micro", "--worker",
+           "--single", str(args.single), "--batch-rows", str(args.batch_rows),
+           "--batch-sizes", *map(str, args.batch_sizes)]
+    if cold_only:
+        cmd.append("--cold-only")
+    env = {**os.environ, "INFERENCE_ENGINE": engine, "PYTHONWARNINGS": "ignore"}
+    out = subprocess.run(cmd, cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True).stdout
+    # the model loader may print; the result is the last line
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _median(values: list[float]) -> float:
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--engines", nargs="+", default=["fast", "pipeline"], choices=["fast", "arrays", "pipeline"])
+    parser.add_argument("--single", type=int, default=2000, help="single-payload calls per case")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 64, 512])
+    parser.add_argument("--batch-rows", type=int, default=4096, help="rows scored per batch size")
+    parser.add_argument("--cold-runs", type=int, default=3, help="fresh processes for the cold numbers")
+    parser.add_argument("--out", type=Path, help="result file (default: benchmarks/results/...)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--cold-only", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(args)
+        return
+
+    from benchmarks.results import write_results
+
+    results = {}
+    for engine in args.engines:
+        print(f"[{engine}] warm run + {args.cold_runs - 1} extra cold start(s)", file=sys.stderr)
+        main_run = _spawn(engine, args, cold_only=False)
+        colds = [main_run["cold"]] + [_spawn(engine, args, cold_only=True)["cold"]
+                                      for _ in range(args.cold_runs - 1)]
+        main_run["cold"] = {
+            key: _median([c[key] for c in colds]) for key in colds[0] if key != "engine"
+        } | {"engine": colds[0]["engine"], "runs": len(colds)}
+        results[engine] = main_run
+
+    for engine, r in results.items():
+        cold, miss, hit = r["cold"], r["single_cache_miss"], r["single_cache_hit"]
+        print(f"\n{engine} (served by {cold['engine']})")
+        print(f"  cold: import {cold['import_s']:.2f}s  load+warm-up {cold['load_and_warmup_s']:.2f}s  "
+              f"first predict {cold['first_predict_ms']:.2f} ms  second {cold['second_predict_ms']:.2f} ms")
+        print(f"  single miss: p50 {miss['p50_ms']:.3f} ms  p99 {miss['p99_ms']:.3f} ms   "
+              f"hit: p50 {hit['p50_ms']:.4f} ms")
+        for size, b in r["batch"].items():
+            print(f"  batch {size:>5}: {b['mean_ms']:9.3f} ms/call  {b['us_per_row']:9.2f} us/row  "
+                  f"{b['rows_per_second']:>9,} rows/s")
+
+    path = write_results("predict_micro", results, vars(args) | {"out": str(args.out)}, args.out)
+    print(f"\nResults: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+JSON result files for the benchmark suite.
+
+Every run is stamped with the commit, the machine and the knobs that change
+performance, so files from different commits can be compared with
+benchmarks.compare.
+"""
+
+import datetime
+import json
+import os
+import platform
+import subprocess
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+# environment variables that change what is measured
+ENV_KNOBS = (
+    "INFERENCE_ENGINE", "MODEL_MMAP_MODE", "PREDICT_MICROBATCH", "PREDICT_MICROBATCH_MAX_SIZE",
+    "PREDICT_MICROBATCH_MAX_WAIT_MS", "PREDICTION_CACHE_SIZE", "OMP_NUM_THREADS", "TRACE_SAMPLE_RATE",
+    "TRACE_LOG_LEVEL", "GEMINI_MAX_CONCURRENCY", "GEMINI_MAX_RETRIES",
+)
+
+
+def _git(*args: str) -> str | None:
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True,
+                              cwd=Path(__file__).parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "env": {name: os.environ[name] for name in ENV_KNOBS if name in os.environ},
+    }
+
+
+def write_results(name: str, results: dict, settings: dict, out: Path | None = None) -> Path:
+    """Writes {benchmark, environment, settings, results} and returns the path."""
+    env = environment()
+    if out is None:
+        stamp = env["timestamp"].replace(":", "").replace("-", "")[:15]
+        out = RESULTS_DIR / f"{name}-{(env['commit'] or 'nogit')[:10]}-{stamp}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(
+        {"benchmark": name, "environment": env, "settings": settings, "results": results},
+        indent=2, default=str,
+    ))
+    return out
+
+
+def latency_summary(seconds: list[float]) -> dict:
+    """p50/p95/p99/max/mean in ms of a list of durations in seconds."""
+    import numpy as np
+
+    if not seconds:
+        return {"count": 0}
+    ms = np.asarray(seconds) * 1000
+    return {
+        "count": len(ms),
+        "mean_ms": round(float(ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "max_ms": round(float(ms.max()), 4),
+    }
@@ -0,0 +1,148 @@
+"""
+Production profile benchmark: throughput per core and memory per worker.
+
+Starts `gunicorn app.main:app` (gunicorn.conf.py) for each --workers count,
+with the model preloaded in the master and, with --compare-preload, also
+loaded separately in every worker (PRELOAD_MODEL=0). Each server gets a
+closed-loop /predict load (benchmarks.http_load), then the memory of its
+processes is read from /proc/<pid>/smaps_rollup:
+
+- rss: resident pages, counting shared ones in full in every process
+- pss: resident pages with shared ones split between their sharers, so the
+  sum over the processes is the real footprint of the server
+- uss: pages only that process has (what a worker costs on top of the rest)
+
+Linux only (/proc).
+
+    cd backend
+    python -m benchmarks.serve_workers --workers 1 2 4 --compare-preload
+    python -m benchmarks.serve_workers --workers 4 --native-threads 1 --concurrency 64 --duration 20
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.http_load import Requests, free_port, run_level
+from benchmarks.results import write_results
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def memory_kb(pid: int) -> dict:
+    fields = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines()[1:]:
+        name, value = line.split(":", 1)
+        fields[name] = int(value.split()[0])
+    return {
+        "rss_kb": fields["Rss"],
+        "pss_kb": fields["Pss"],
+        "uss_kb": fields["Private_Clean"] + fields["Private_Dirty"],
+    }
+
+
+def children(pid: int) -> list[int]:
+    return [int(c) for c in Path(f"/proc/{pid}/task/{pid}/children").read_text().split()]
+
+
+def start_server(workers: int, native_threads: int | None, preload: bool) -> tuple[subprocess.Popen, int]:
+    port = free_port()
+    env = {
+        **os.environ,
+        "PORT": str(port),
+        "WEB_CONCURRENCY": str(workers),
+        "PRELOAD_MODEL": "1" if preload else "0",
+        "TRACE_LOG_LEVEL": os.getenv("TRACE_LOG_LEVEL", "ERROR"),
+    }
+    if native_threads:
+        env["NATIVE_THREADS"] = str(native_threads)
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "app.main:app", "--log-level", "warning"],
+                            cwd=BACKEND_DIR, env=env)
+    deadline = time.monotonic() + 180
+    # every worker must have finished its startup, not just the first one
+    ready = 0
+    while ready < 4 * workers:
+        if proc.poll() is not None or time.monotonic() > deadline:
+            proc.terminate()
+            raise RuntimeError("server did not become ready")
+        try:
+            ok = httpx.get(f"http://127.0.0.1:{port}/readyz", timeout=1).status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        ready = ready + 1 if ok and len(children(proc.pid)) == workers else 0
+        time.sleep(0.1 if ok else 0.3)
+    return proc, port
+
+
+async def load(port: int, args) -> dict:
+    requests = Requests("predict", batch_size=1, seed=args.seed)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=30, limits=limits) as http:
+        return await run_level(http, requests, args.concurrency, args.duration, args.warmup)
+
+
+def run_one(workers: int, preload: bool, args) -> dict:
+    proc, port = start_server(workers, args.native_threads, preload)
+    try:
+        idle = {"master": memory_kb(proc.pid), "workers": [memory_kb(pid) for pid in children(proc.pid)]}
+        level = asyncio.run(load(port, args))
+        master = memory_kb(proc.pid)
+        per_worker = [memory_kb(pid) for pid in children(proc.pid)]
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
+
+    cores = min(workers * (args.native_threads or 1), os.cpu_count() or 1)
+    return {
+        "workers": workers,
+        "preload": preload,
+        "cores": cores,
+        "throughput_rps": level["throughput_rps"],
+        "throughput_per_core_rps": round(level["throughput_rps"] / cores, 2),
+        "latency": {key: level[key] for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms")},
+        "status": level["status"],
+        "master_rss_kb": master["rss_kb"],
+        "worker_rss_kb": round(sum(w["rss_kb"] for w in per_worker) / len(per_worker)),
+        "worker_pss_kb": round(sum(w["pss_kb"] for w in per_worker) / len(per_worker)),
+        "worker_uss_kb": round(sum(w["uss_kb"] for w in per_worker) / len(per_worker)),
+        "idle_worker_uss_kb": round(sum(w["uss_kb"] for w in idle["workers"]) / len(idle["workers"])),
+        "total_pss_kb": master["pss_kb"] + sum(w["pss_kb"] for w in per_worker),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--native-threads", type=int, help="NATIVE_THREADS per worker (default: gunicorn.conf.py)")
+    parser.add_argument("--compare-preload", action="store_true", help="also run with PRELOAD_MODEL=0")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per server")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, help="result file (default: benchmarks/results/...)")
+    args = parser.parse_args(argv)
+
+    runs = []
+    for preload in (True, False) if args.compare_preload else (True,):
+        for workers in args.workers:
+            run = run_one(workers, preload, args)
+            runs.append(run)
+            print(f"workers={workers} preload={int(preload)}  {run['throughput_rps']:8.1f} req/s  "
+                  f"{run['throughput_per_core_rps']:8.1f} req/s/core  p99 {run['latency']['p99_ms']:7.2f} ms  "
+                  f"worker rss {run['worker_rss_kb'] / 1024:6.1f} MiB  pss {run['worker_pss_kb'] / 1024:6.1f} MiB  "
+                  f"uss {run['worker_uss_kb'] / 1024:6.1f} MiB  server pss {run['total_pss_kb'] / 1024:7.1f} MiB",
+                  file=sys.stderr)
+
+    results = {f"workers_{r['workers']}_preload_{int(r['preload'])}": r for r in runs}
+    path = write_results("serve_workers", results, vars(args) | {"out": str(args.out)}, args.out)
+    print(f"Results: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Load test: /predict latency while /voice-form calls are in flight.
+
+Runs the FastAPI app in-process with the fake Gemini client and fires
+concurrent voice notes alongside a steady stream of /predict calls. With the
+async voice pipeline /predict latency must stay flat; `--blocking` swaps in a
+fake that sleeps synchronously to show what the old handler did.
+
+    cd backend
+    python -m benchmarks.voice_form_load --voice 20 --latency 1.0
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+from app import voice
+from app.main import app
+from benchmarks.fake_gemini import FakeGeminiClient
+
+PREDICT_PAYLOAD = {
+    "annual_income": 36000.0,
+    "debt_to_income_ratio": 0.15,
+    "credit_score": 736.0,
+    "loan_amount": 10000.0,
+    "interest_rate": 13.67,
+    "gender": "Male",
+    "marital_status": "Single",
+    "education_level": "PhD",
+    "employment_status": "Employed",
+    "loan_purpose": "Car",
+    "grade_subgrade": "C3",
+}
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+async def run(args) -> dict:
+    fake = FakeGeminiClient(latency=args.latency, error_rate=args.error_rate, blocking=args.blocking)
+    voice.client = fake
+
+    predict_ms: list[float] = []
+    voice_ms: list[float] = []
+    voice_status: dict[int, int] = {}
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+
+            async def one_voice(i: int):
+                start = time.perf_counter()
+                r = await http.post(
+                    "/voice-form",
+                    files={"audio": (f"note{i}.webm", b"\x1a\x45\xdf\xa3" + bytes([i % 256]) * 2048, "audio/webm")},
+                )
+                voice_ms.append((time.perf_counter() - start) * 1000)
+                voice_status[r.status_code] = voice_status.get(r.status_code, 0) + 1
+
+            async def predict_stream(stop: asyncio.Event):
+                i = 0
+                while not stop.is_set():
+                    start = time.perf_counter()
+                    # vary the payload so the result cache does not answer
+                    await http.post("/predict", json={**PREDICT_PAYLOAD, "loan_amount": 10000.0 + i})
+                    predict_ms.append((time.perf_counter() - start) * 1000)
+                    i += 1
+                    await asyncio.sleep(args.predict_interval_ms / 1000)
+
+            stop = asyncio.Event()
+            stream = asyncio.create_task(predict_stream(stop))
+            started = time.perf_counter()
+            await asyncio.gather(*(one_voice(i) for i in range(args.voice)))
+            elapsed = time.perf_counter() - started
+            stop.set()
+            await stream
+
+    return {
+        "voice_requests": args.voice,
+        "fake_latency_s": args.latency,
+        "blocking_fake": args.blocking,
+        "wall_s": round(elapsed, 3),
+        "voice_status": voice_status,
+        "voice_p50_ms": round(percentile(voice_ms, 50), 1),
+        "voice_max_ms": round(max(voice_ms, default=0.0), 1),
+        "gemini_calls": fake.calls,
+        "gemini_max_in_flight": fake.max_in_flight,
+        "predict_calls": len(predict_ms),
+        "predict_p50_ms": round(statistics.median(predict_ms), 2) if predict_ms else 0.0,
+        "predict_p99_ms": round(percentile(predict_ms, 99), 2),
+        "predict_max_ms": round(max(predict_ms, default=0.0), 2),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--voice", type=int, default=20, help="concurrent /voice-form requests")
+    parser.add_argument("--latency", type=float, default=1.0, help="fake Gemini latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake 503s")
+    parser.add_argument("--blocking", action="store_true", help="fake blocks the event loop")
+    parser.add_argument("--predict-interval-ms", type=float, default=5.0)
+    parser.add_argument("--max-predict-ms", type=float, default=250.0,
+                        help="fail if the slowest /predict exceeds this")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run(args))
+    for key, value in result.items():
+        print(f"{key:>22}: {value}")
+
+    if result["predict_max_ms"] > args.max_predict_ms:
+        print(f"FAIL: /predict took {result['predict_max_ms']} ms while voice notes were in flight")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Micro-benchmark: per-request setup cost of a /voice-form call.
+
+"before" rebuilds the prompt, the types.Schema tree, the
+GenerateContentConfig and the prompt Part for every request (what the
+handler used to do); "after" looks the prebuilt spec up in the registry.
+
+    cd backend
+    python -m benchmarks.voice_spec_setup
+"""
+
+import argparse
+import timeit
+
+from app.extraction_specs import LOAN_PROMPT_EN, build_spec, get_spec, loan_schema_v1
+
+
+def per_request_rebuild():
+    return build_spec("loan-v1-en", "en", LOAN_PROMPT_EN, loan_schema_v1())
+
+
+def registry_lookup():
+    return get_spec(None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, fn in (("before (rebuild per request)", per_request_rebuild),
+                     ("after (registry lookup)", registry_lookup)):
+        best = min(timeit.repeat(fn, number=args.number, repeat=args.repeat)) / args.number
+        results[name] = best
+        print(f"{name:>30}: {best * 1e6:10.2f} us/request")
+
+    before, after = results.values()
+    print(f"{'speed-up':>30}: {before / after:10.0f}x")
+
+
+if __name__ == "__main__":
+    main()
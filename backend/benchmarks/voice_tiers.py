@@ -0,0 +1,61 @@
+"""
+Offline run of the tiered voice extraction pipeline.
+
+Feeds sample transcripts through app.voice_pipeline.extract_from_text with
+the fake Gemini client and reports which tier answered and how long it took,
+so parser coverage and the latency saved by tier 1 can be checked without
+network access.
+
+    cd backend
+    python -m benchmarks.voice_tiers --latency 0.8
+"""
+
+import argparse
+import asyncio
+import time
+
+from app import voice
+from app.extraction_specs import get_spec
+from app.voice_pipeline import VOICE_REQUIRED_FIELDS, extract_from_text
+from benchmarks.fake_gemini import FakeGeminiClient
+
+SAMPLE_TRANSCRIPTS = [
+    "income 3000 per month, credit score 736, loan 10000, grade C3",
+    "My name is John Doe, I make 3,000 euros per month, my credit score is 736, "
+    "I would like to borrow 10k for a new car, grade D 3.",
+    "Annual income 45000, credit score of 690, loan amount 12,500 for debt consolidation, subgrade B2.",
+    "I earn 52k a year, credit score 710, I need 8000 for home improvement, grade A4, 12.5% interest.",
+    "Monthly income of 2500, credit score 650, loan of 5000, grade E1, I am a married woman.",
+    "I'm a student and I want some money for my studies.",
+    "Hello, I would like a loan please, my score is pretty good.",
+]
+
+
+async def run(latency: float) -> None:
+    fake = FakeGeminiClient(latency=latency)
+    voice.client = fake
+    spec = get_spec()
+
+    tiers: dict[str, list[float]] = {}
+    for text in SAMPLE_TRANSCRIPTS:
+        start = time.perf_counter()
+        extraction = await extract_from_text(text, spec)
+        elapsed = (time.perf_counter() - start) * 1000
+        tiers.setdefault(extraction.tier, []).append(elapsed)
+        print(f"{extraction.tier:>10} {elapsed:9.2f} ms  {text[:60]}")
+
+    print(f"\nrequired fields: {', '.join(VOICE_REQUIRED_FIELDS)}")
+    for tier, times in tiers.items():
+        print(f"{tier:>10}: {len(times)} transcripts, mean {sum(times) / len(times):.2f} ms")
+    print(f"LLM calls: {fake.calls} of {len(SAMPLE_TRANSCRIPTS)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.8, help="fake Gemini latency in seconds")
+    args = parser.parse_args(argv)
+    asyncio.run(run(args.latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Production server profile for the backend: gunicorn pre-forks uvicorn workers.
+
+    cd backend
+    gunicorn app.main:app            # this file is picked up from the working directory
+
+With PRELOAD_MODEL=1 (the default) the app is imported and the default model
+loaded and warmed up once in the master; the workers are forked from it and
+share the model's pages copy-on-write instead of each unpickling its own copy.
+gc.freeze() after loading keeps the collector from writing to those objects
+in the workers. Workers forked later (after a crash) start from the same
+loaded master, so they are ready immediately.
+
+Environment:
+- PORT (8001), WEB_CONCURRENCY (worker processes, default one per CPU)
+- NATIVE_THREADS: BLAS/OpenMP threads per worker, set with threadpoolctl
+  (default: CPUs / workers, at least 1, so the workers do not oversubscribe
+  the cores)
+- PRELOAD_MODEL (1): 0 imports and loads everything in each worker
+- GUNICORN_TIMEOUT (120): seconds a worker may stay silent before it is
+  restarted; above GEMINI_TIMEOUT_SECONDS so slow voice notes finish
+
+With more than one worker, PROMETHEUS_MULTIPROC_DIR defaults to a fresh
+temporary directory so /metrics aggregates all workers, and
+MODEL_REGISTRY_STATE to a file in a fresh temporary directory, through which
+/models loads, activations and unloads reach every worker
+(app/registry_sync.py). Set it to a persistent path to keep those changes
+across restarts.
+"""
+
+import gc
+import os
+import tempfile
+
+workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+# the app reads it too: /models needs a shared registry state with several workers
+os.environ["WEB_CONCURRENCY"] = str(workers)
+native_threads = int(os.getenv("NATIVE_THREADS", max(1, (os.cpu_count() or 1) // workers)))
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8001')}"
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = os.getenv("PRELOAD_MODEL", "1") == "1"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+# app.trace already logs one JSON line per request
+accesslog = None
+
+# must be set before the app (and prometheus_client) is imported
+if workers > 1 and not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="prometheus-")
+if workers > 1 and not os.getenv("MODEL_REGISTRY_STATE"):
+    os.environ["MODEL_REGISTRY_STATE"] = os.path.join(tempfile.mkdtemp(prefix="model-registry-"), "state.json")
+
+
+def on_starting(server):
+    if not server.cfg.preload_app:
+        return
+    from threadpoolctl import threadpool_limits
+
+    from app import inference
+
+    # single-threaded warm-up: no OpenMP thread team exists in the master
+    # when it forks (GNU libgomp does not survive fork with one)
+    with threadpool_limits(limits=1):
+        inference.load_model()
+    gc.collect()
+    gc.freeze()
+    server.log.info("Model loaded in the master, forking %s workers", server.cfg.workers)
+
+
+def post_fork(server, worker):
+    from threadpoolctl import threadpool_limits
+
+    threadpool_limits(limits=native_threads)
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,64 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.svm import SVC
+
+from app.inference import FEATURE_COLUMNS, MODEL_PATH
+from benchmarks.payloads import PayloadGenerator
+
+
+@pytest.fixture(scope="session")
+def pipeline():
+    return joblib.load(MODEL_PATH)
+
+
+@pytest.fixture(scope="session")
+def payloads():
+    """Applicants drawn from the training distributions, with missing values and unseen categories mixed in."""
+    sampled = PayloadGenerator(seed=7).payloads(300)
+    for i, payload in enumerate(sampled):
+        if i % 5 == 1:
+            payload["credit_score"] = None
+            payload["gender"] = None
+        if i % 5 == 2:
+            payload["loan_purpose"] = "Spaceship"
+            payload["grade_subgrade"] = "Z9"
+        if i % 5 == 3:
+            for column in ("annual_income", "interest_rate", "education_level", "employment_status"):
+                payload[column] = None
+    return sampled
+
+
+def _fit_small_pipeline(pipeline, estimator, path):
+    """A pipeline in the layout of models/SVC.py, fitted on labels of the default model."""
+    X = pd.DataFrame(PayloadGenerator(seed=11).payloads(600), columns=FEATURE_COLUMNS)
+    proba = pipeline.predict_proba(X)[:, 1]
+    numeric = [c for c in FEATURE_COLUMNS if X[c].dtype.kind == "f"]
+    categorical = [c for c in FEATURE_COLUMNS if c not in numeric]
+    small = Pipeline([
+        ("preprocess", ColumnTransformer([
+            ("num", StandardScaler(), numeric),
+            ("cat", OneHotEncoder(handle_unknown="ignore"), categorical),
+        ])),
+        ("estimator", estimator),
+    ]).fit(X, proba > np.median(proba))
+    joblib.dump(small, path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def svc_pipeline_path(pipeline, tmp_path_factory):
+    """Path of a fitted SVC(probability=True) pipeline, which rejects NaN features."""
+    path = tmp_path_factory.mktemp("svc") / "svc.joblib"
+    return _fit_small_pipeline(pipeline, SVC(probability=True, random_state=0), path)
+
+
+@pytest.fixture(scope="session")
+def logistic_pipeline_path(pipeline, tmp_path_factory):
+    path = tmp_path_factory.mktemp("logistic") / "logistic.joblib"
+    return _fit_small_pipeline(pipeline, LogisticRegression(max_iter=1000), path)
@@ -0,0 +1,127 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import inference
+from app.array_model import ArrayModel
+from benchmarks.payloads import PayloadGenerator
+from tests.test_fast_inference import pipeline_proba
+
+MODELS_DIR = Path(__file__).resolve().parents[2] / "models"
+EXPORTER = MODELS_DIR / "export_model.py"
+
+
+@pytest.fixture(scope="module")
+def export_model():
+    spec = importlib.util.spec_from_file_location("export_model", EXPORTER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module")
+def exported(pipeline, export_model, tmp_path_factory):
+    return export_model.export_pipeline(pipeline, tmp_path_factory.mktemp("export") / "model.arrays")
+
+
+@pytest.mark.parametrize("mmap_mode", ["r", None])
+def test_matches_pipeline(pipeline, exported, payloads, mmap_mode):
+    model = ArrayModel(exported, mmap_mode=mmap_mode)
+    np.testing.assert_allclose(model.predict_proba(payloads), pipeline_proba(pipeline, payloads), rtol=0, atol=1e-9)
+
+
+def test_single_rows_match_batch(exported, payloads):
+    model = ArrayModel(exported)
+    single = np.array([model.predict_proba_one(p) for p in payloads[:50]])
+    np.testing.assert_allclose(single, model.predict_proba(payloads[:50]), rtol=0, atol=1e-12)
+
+
+def test_probe_and_random_payloads(pipeline, exported, export_model):
+    assert export_model.check_export(pipeline, ArrayModel(exported), n_random=300) <= 1e-9
+
+
+def test_rejects_other_format_versions(exported, tmp_path):
+    manifest = (exported / "manifest.json").read_text().replace('"format_version": 1', '"format_version": 99')
+    for source in exported.iterdir():
+        (tmp_path / source.name).write_bytes(source.read_bytes())
+    (tmp_path / "manifest.json").write_text(manifest)
+    with pytest.raises(ValueError):
+        ArrayModel(tmp_path)
+
+
+def test_served_with_arrays_engine(exported, payloads, monkeypatch):
+    monkeypatch.setattr(inference, "INFERENCE_ENGINE", "arrays")
+    monkeypatch.setattr(inference, "MODEL_ARRAYS_DIR", str(exported))
+    version = inference.load_model_version("loan", "arrays-test", inference.MODEL_PATH)
+    assert version.describe()["engine"] == "arrays"
+    expected = pipeline_proba(version.pipeline, payloads)
+    np.testing.assert_allclose(inference._probas(version, payloads), expected, rtol=0, atol=1e-9)
+
+
+def test_arrays_engine_falls_back_without_export(tmp_path, monkeypatch):
+    monkeypatch.setattr(inference, "INFERENCE_ENGINE", "arrays")
+    monkeypatch.setattr(inference, "MODEL_ARRAYS_DIR", str(tmp_path / "missing"))
+    version = inference.load_model_version("loan", "arrays-test", inference.MODEL_PATH)
+    assert version.describe()["engine"] == "fast"
+
+
+@pytest.mark.parametrize("fixture", ["svc_pipeline_path", "logistic_pipeline_path"])
+def test_served_svc_and_logistic_exports(fixture, export_model, request, monkeypatch):
+    path = request.getfixturevalue(fixture)
+    model = ArrayModel(export_model.export_pipeline(joblib.load(path), path.with_suffix(".arrays")))
+    assert export_model.check_export(joblib.load(path), model, n_random=200) <= 1e-9
+
+    monkeypatch.setattr(inference, "INFERENCE_ENGINE", "arrays")
+    version = inference.load_model_version("loan", f"{fixture}-test", path)
+    assert version.describe()["engine"] == "arrays"
+    payloads = PayloadGenerator(seed=5).payloads(100)
+    expected = pipeline_proba(version.pipeline, payloads)
+    np.testing.assert_allclose(inference._probas(version, payloads), expected, rtol=0, atol=1e-9)
+
+
+@pytest.fixture(scope="module")
+def approx_export(svc_pipeline_path):
+    """Reduced-set surrogate of the SVC pipeline, where the approx engine looks for it."""
+    # svc_approx imports its sibling modules by name
+    sys.path.insert(0, str(MODELS_DIR))
+    import svc_approx
+
+    X_fit = pd.DataFrame(PayloadGenerator(seed=13).payloads(400), columns=inference.FEATURE_COLUMNS)
+    return svc_approx.export_surrogate(joblib.load(svc_pipeline_path), X_fit, 100,
+                                       svc_pipeline_path.with_suffix(".approx.arrays"))
+
+
+def test_served_with_approx_engine(svc_pipeline_path, approx_export, monkeypatch):
+    monkeypatch.setattr(inference, "INFERENCE_ENGINE", "approx")
+    # the small test SVC is fitted on 600 rows; its surrogate is coarser than a real one
+    monkeypatch.setattr(inference, "APPROX_MAX_PROBA_ERROR", 0.25)
+    version = inference.load_model_version("loan", "approx-test", svc_pipeline_path)
+    assert version.describe()["engine"] == "approx"
+    assert version.fast_engine.manifest["n_support_vectors"] == 100
+    payloads = PayloadGenerator(seed=5).payloads(100)
+    error = np.abs(inference._probas(version, payloads) - pipeline_proba(version.pipeline, payloads))
+    assert error.max() <= inference.APPROX_MAX_PROBA_ERROR
+
+
+def test_approx_engine_enforces_tolerance(svc_pipeline_path, approx_export, monkeypatch):
+    monkeypatch.setattr(inference, "INFERENCE_ENGINE", "approx")
+    monkeypatch.setattr(inference, "APPROX_MAX_PROBA_ERROR", 1e-9)
+    version = inference.load_model_version("loan", "approx-test", svc_pipeline_path)
+    assert version.describe()["engine"] == "fast"
+
+
+def test_exact_engines_reject_approx_export(svc_pipeline_path, approx_export, tmp_path, monkeypatch):
+    monkeypatch.setattr(inference, "INFERENCE_ENGINE", "arrays")
+    # the surrogate where the exact export of the pipeline is expected
+    path = tmp_path / "svc.joblib"
+    path.write_bytes(svc_pipeline_path.read_bytes())
+    (tmp_path / "svc.arrays").mkdir()
+    for source in approx_export.iterdir():
+        (tmp_path / "svc.arrays" / source.name).write_bytes(source.read_bytes())
+    version = inference.load_model_version("loan", "arrays-test", path)
+    assert version.describe()["engine"] == "fast"
@@ -0,0 +1,59 @@
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app import audio
+from app.main import app as backend_app
+
+LIMIT = 1024
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(audio.UploadLimitMiddleware, paths=("/upload",), max_bytes=LIMIT)
+    app.state.reached = 0
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        app.state.reached += 1
+        return {"size": len(await file.read())}
+
+    @app.post("/other")
+    async def other(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return TestClient(app)
+
+
+def test_small_upload_passes(client):
+    r = client.post("/upload", files={"file": ("a.webm", b"x" * 100, "audio/webm")})
+    assert r.status_code == 200 and r.json() == {"size": 100}
+
+
+def test_content_length_over_limit_is_refused_unread(client):
+    r = client.post("/upload", files={"file": ("a.webm", b"x" * (2 * LIMIT), "audio/webm")})
+    assert r.status_code == 413
+    assert client.app.state.reached == 0
+
+
+def test_chunked_body_is_stopped_at_the_limit(client):
+    def body():  # no Content-Length: sent chunked
+        for _ in range(100):
+            yield b"x" * 256
+
+    r = client.post("/upload", content=body(), headers={"Content-Type": "multipart/form-data; boundary=b"})
+    assert r.status_code == 413
+    assert client.app.state.reached == 0
+
+
+def test_other_routes_are_not_limited(client):
+    r = client.post("/other", files={"file": ("a.bin", b"x" * (2 * LIMIT), "application/octet-stream")})
+    assert r.status_code == 200
+
+
+def test_voice_form_refuses_oversized_upload():
+    with TestClient(backend_app) as client:
+        r = client.post("/voice-form", files={"audio": ("a.webm", b"x" * (audio.AUDIO_MAX_REQUEST_BYTES + 1),
+                                                       "audio/webm")})
+    assert r.status_code == 413
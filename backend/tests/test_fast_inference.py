@@ -0,0 +1,64 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import inference
+from app.fast_inference import FastPipeline, check_parity, parity_payloads
+from benchmarks.payloads import PayloadGenerator
+
+
+def pipeline_proba(pipeline, payloads):
+    columns = list(pipeline.feature_names_in_)
+    frame = pd.DataFrame([{c: p.get(c) for c in columns} for p in payloads], columns=columns)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        return pipeline.predict_proba(frame)[:, 1]
+
+
+@pytest.fixture(scope="module")
+def fast(pipeline):
+    return FastPipeline(pipeline)
+
+
+def test_batch_matches_pipeline(pipeline, fast, payloads):
+    np.testing.assert_allclose(fast.predict_proba(payloads), pipeline_proba(pipeline, payloads), rtol=0, atol=1e-9)
+
+
+def test_single_matches_pipeline(pipeline, fast, payloads):
+    single = np.array([fast.predict_proba_one(p) for p in payloads[:60]])
+    np.testing.assert_allclose(single, pipeline_proba(pipeline, payloads[:60]), rtol=0, atol=1e-9)
+
+
+def test_missing_and_unknown_values(pipeline, fast):
+    empty = dict.fromkeys(pipeline.feature_names_in_)
+    unseen = {column: "__unseen__" for column, _ in fast.categorical}
+    probes = [empty, {**empty, **unseen}, {**empty, "credit_score": 700.0, "grade_subgrade": "C3"}]
+    np.testing.assert_allclose(fast.predict_proba(probes), pipeline_proba(pipeline, probes), rtol=0, atol=1e-9)
+
+
+def test_missing_keys_are_missing_values(fast):
+    assert fast.predict_proba_one({}) == fast.predict_proba_one(dict.fromkeys(fast.numeric_columns))
+
+
+def test_check_parity_probes(pipeline, fast):
+    assert check_parity(pipeline, fast, parity_payloads(fast)) <= 1e-9
+
+
+def test_svc_pipeline_loads_with_fast_engine(svc_pipeline_path, monkeypatch):
+    # SVC rejects NaN, so the parity probes must not send missing numbers to it
+    monkeypatch.setattr(inference, "INFERENCE_ENGINE", "fast")
+    version = inference.load_model_version("loan", "svc-test", svc_pipeline_path)
+    assert version.describe()["engine"] == "fast"
+    payloads = PayloadGenerator(seed=3).payloads(100)
+    np.testing.assert_allclose(inference._probas(version, payloads), pipeline_proba(version.pipeline, payloads),
+                               rtol=0, atol=1e-9)
+
+
+def test_unscorable_probes_fall_back_to_pipeline(pipeline, monkeypatch):
+    def fail(*args, **kwargs):
+        raise ValueError("Input X contains NaN.")
+
+    monkeypatch.setattr(inference, "check_parity", fail)
+    assert inference._build_fast_engine(pipeline) is None
@@ -0,0 +1,101 @@
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.model_registry import ModelRegistry, ModelVersion
+from app.registry_sync import RegistrySync
+
+
+def _worker(state: Path, broken: set[str] = frozenset()) -> RegistrySync:
+    """One worker's registry with a stand-in loader, already serving loan:v1."""
+    def loader(name, version, path):
+        if path.name in broken:
+            raise ValueError(f"cannot load {path.name}")
+        return ModelVersion(name, version, path, pipeline=None, fast_engine=None, sha256=path.name)
+
+    registry = ModelRegistry(loader)
+    registry.load("loan", "v1", Path("loan_pipeline_model.pkl"))
+    return RegistrySync(state, registry, Path)
+
+
+def _active(worker: RegistrySync) -> str:
+    return worker.registry.get("loan").version
+
+
+def test_changes_reach_every_worker(tmp_path):
+    a, b = _worker(tmp_path / "state.json"), _worker(tmp_path / "state.json")
+
+    a.record_load("loan", "v2", "v2.pkl", activate=True)
+    assert a.apply() and b.apply()
+    assert _active(a) == _active(b) == "v2"
+    assert not b.apply()  # nothing new
+
+    # rollback to the version every worker loaded at startup
+    b.record_activate("loan", "v1")
+    a.apply(), b.apply()
+    assert _active(a) == _active(b) == "v1"
+
+    a.record_unload("loan", "v2")
+    a.apply(), b.apply()
+    for worker in (a, b):
+        assert list(worker.registry.snapshot()["loan"]["versions"]) == ["v1"]
+
+
+def test_late_worker_catches_up(tmp_path):
+    a = _worker(tmp_path / "state.json")
+    a.record_load("loan", "v2", "v2.pkl", activate=False)
+    a.record_load("loan", "v3", "v3.pkl", activate=True)
+
+    late = _worker(tmp_path / "state.json")
+    late.apply()
+    assert _active(late) == "v3"
+    assert sorted(late.registry.snapshot()["loan"]["versions"]) == ["v1", "v2", "v3"]
+
+
+def test_failed_load_keeps_serving_previous_version(tmp_path):
+    ok, broken = _worker(tmp_path / "state.json"), _worker(tmp_path / "state.json", broken={"v2.pkl"})
+    ok.record_load("loan", "v2", "v2.pkl", activate=True)
+    ok.apply(), broken.apply()
+    assert _active(ok) == "v2"
+    assert _active(broken) == "v1"
+    assert broken.registry.snapshot()["loan"]["pending"]["v2"].startswith("failed")
+
+
+def test_cannot_unload_the_shared_active_version(tmp_path):
+    a = _worker(tmp_path / "state.json")
+    a.record_load("loan", "v2", "v2.pkl", activate=True)
+    with pytest.raises(ValueError):
+        a.record_unload("loan", "v2")
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+def test_gunicorn_workers_follow_admin_calls(monkeypatch):
+    pytest.importorskip("gunicorn")
+    from benchmarks.serve_workers import start_server
+
+    monkeypatch.setenv("MODEL_ADMIN_TOKEN", "test-token")
+    monkeypatch.setenv("MODEL_REGISTRY_POLL_SECONDS", "0.2")
+    monkeypatch.delenv("MODEL_REGISTRY_STATE", raising=False)
+    proc, port = start_server(workers=2, native_threads=1, preload=True)
+    url = f"http://127.0.0.1:{port}/models"
+    try:
+        r = httpx.post(f"{url}/loan/versions", headers={"X-Admin-Token": "test-token"},
+                       json={"version": "v2", "filename": "loan_pipeline_model.pkl"})
+        assert r.status_code == 202
+
+        # new connections land on either worker; wait until both report v2
+        seen = {}
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            models = httpx.get(url, headers={"Connection": "close"}).json()
+            seen[models["worker_pid"]] = models["loan"]["active"]
+            if len(seen) == 2 and set(seen.values()) == {"v2"}:
+                break
+            time.sleep(0.1)
+        assert len(seen) == 2 and set(seen.values()) == {"v2"}, seen
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
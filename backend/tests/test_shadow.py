@@ -0,0 +1,24 @@
+import dataclasses
+
+import numpy as np
+import pytest
+from prometheus_client import REGISTRY
+
+from app import inference
+
+STAGES = ("dataframe", "preprocess", "estimator")
+
+
+def _stage_counts() -> dict:
+    return {stage: REGISTRY.get_sample_value("stage_duration_seconds_count", {"stage": stage}) for stage in STAGES}
+
+
+@pytest.mark.parametrize("engine", ["fast", "pipeline"])
+def test_shadow_scoring_is_not_a_request_stage(payloads, engine):
+    model = inference.get_model()
+    if engine == "pipeline":
+        model = dataclasses.replace(model, fast_engine=None)
+    before = _stage_counts()
+    probas = inference._shadow_probas(model, payloads[:20])
+    assert _stage_counts() == before
+    np.testing.assert_allclose(probas, inference._probas(model, payloads[:20]), rtol=0, atol=1e-12)
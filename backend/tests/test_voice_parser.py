@@ -0,0 +1,63 @@
+import pytest
+
+from app.voice_parser import missing_fields, parse_voice_text
+
+
+def test_reads_the_prompt_phrasing():
+    data = parse_voice_text("Income 3000 per month, credit score 736, loan 10000, interest 13.67%, grade C3")
+    assert data["annual_income"] == 36000.0
+    assert data["credit_score"] == 736.0
+    assert data["loan_amount"] == 10000.0
+    assert data["interest_rate"] == 13.67
+    assert data["grade_subgrade"] == "C3"
+
+
+@pytest.mark.parametrize("text", [
+    "My debt to income is 15%",
+    "debt-to-income 15 percent",
+    "my debt to income ratio is 0.15",
+])
+def test_debt_to_income_is_not_an_income(text):
+    data = parse_voice_text(text)
+    assert data["annual_income"] is None
+    assert data["debt_to_income_ratio"] == 0.15
+
+
+def test_income_after_debt_to_income():
+    data = parse_voice_text("debt to income 15%, annual income 52,000")
+    assert data["debt_to_income_ratio"] == 0.15
+    assert data["annual_income"] == 52000.0
+
+
+@pytest.mark.parametrize("text, field, expected", [
+    ("I earn 45k a year", "annual_income", 45000.0),
+    ("salary of 60 thousand", "annual_income", 60000.0),
+    ("I need a loan of 1.5 million", "loan_amount", 1_500_000.0),
+    ("loan amount 2 million", "loan_amount", 2_000_000.0),
+    ("borrowing 5 grand", "loan_amount", 5000.0),
+])
+def test_scales_spoken_multipliers(text, field, expected):
+    assert parse_voice_text(text)[field] == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("My name is John Doe and I am married", "John Doe"),
+    ("Hello, my name is Ana", "Ana"),
+    ("MY NAME IS Marie-Claire O'Neil", "Marie-Claire O'Neil"),
+    ("my name is john", None),
+])
+def test_name(text, expected):
+    assert parse_voice_text(text)["name_surname"] == expected
+
+
+def test_categories_prefer_the_longest_phrase():
+    data = parse_voice_text("I am a self-employed woman with a PhD, buying a new car")
+    assert data["employment_status"] == "Self-employed"
+    assert data["gender"] == "Female"
+    assert data["education_level"] == "PhD"
+    assert data["loan_purpose"] == "Car"
+
+
+def test_missing_fields():
+    data = parse_voice_text("credit score 700")
+    assert missing_fields(data, ("annual_income", "credit_score")) == ["annual_income"]
@@ -0,0 +1,316 @@
+"""
+Export a fitted loan pipeline to the array format read by
+backend/app/array_model.py, and check that both score the same.
+
+Supported pipelines: ColumnTransformer(OneHotEncoder + Standard/Robust/MinMax
+scaler) followed by LGBMClassifier, SVC(probability=True) or
+LogisticRegression. Resampling steps of an imblearn pipeline (e.g. SMOTE) are
+skipped, as they are at predict time.
+
+    python export_model.py ../backend/app/models/loan_pipeline_model.pkl
+    python export_model.py svc_best_model.joblib --out ../backend/app/models/svc_arrays
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import MinMaxScaler, OneHotEncoder, RobustScaler, StandardScaler
+from sklearn.svm import SVC
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.array_model import (  # noqa: E402
+    FORMAT_VERSION,
+    MISSING_NAN,
+    MISSING_NONE,
+    MISSING_ZERO,
+    ArrayModel,
+)
+from app.fast_inference import (  # noqa: E402
+    UnsupportedPipeline,
+    accepts_missing_numbers,
+    check_parity,
+    parity_payloads,
+)
+
+_MISSING_TYPES = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+
+
+def _split_pipeline(pipeline):
+    steps = [step for _, step in pipeline.steps if not hasattr(step, "fit_resample")]
+    if len(steps) != 2 or not isinstance(steps[0], ColumnTransformer):
+        raise UnsupportedPipeline("expected Pipeline([ColumnTransformer, estimator])")
+    return steps[0], steps[1]
+
+
+def export_preprocessor(preprocessor: ColumnTransformer) -> tuple[dict, dict]:
+    if preprocessor.remainder != "drop":
+        raise UnsupportedPipeline("ColumnTransformer remainder must be 'drop'")
+
+    categorical = []
+    numeric_columns, numeric_index = [], []
+    offset, scale, mul, add = [], [], [], []
+
+    position = 0
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == "drop":
+            continue
+        columns = list(columns)
+        n = len(columns)
+
+        if isinstance(transformer, OneHotEncoder):
+            if transformer.drop_idx_ is not None or transformer._infrequent_enabled:
+                raise UnsupportedPipeline(f"{name}: drop/infrequent categories not supported")
+            if transformer.handle_unknown != "ignore":
+                raise UnsupportedPipeline(f"{name}: handle_unknown must be 'ignore'")
+            for column, categories in zip(columns, transformer.categories_):
+                categorical.append([column, position, categories.tolist()])
+                position += len(categories)
+            continue
+
+        if isinstance(transformer, StandardScaler):
+            offset.extend(transformer.mean_ if transformer.with_mean else np.zeros(n))
+            scale.extend(transformer.scale_ if transformer.with_std else np.ones(n))
+            mul.extend(np.ones(n))
+            add.extend(np.zeros(n))
+        elif isinstance(transformer, RobustScaler):
+            offset.extend(transformer.center_ if transformer.center_ is not None else np.zeros(n))
+            scale.extend(transformer.scale_ if transformer.scale_ is not None else np.ones(n))
+            mul.extend(np.ones(n))
+            add.extend(np.zeros(n))
+        elif isinstance(transformer, MinMaxScaler):
+            if transformer.clip:
+                raise UnsupportedPipeline(f"{name}: MinMaxScaler(clip=True) not supported")
+            offset.extend(np.zeros(n))
+            scale.extend(np.ones(n))
+            mul.extend(transformer.scale_)
+            add.extend(transformer.min_)
+        else:
+            raise UnsupportedPipeline(f"{name}: unsupported transformer {type(transformer).__name__}")
+
+        numeric_columns.extend(columns)
+        numeric_index.extend(range(position, position + n))
+        position += n
+
+    manifest = {
+        "n_features": position,
+        "categorical": categorical,
+        "numeric": {"columns": numeric_columns, "index": numeric_index},
+    }
+    arrays = {
+        "numeric_offset": np.asarray(offset, dtype=np.float64),
+        "numeric_scale": np.asarray(scale, dtype=np.float64),
+        "numeric_mul": np.asarray(mul, dtype=np.float64),
+        "numeric_add": np.asarray(add, dtype=np.float64),
+    }
+    return manifest, arrays
+
+
+def export_lightgbm(estimator) -> tuple[dict, dict]:
+    num_iteration = getattr(estimator, "best_iteration_", None) or None
+    dump = estimator.booster_.dump_model(num_iteration=num_iteration)
+    if dump["num_tree_per_iteration"] != 1:
+        raise UnsupportedPipeline("only binary LightGBM models are supported")
+    objective = dump["objective"].split()
+    if objective[0] != "binary":
+        raise UnsupportedPipeline(f"unsupported LightGBM objective {dump['objective']!r}")
+    sigmoid = float(dict(p.split(":") for p in objective[1:]).get("sigmoid", 1.0))
+
+    feature, threshold, left, right, default_left, missing_type, value = [], [], [], [], [], [], []
+    roots = []
+
+    def add_node(split_feature=0, split_threshold=0.0, leaf_value=0.0, node_default_left=False,
+                 node_missing_type=MISSING_NONE) -> int:
+        i = len(feature)
+        feature.append(split_feature)
+        threshold.append(split_threshold)
+        value.append(leaf_value)
+        default_left.append(node_default_left)
+        missing_type.append(node_missing_type)
+        # leaves route to themselves
+        left.append(i)
+        right.append(i)
+        return i
+
+    def visit(node: dict) -> tuple[int, int]:
+        """Appends a subtree; returns its root index and depth."""
+        if "leaf_value" in node:
+            return add_node(leaf_value=node["leaf_value"]), 0
+        if node["decision_type"] != "<=":
+            raise UnsupportedPipeline(f"unsupported split {node['decision_type']!r} (categorical feature?)")
+        i = add_node(
+            split_feature=node["split_feature"],
+            split_threshold=node["threshold"],
+            node_default_left=node["default_left"],
+            node_missing_type=_MISSING_TYPES[node["missing_type"]],
+        )
+        left[i], left_depth = visit(node["left_child"])
+        right[i], right_depth = visit(node["right_child"])
+        return i, 1 + max(left_depth, right_depth)
+
+    max_depth = 0
+    for tree in dump["tree_info"]:
+        if tree.get("is_linear"):
+            raise UnsupportedPipeline("linear trees are not supported")
+        root, depth = visit(tree["tree_structure"])
+        roots.append(root)
+        max_depth = max(max_depth, depth)
+
+    manifest = {
+        "estimator": "lightgbm",
+        "max_depth": max_depth,
+        "sigmoid": sigmoid,
+        "average_output": bool(dump.get("average_output", False)),
+        "n_trees": len(roots),
+    }
+    arrays = {
+        "tree_feature": np.asarray(feature, dtype=np.int32),
+        "tree_threshold": np.asarray(threshold, dtype=np.float64),
+        "tree_left": np.asarray(left, dtype=np.int32),
+        "tree_right": np.asarray(right, dtype=np.int32),
+        "tree_default_left": np.asarray(default_left, dtype=bool),
+        "tree_missing_type": np.asarray(missing_type, dtype=np.int8),
+        "tree_value": np.asarray(value, dtype=np.float64),
+        "tree_roots": np.asarray(roots, dtype=np.int32),
+    }
+    return manifest, arrays
+
+
+def export_svc(estimator: SVC) -> tuple[dict, dict]:
+    if not estimator.probability:
+        raise UnsupportedPipeline("SVC must be fitted with probability=True")
+    if len(estimator.classes_) != 2:
+        raise UnsupportedPipeline("only binary SVC is supported")
+    if estimator.kernel not in ("linear", "rbf", "poly", "sigmoid"):
+        raise UnsupportedPipeline(f"unsupported SVC kernel {estimator.kernel!r}")
+
+    support_vectors = estimator.support_vectors_
+    if hasattr(support_vectors, "toarray"):
+        support_vectors = support_vectors.toarray()
+    dual_coef = estimator.dual_coef_
+    if hasattr(dual_coef, "toarray"):
+        dual_coef = dual_coef.toarray()
+
+    manifest = {
+        "estimator": "svc",
+        "kernel": estimator.kernel,
+        "gamma": float(estimator._gamma),
+        "coef0": float(estimator.coef0),
+        "degree": int(estimator.degree),
+        "intercept": float(estimator.intercept_[0]),
+        "prob_a": float(estimator.probA_[0]),
+        "prob_b": float(estimator.probB_[0]),
+        "n_support_vectors": int(support_vectors.shape[0]),
+    }
+    arrays = {
+        "svc_support_vectors": np.ascontiguousarray(support_vectors, dtype=np.float64),
+        "svc_dual_coef": np.ascontiguousarray(dual_coef[0], dtype=np.float64),
+    }
+    return manifest, arrays
+
+
+def export_logistic(estimator: LogisticRegression) -> tuple[dict, dict]:
+    if len(estimator.classes_) != 2:
+        raise UnsupportedPipeline("only binary LogisticRegression is supported")
+    manifest = {"estimator": "logistic", "intercept": float(estimator.intercept_[0])}
+    arrays = {"linear_coef": np.asarray(estimator.coef_[0], dtype=np.float64)}
+    return manifest, arrays
+
+
+def export_estimator(estimator) -> tuple[dict, dict]:
+    if hasattr(estimator, "booster_"):
+        return export_lightgbm(estimator)
+    if isinstance(estimator, SVC):
+        return export_svc(estimator)
+    if isinstance(estimator, LogisticRegression):
+        return export_logistic(estimator)
+    raise UnsupportedPipeline(f"unsupported estimator {type(estimator).__name__}")
+
+
+def export_pipeline(pipeline, out: Path) -> Path:
+    """Writes manifest.json and one .npy per array into `out`."""
+    preprocessor, estimator = _split_pipeline(pipeline)
+    manifest, arrays = export_preprocessor(preprocessor)
+    estimator_manifest, estimator_arrays = export_estimator(estimator)
+    manifest.update(estimator_manifest)
+    arrays.update(estimator_arrays)
+    return write_export(manifest, arrays, list(pipeline.feature_names_in_), out)
+
+
+def write_export(manifest: dict, arrays: dict, feature_columns: list[str], out: Path) -> Path:
+    manifest["format_version"] = FORMAT_VERSION
+    manifest["feature_columns"] = feature_columns
+    manifest["arrays"] = sorted(arrays)
+
+    out.mkdir(parents=True, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(out / f"{name}.npy", array, allow_pickle=False)
+    (out / "manifest.json").write_text(json.dumps(manifest, indent=1))
+    return out
+
+
+def random_payloads(model: ArrayModel, n: int, seed: int = 0) -> list[dict]:
+    """Random applicants around each scaler's center, with some unknown/missing values."""
+    rng = np.random.default_rng(seed)
+    payloads = []
+    for _ in range(n):
+        payload = {}
+        for column, mapping in model.categorical:
+            r = rng.random()
+            if r < 0.05:
+                payload[column] = None
+            elif r < 0.1:
+                payload[column] = "__unknown__"
+            else:
+                payload[column] = rng.choice(list(mapping))
+        # ~N(0, 2) in the scaled space the estimator sees, mapped back to raw values
+        z = rng.normal(0, 2, len(model.numeric_columns))
+        raw = (z - model.numeric_add) / model.numeric_mul * model.numeric_scale + model.numeric_offset
+        for column, value in zip(model.numeric_columns, raw):
+            payload[column] = None if rng.random() < 0.03 else float(value)
+        payloads.append(payload)
+    return payloads
+
+
+def check_export(pipeline, model: ArrayModel, n_random: int = 500, atol: float = 1e-9) -> float:
+    """
+    Parity of the exported model against the pipeline on the probe payloads
+    (every category, unknown and missing values) and on random applicants.
+    Raises AssertionError beyond atol; returns the largest difference.
+
+    Same probes and NaN handling as the check the backend runs when it loads
+    the export; the random applicants are on top.
+    """
+    missing_numbers = accepts_missing_numbers(pipeline)
+    probes = parity_payloads(model, missing_numbers) + random_payloads(model, n_random)
+    return check_parity(pipeline, model, probes, atol=atol)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("model", type=Path, help="fitted pipeline (.pkl / .joblib)")
+    parser.add_argument("--out", type=Path, help="output directory (default: <model>.arrays next to the model)")
+    parser.add_argument("--check-rows", type=int, default=500, help="random payloads in the parity check")
+    parser.add_argument("--atol", type=float, default=1e-9)
+    args = parser.parse_args(argv)
+
+    out = args.out or args.model.with_suffix(".arrays")
+    pipeline = joblib.load(args.model)
+    export_pipeline(pipeline, out)
+
+    model = ArrayModel(out)
+    max_diff = check_export(pipeline, model, n_random=args.check_rows, atol=args.atol)
+    size = sum(f.stat().st_size for f in out.iterdir())
+    print(f"Exported {args.model.name} -> {out} ({size / 1024:.0f} KiB, {model.manifest['estimator']})")
+    print(f"Parity vs pipeline: max |diff| = {max_diff:.3g} (atol {args.atol})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Columnar cache of the raw training CSVs and of encoded design matrices.
+
+The first load of a CSV converts it into one .npy file per column: numbers
+keep their dtype, text columns become integer codes plus a category list in
+manifest.json. Later loads memory-map those arrays instead of parsing the
+CSV, and text columns come back as pandas categoricals. Caches are keyed by
+the SHA-256 of the source file; a (size, mtime) index avoids rehashing an
+unchanged file on every load.
+
+encoded_split() adds a second level: the train/test split, the fitted
+preprocessor and the encoded matrices, keyed by the source hash and the
+preprocessor's parameters.
+
+    import feature_store
+    train = feature_store.load_table("../raw_data/train.csv")
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.model_selection import train_test_split
+
+CACHE_DIR = Path(os.getenv(
+    "FEATURE_STORE_DIR", Path(__file__).resolve().parent.parent / "raw_data" / ".feature_store"
+))
+
+FORMAT_VERSION = 1
+
+
+# --- source fingerprints ---
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_hash(path: str | Path, cache_dir: Path = CACHE_DIR) -> str:
+    """SHA-256 of the file, reused while its size and mtime are unchanged."""
+    path = Path(path).resolve()
+    stat = path.stat()
+    index_path = cache_dir / "index.json"
+    index = json.loads(index_path.read_text()) if index_path.exists() else {}
+
+    entry = index.get(str(path))
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return entry["sha256"]
+
+    sha256 = _file_sha256(path)
+    index[str(path)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp = index_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(index, indent=1))
+    tmp.replace(index_path)
+    return sha256
+
+
+# --- columnar tables ---
+
+def _convert(csv_path: Path, out: Path) -> None:
+    frame = pd.read_csv(csv_path)
+    out.mkdir(parents=True, exist_ok=True)
+    columns = []
+    for name in frame.columns:
+        values = frame[name]
+        if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            np.save(out / f"{name}.npy", values.to_numpy())
+            columns.append({"name": name, "kind": "numeric"})
+        else:
+            categorical = pd.Categorical(values)
+            n = len(categorical.categories)
+            codes_dtype = np.int8 if n < 127 else np.int16 if n < 32767 else np.int32
+            # -1 marks missing values, as in pandas
+            np.save(out / f"{name}.npy", categorical.codes.astype(codes_dtype))
+            columns.append({"name": name, "kind": "categorical",
+                            "categories": categorical.categories.tolist()})
+    manifest = {"format_version": FORMAT_VERSION, "source": csv_path.name,
+                "rows": len(frame), "columns": columns}
+    # written last: its presence marks a complete conversion
+    (out / "manifest.json").write_text(json.dumps(manifest, indent=1))
+
+
+def table_dir(csv_path: str | Path, cache_dir: Path = CACHE_DIR) -> Path:
+    """Columnar cache of csv_path, converted on first use."""
+    csv_path = Path(csv_path)
+    out = cache_dir / f"{csv_path.stem}-{source_hash(csv_path, cache_dir)[:16]}"
+    manifest = out / "manifest.json"
+    if not manifest.exists() or json.loads(manifest.read_text()).get("format_version") != FORMAT_VERSION:
+        _convert(csv_path, out)
+    return out
+
+
+def load_table(csv_path: str | Path, columns: list[str] | None = None, index_col: str | None = None,
+               cache_dir: Path = CACHE_DIR) -> pd.DataFrame:
+    """
+    The CSV as a DataFrame, from the columnar cache. Numeric columns are
+    memory-mapped; text columns are categoricals over the cached codes.
+    Drop-in for pd.read_csv(csv_path, usecols=columns, index_col=index_col).
+    """
+    out = table_dir(csv_path, cache_dir)
+    manifest = json.loads((out / "manifest.json").read_text())
+
+    data = {}
+    for column in manifest["columns"]:
+        name = column["name"]
+        if columns is not None and name not in columns and name != index_col:
+            continue
+        values = np.load(out / f"{name}.npy", mmap_mode="r")
+        if column["kind"] == "categorical":
+            data[name] = pd.Categorical.from_codes(values, categories=column["categories"])
+        else:
+            data[name] = values
+    frame = pd.DataFrame(data, copy=False)
+    if index_col is not None:
+        frame = frame.set_index(index_col)
+    return frame
+
+
+# --- encoded design matrices ---
+
+@dataclass
+class EncodedSplit:
+    X_train: Any
+    y_train: np.ndarray
+    X_test: Any
+    y_test: np.ndarray
+    preprocessor: Any
+
+
+def _save_matrix(path: Path, X) -> None:
+    if sparse.issparse(X):
+        sparse.save_npz(path.with_suffix(".npz"), X.tocsr())
+    else:
+        np.save(path.with_suffix(".npy"), np.asarray(X))
+
+
+def _load_matrix(path: Path):
+    if path.with_suffix(".npz").exists():
+        return sparse.load_npz(path.with_suffix(".npz"))
+    return np.load(path.with_suffix(".npy"), mmap_mode="r")
+
+
+def encoded_split(csv_path: str | Path, build_preprocessor: Callable[[], Any], target: str,
+                  drop: tuple[str, ...] = ("id",), test_size: float = 0.2, random_state: int = 42,
+                  cache_dir: Path = CACHE_DIR) -> EncodedSplit:
+    """
+    Stratified train/test split of the CSV, with build_preprocessor() fitted
+    on the training part and both parts encoded. Cached per source hash,
+    preprocessor parameters and split settings.
+    """
+    spec = json.dumps({
+        "preprocessor": repr(build_preprocessor()),
+        "target": target, "drop": list(drop), "test_size": test_size, "random_state": random_state,
+    }, sort_keys=True)
+    key = hashlib.sha256((source_hash(csv_path, cache_dir) + spec).encode()).hexdigest()[:16]
+    out = cache_dir / f"{Path(csv_path).stem}-encoded-{key}"
+
+    if (out / "preprocessor.joblib").exists():
+        return EncodedSplit(
+            _load_matrix(out / "X_train"), np.load(out / "y_train.npy"),
+            _load_matrix(out / "X_test"), np.load(out / "y_test.npy"),
+            joblib.load(out / "preprocessor.joblib"),
+        )
+
+    data = load_table(csv_path, cache_dir=cache_dir)
+    X = data.drop(columns=[target, *drop])
+    y = data[target].to_numpy()
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=random_state, stratify=y
+    )
+    preprocessor = build_preprocessor().fit(X_train)
+    X_train, X_test = preprocessor.transform(X_train), preprocessor.transform(X_test)
+
+    out.mkdir(parents=True, exist_ok=True)
+    _save_matrix(out / "X_train", X_train)
+    _save_matrix(out / "X_test", X_test)
+    np.save(out / "y_train.npy", y_train)
+    np.save(out / "y_test.npy", y_test)
+    (out / "spec.json").write_text(spec)
+    # written last: its presence marks a complete cache
+    joblib.dump(preprocessor, out / "preprocessor.joblib")
+    return EncodedSplit(X_train, y_train, X_test, y_test, preprocessor)
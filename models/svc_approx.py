@@ -0,0 +1,192 @@
+"""
+Approximate scorer for the SVC pipeline saved by SVC.py.
+
+An RBF SVC costs O(#support vectors) kernel evaluations per prediction. This
+fits a reduced-set surrogate: a Nystroem basis of k landmarks drawn from the
+training rows, and a ridge regression of the exact decision function on
+that basis. Nystroem + linear collapses to a kernel expansion over the k
+landmarks, so the surrogate is written straight to the array format of
+export_model.py (landmarks in place of the support vectors) and keeps the
+original Platt scaling. No sklearn estimator is built for it.
+
+k is the accuracy/latency knob. Every candidate k is scored on the held-out
+split of SVC.py (same test_size / random_state / stratify), and the report
+lists ROC AUC drift, probability error, decision agreement and latency. The
+smallest k within --max-auc-drift is exported.
+
+The export carries an "approximation" block in its manifest. The backend
+serves it only when asked to, with INFERENCE_ENGINE=approx: it reads
+<model>.approx.arrays (or MODEL_APPROX_DIR) and accepts it if its
+probabilities stay within APPROX_MAX_PROBA_ERROR of the exact pipeline on the
+parity probes. The exact engines (fast, arrays) reject it.
+
+    python svc_approx.py svc_best_model.joblib --components 50 100 200 400
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.kernel_approximation import Nystroem
+from sklearn.linear_model import Ridge
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.svm import SVC
+
+import feature_store
+from export_model import (
+    ArrayModel,
+    UnsupportedPipeline,
+    check_parity,
+    _split_pipeline,
+    export_pipeline,
+    export_preprocessor,
+    export_svc,
+    write_export,
+)
+
+
+def _dense(X):
+    return X.toarray() if hasattr(X, "toarray") else np.asarray(X)
+
+
+def fit_surrogate(svc: SVC, X_fit: np.ndarray, n_components: int, alpha: float = 1e-6,
+                  random_state: int = 0) -> tuple[np.ndarray, np.ndarray, float]:
+    """
+    Returns (landmarks, dual coefficients, intercept) of a reduced SVC whose
+    decision function approximates svc.decision_function on X_fit.
+    """
+    if svc.kernel == "linear":
+        # a linear SVC collapses exactly to one weight vector
+        dual = _dense(svc.dual_coef_)[0]
+        return (dual @ _dense(svc.support_vectors_))[None, :], np.ones(1), float(svc.intercept_[0])
+
+    # landmarks sampled from the rows the surrogate is fitted on
+    nystroem = Nystroem(
+        kernel=svc.kernel, gamma=svc._gamma, coef0=svc.coef0, degree=svc.degree,
+        n_components=min(n_components, len(X_fit)), random_state=random_state,
+    ).fit(X_fit)
+    target = svc.decision_function(X_fit)
+    ridge = Ridge(alpha=alpha).fit(nystroem.transform(X_fit), target)
+    # Z @ w = K(X, landmarks) @ normalization_.T @ w
+    dual = nystroem.normalization_.T @ ridge.coef_
+    return nystroem.components_, dual, float(ridge.intercept_)
+
+
+def export_surrogate(pipeline, X_fit: pd.DataFrame, n_components: int, out: Path) -> Path:
+    """Exports `pipeline` with its SVC replaced by the reduced-set surrogate; `pipeline` is not modified."""
+    preprocessor, svc = _split_pipeline(pipeline)
+    if not isinstance(svc, SVC):
+        raise UnsupportedPipeline(f"expected an SVC, got {type(svc).__name__}")
+
+    landmarks, dual, intercept = fit_surrogate(svc, _dense(preprocessor.transform(X_fit)), n_components)
+
+    manifest, arrays = export_preprocessor(preprocessor)
+    # kernel parameters and Platt scaling of the exact SVC
+    svc_manifest, _ = export_svc(svc)
+    manifest.update(svc_manifest, intercept=intercept, n_support_vectors=int(landmarks.shape[0]))
+    arrays["svc_support_vectors"] = np.ascontiguousarray(landmarks, dtype=np.float64)
+    arrays["svc_dual_coef"] = np.ascontiguousarray(dual, dtype=np.float64)
+    # marks the export as approximate: only INFERENCE_ENGINE=approx serves it
+    manifest["approximation"] = {"method": "nystroem", "components": n_components}
+    return write_export(manifest, arrays, list(pipeline.feature_names_in_), out)
+
+
+def _latency_us(model: ArrayModel, payloads: list[dict], repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for payload in payloads:
+            model.predict_proba_one(payload)
+        best = min(best, time.perf_counter() - start)
+    return best / len(payloads) * 1e6
+
+
+def evaluate(model: ArrayModel, exact_proba: np.ndarray, X_test: pd.DataFrame, y_test,
+             payloads: list[dict], exact_auc: float) -> dict:
+    proba = model.predict_proba(X_test.to_dict("records"))
+    auc = roc_auc_score(y_test, proba)
+    return {
+        "support_vectors": model.manifest["n_support_vectors"],
+        "roc_auc": round(auc, 6),
+        "auc_drift": round(exact_auc - auc, 6),
+        "mean_abs_proba_error": round(float(np.abs(proba - exact_proba).mean()), 6),
+        "max_abs_proba_error": round(float(np.abs(proba - exact_proba).max()), 6),
+        "decision_agreement": round(float(((proba > 0.5) == (exact_proba > 0.5)).mean()), 6),
+        "us_per_row": round(_latency_us(model, payloads), 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("model", type=Path, help="fitted SVC pipeline (svc_best_model.joblib)")
+    parser.add_argument("--data", type=Path, default=Path("../raw_data/train.csv"))
+    parser.add_argument("--components", type=int, nargs="+", default=[50, 100, 200, 400, 800, 1600],
+                        help="landmark counts to try (accuracy/latency trade-off)")
+    parser.add_argument("--max-auc-drift", type=float, default=0.002,
+                        help="largest held-out ROC AUC loss accepted for the exported surrogate")
+    parser.add_argument("--fit-rows", type=int, default=20000, help="training rows the surrogate is fitted on")
+    parser.add_argument("--eval-rows", type=int, default=20000, help="held-out rows scored in the report")
+    parser.add_argument("--out", type=Path, help="output directory (default: <model>.approx.arrays)")
+    args = parser.parse_args(argv)
+
+    pipeline = joblib.load(args.model)
+
+    # same split as SVC.py, so the held-out rows were never seen in training
+    data = feature_store.load_table(args.data)
+    X = data.drop(columns=["loan_paid_back", "id"])
+    y = data["loan_paid_back"]
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    X_fit = X_train.sample(min(args.fit_rows, len(X_train)), random_state=0)
+    X_test = X_test.iloc[:args.eval_rows]
+    y_test = y_test.iloc[:args.eval_rows]
+    latency_payloads = X_test.iloc[:200].to_dict("records")
+
+    with tempfile.TemporaryDirectory() as work:
+        work = Path(work)
+        exact = ArrayModel(export_pipeline(pipeline, work / "exact"))
+        exact_proba = exact.predict_proba(X_test.to_dict("records"))
+        exact_auc = roc_auc_score(y_test, exact_proba)
+
+        report = {"exact": evaluate(exact, exact_proba, X_test, y_test, latency_payloads, exact_auc),
+                  "surrogates": {}}
+        print(f"{'k':>6} {'SVs':>6} {'ROC AUC':>9} {'drift':>9} {'mean|dp|':>9} {'agree':>8} {'us/row':>8}")
+        row = report["exact"]
+        print(f"{'exact':>6} {row['support_vectors']:>6} {row['roc_auc']:>9.5f} {0:>9.5f} "
+              f"{0:>9.5f} {1:>8.4f} {row['us_per_row']:>8.1f}")
+
+        chosen = None
+        for k in sorted(args.components):
+            approx = ArrayModel(export_surrogate(pipeline, X_fit, k, work / f"k{k}"))
+            row = evaluate(approx, exact_proba, X_test, y_test, latency_payloads, exact_auc)
+            report["surrogates"][k] = row
+            print(f"{k:>6} {row['support_vectors']:>6} {row['roc_auc']:>9.5f} {row['auc_drift']:>9.5f} "
+                  f"{row['mean_abs_proba_error']:>9.5f} {row['decision_agreement']:>8.4f} {row['us_per_row']:>8.1f}")
+            if chosen is None and row["auc_drift"] <= args.max_auc_drift:
+                chosen = k
+
+    if chosen is None:
+        print(f"No surrogate within {args.max_auc_drift} AUC drift; nothing exported.")
+        return
+
+    out = args.out or args.model.with_suffix(".approx.arrays")
+    export_surrogate(pipeline, X_fit, chosen, out)
+    # the check the backend runs before serving it with INFERENCE_ENGINE=approx
+    probe_error = check_parity(pipeline, ArrayModel(out), atol=1.0)
+    manifest_path = out / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    manifest["approximation"].update(report["surrogates"][chosen], exact=report["exact"],
+                                     probe_max_abs_proba_error=round(probe_error, 6))
+    manifest_path.write_text(json.dumps(manifest, indent=1))
+    (out / "report.json").write_text(json.dumps(report, indent=1))
+    print(f"Exported k={chosen} surrogate -> {out}")
+    print(f"Parity probes: max |diff| = {probe_error:.4f} (the backend's APPROX_MAX_PROBA_ERROR must be above it)")
+
+
+if __name__ == "__main__":
+    main()